@@ -3,12 +3,15 @@ from concurrent.futures import Executor, ProcessPoolExecutor
 import logging
 import os
 import signal
-from typing import Tuple
+from typing import (
+    Tuple,
+    Union,
+)
 
 import rlp
 
 
-def sxor(s1: bytes, s2: bytes) -> bytes:
+def sxor(s1: Union[bytes, memoryview], s2: Union[bytes, memoryview]) -> bytes:
     if len(s1) != len(s2):
         raise ValueError("Cannot sxor strings of different length")
     return bytes(x ^ y for x, y in zip(s1, s2))
@@ -22,13 +25,13 @@ def roundup_16(x: int) -> int:
     return x
 
 
-def get_devp2p_cmd_id(msg: bytes) -> int:
+def get_devp2p_cmd_id(msg: Union[bytes, memoryview]) -> int:
     """Return the cmd_id for the given devp2p msg.
 
     The cmd_id, also known as the payload type, is always the first entry of the RLP, interpreted
     as an integer.
     """
-    return rlp.decode(msg[:1], sedes=rlp.sedes.big_endian_int)
+    return rlp.decode(bytes(msg[:1]), sedes=rlp.sedes.big_endian_int)
 
 
 def time_since(start_time: datetime.datetime) -> Tuple[int, int, int, int]:
@@ -75,25 +78,90 @@ def ensure_global_asyncio_executor(cpu_count: int=None) -> Executor:
                 cpu_count = 1
             else:
                 cpu_count = max(1, os_cpu_count - 1)
-        # The following block of code allows us to gracefully handle
-        # `KeyboardInterrupt` in the worker processes.  This is accomplished
-        # via two "hacks".
-        #
-        # First: We set the signal handler for SIGINT to the special case
-        # `SIG_IGN` which instructs the process to ignore SIGINT, while
-        # preserving the original signal handler.  We do this because child
-        # processes inherit the signal handlers of their parent processes.
-        #
-        # Second, we have to force the executor to initialize the worker
-        # processes, as they are not initialized on instantiation, but rather
-        # lazily when the first work is submitted.  We do this by calling the
-        # private method `_start_queue_management_thread`.
-        #
-        # Finally, we restore the original signal handler now that we know the
-        # child processes have been initialized to ensure that
-        # `KeyboardInterrupt` in the main process is still handled normally.
-        original_handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
-        _executor = ProcessPoolExecutor(cpu_count)
-        _executor._start_queue_management_thread()  # type: ignore
-        signal.signal(signal.SIGINT, original_handler)
+        _executor = _create_process_pool(cpu_count)
     return _executor
+
+
+def _create_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # The following block of code allows us to gracefully handle
+    # `KeyboardInterrupt` in the worker processes.  This is accomplished
+    # via two "hacks".
+    #
+    # First: We set the signal handler for SIGINT to the special case
+    # `SIG_IGN` which instructs the process to ignore SIGINT, while
+    # preserving the original signal handler.  We do this because child
+    # processes inherit the signal handlers of their parent processes.
+    #
+    # Second, we have to force the executor to initialize the worker
+    # processes, as they are not initialized on instantiation, but rather
+    # lazily when the first work is submitted.  We do this by calling the
+    # private method `_start_queue_management_thread`.
+    #
+    # Finally, we restore the original signal handler now that we know the
+    # child processes have been initialized to ensure that
+    # `KeyboardInterrupt` in the main process is still handled normally.
+    original_handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+    executor = ProcessPoolExecutor(max_workers)
+    executor._start_queue_management_thread()  # type: ignore
+    signal.signal(signal.SIGINT, original_handler)
+    return executor
+
+
+_msg_decoding_executor: Executor = None
+_msg_decoding_threshold: int = None
+
+
+def start_msg_decoding_executor(max_workers: int, size_threshold: int) -> Executor:
+    """
+    Create the `ProcessPoolExecutor` used by peers to decode large messages.
+
+    Only messages of commands whose decoding is slow and which are at least `size_threshold`
+    bytes long are decoded in it, see `BasePeer.read_msg()`. As with
+    `ensure_global_asyncio_executor()`, this must only be used in the networking process.
+    """
+    global _msg_decoding_executor, _msg_decoding_threshold
+
+    if _msg_decoding_executor is not None:
+        raise RuntimeError("The msg decoding executor has already been started")
+    _msg_decoding_executor = _create_process_pool(max_workers)
+    _msg_decoding_threshold = size_threshold
+    return _msg_decoding_executor
+
+
+def get_msg_decoding_executor() -> Tuple[Executor, int]:
+    """
+    Return the msg decoding executor and its size threshold.
+
+    The executor is None until `start_msg_decoding_executor()` has been called, and until then
+    all messages are decoded in the event loop.
+    """
+    return _msg_decoding_executor, _msg_decoding_threshold
+
+
+_header_validation_executor: Executor = None
+
+
+def start_header_validation_executor(max_workers: int) -> Executor:
+    """
+    Create the `ProcessPoolExecutor` used to verify the seals of headers we sync.
+
+    Each worker keeps the ethash caches of the epochs it has verified seals in, so they're only
+    generated once per worker. As with `ensure_global_asyncio_executor()`, this must only be used
+    in the networking process.
+    """
+    global _header_validation_executor
+
+    if _header_validation_executor is not None:
+        raise RuntimeError("The header validation executor has already been started")
+    _header_validation_executor = _create_process_pool(max_workers)
+    return _header_validation_executor
+
+
+def get_header_validation_executor() -> Executor:
+    """
+    Return the header validation executor.
+
+    It is None until `start_header_validation_executor()` has been called, and while it is, seals
+    are verified in the default executor of the event loop.
+    """
+    return _header_validation_executor
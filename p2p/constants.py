@@ -80,6 +80,13 @@ SEAL_CHECK_RANDOM_SAMPLE_RATE = 48
 # aborting the connection attempt.
 DEFAULT_PEER_BOOT_TIMEOUT = 20
 
+# Maximum number of nodes the BasePeerPool will be dialing at any given time.
+DEFAULT_MAX_CONCURRENT_DIALS = 16
+
+# The amount of time that the BasePeerPool will wait for a dial (including the auth and P2P
+# handshakes) to complete before giving up on it.
+DEFAULT_DIAL_TIMEOUT = 10
+
 # Interval at which peer pool is checked for potential new candidates
 DISOVERY_INTERVAL = 2
 # Timeout used when fetching peer candidates from discovery
@@ -7,7 +7,9 @@ More information at https://github.com/ethereum/devp2p/blob/master/rlpx.md#node-
 """
 import asyncio
 import collections
+from concurrent.futures import ThreadPoolExecutor
 import contextlib
+import itertools
 import logging
 import random
 import socket
@@ -16,6 +18,7 @@ from typing import (
     Any,
     Callable,
     cast,
+    Counter,
     Dict,
     Hashable,
     Iterable,
@@ -66,6 +69,7 @@ from p2p.exceptions import AlreadyWaitingDiscoveryResponse, NoEligibleNodes, Una
 from p2p.kademlia import to_uris
 from p2p import kademlia
 from p2p import protocol
+from p2p.node_db import NodeDB
 from p2p.service import BaseService
 
 if TYPE_CHECKING:
@@ -75,6 +79,8 @@ if TYPE_CHECKING:
 else:
     UserDict = collections.UserDict
 
+# The public key, cmd ID, payload and hash of an unpacked message.
+UnpackedMessage = Tuple[datatypes.PublicKey, int, Tuple[Any, ...], Hash32]
 # V4 handler methods take a Node, payload and msg_hash as arguments.
 V4_HANDLER_TYPE = Callable[[kademlia.Node, Tuple[Any, ...], Hash32], None]
 # V5 handler methods take a Node, payload, msg_hash and msg as arguments.
@@ -144,6 +150,8 @@ class DiscoveryProtocol(asyncio.DatagramProtocol):
     transport: asyncio.DatagramTransport = None
     use_v5 = False
     _max_neighbours_per_packet_cache = None
+    # If set, incoming packets are queued and unpacked by it instead of in datagram_received().
+    packet_processor: 'DiscoveryPacketProcessor' = None
 
     def __init__(self,
                  privkey: datatypes.PrivateKey,
@@ -421,9 +429,11 @@ class DiscoveryProtocol(asyncio.DatagramProtocol):
     def datagram_received(self, data: Union[bytes, Text], addr: Tuple[str, int]) -> None:
         ip_address, udp_port = addr
         address = kademlia.Address(ip_address, udp_port)
+        if self.packet_processor is not None:
+            self.packet_processor.add(address, text_if_str(to_bytes, data))
         # The prefix below is what geth uses to identify discv5 msgs.
         # https://github.com/ethereum/go-ethereum/blob/c4712bf96bc1bae4a5ad4600e9719e4a74bde7d5/p2p/discv5/udp.go#L149  # noqa: E501
-        if text_if_str(to_bytes, data).startswith(V5_ID_STRING):
+        elif text_if_str(to_bytes, data).startswith(V5_ID_STRING):
             self.receive_v5(address, cast(bytes, data))
         else:
             self.receive(address, cast(bytes, data))
@@ -448,7 +458,15 @@ class DiscoveryProtocol(asyncio.DatagramProtocol):
         except DefectiveMessage as e:
             self.logger.error('error unpacking message (%s) from %s: %s', message, address, e)
             return
-
+        self.receive_unpacked(address, remote_pubkey, cmd_id, payload, message_hash)
+
+    def receive_unpacked(self,
+                         address: kademlia.Address,
+                         remote_pubkey: datatypes.PublicKey,
+                         cmd_id: int,
+                         payload: Tuple[Any, ...],
+                         message_hash: Hash32) -> None:
+        """Handle a v4 message that has already been unpacked with _unpack_v4()."""
         # As of discovery version 4, expiration is the last element for all packets, so
         # we can validate that here, but if it changes we may have to do so on the
         # handler methods.
@@ -487,7 +505,9 @@ class DiscoveryProtocol(asyncio.DatagramProtocol):
         # The find_node payload should have 2 elements: node_id, expiration
         self.logger.debug2('<<< find_node from %s', node)
         node_id, _ = payload
-        if node not in self.routing:
+        # Nodes we've bonded with may only be in a replacement cache, as there's no room for them
+        # in their bucket.
+        if not self.routing.is_known(node):
             # FIXME: This is not correct; a node we've bonded before may have become unavailable
             # and thus removed from self.routing, but once it's back online we should accept
             # find_nodes from them.
@@ -640,7 +660,16 @@ class DiscoveryProtocol(asyncio.DatagramProtocol):
         except DefectiveMessage as e:
             self.logger.error('error unpacking message (%s) from %s: %s', message, address, e)
             return
-
+        self.receive_unpacked_v5(address, message, remote_pubkey, cmd_id, payload, message_hash)
+
+    def receive_unpacked_v5(self,
+                            address: kademlia.Address,
+                            message: bytes,
+                            remote_pubkey: datatypes.PublicKey,
+                            cmd_id: int,
+                            payload: Tuple[Any, ...],
+                            message_hash: Hash32) -> None:
+        """Handle a v5 message that has already been unpacked with _unpack_v5()."""
         cmd = CMD_ID_MAP_V5[cmd_id]
         if len(payload) != cmd.elem_count:
             self.logger.error('invalid %s payload: %s', cmd.name, payload)
@@ -852,27 +881,44 @@ class PreferredNodeDiscoveryProtocol(DiscoveryProtocol):
     """
     preferred_nodes: Sequence[kademlia.Node] = None
     preferred_node_recycle_time: int = 300
+    # Max number of nodes from the NodeDB to use as preferred nodes.
+    max_known_good_nodes: int = 50
     _preferred_node_tracker: Dict[kademlia.Node, float] = None
+    # The best nodes in our NodeDB, as of the last refresh_known_good_nodes() call.
+    _known_good_nodes: Tuple[kademlia.Node, ...] = ()
 
     def __init__(self,
                  privkey: datatypes.PrivateKey,
                  address: kademlia.Address,
                  bootstrap_nodes: Tuple[kademlia.Node, ...],
                  preferred_nodes: Sequence[kademlia.Node],
-                 cancel_token: CancelToken) -> None:
+                 cancel_token: CancelToken,
+                 node_db: NodeDB = None) -> None:
         super().__init__(privkey, address, bootstrap_nodes, cancel_token)
 
         self.preferred_nodes = preferred_nodes
+        self.node_db = node_db
         self.logger.info('Preferred peers: %s', self.preferred_nodes)
         self._preferred_node_tracker = collections.defaultdict(lambda: 0)
 
+    def refresh_known_good_nodes(self) -> None:
+        """
+        Reload the best nodes from our NodeDB.
+
+        This blocks on the DB, so it should be called from a thread other than the event loop's.
+        """
+        if self.node_db is None:
+            return
+        self._known_good_nodes = self.node_db.get_best_nodes(self.max_known_good_nodes)
+
     @to_tuple
     def _get_eligible_preferred_nodes(self) -> Iterator[kademlia.Node]:
         """
-        Return nodes from the preferred_nodes which have not been used within
-        the last preferred_node_recycle_time
+        Return nodes from the preferred_nodes, followed by the best ones in our NodeDB, which
+        have not been used within the last preferred_node_recycle_time
         """
-        for node in self.preferred_nodes:
+        candidates = itertools.chain(self.preferred_nodes, self._known_good_nodes)
+        for node in eth_utils.toolz.unique(candidates):
             last_used = self._preferred_node_tracker[node]
             if time.time() - last_used > self.preferred_node_recycle_time:
                 yield node
@@ -987,9 +1033,101 @@ class NoopDiscoveryService(BaseService):
         await self.cancel_token.wait()
 
 
+class DiscoveryPacketProcessor(BaseService):
+    """
+    Unpack incoming discovery packets in batches, in a separate thread.
+
+    Unpacking a packet involves a keccak and a public key recovery, which are too expensive to do
+    in the event loop for every packet we receive. Instead, packets are queued as they arrive and
+    unpacked in batches, with the event loop only running the handlers for the unpacked ones.
+    Packets are dropped when the queue is full or when their source has already sent us
+    max_packets_per_source packets in the current rate_limit_window.
+    """
+    max_queue_size = 2000
+    max_batch_size = 100
+    max_packets_per_source = 100
+    rate_limit_window = 1
+    _report_interval = 60
+
+    def __init__(self, proto: DiscoveryProtocol, token: CancelToken = None) -> None:
+        super().__init__(token)
+        self.proto = proto
+        self._queue: 'asyncio.Queue[Tuple[kademlia.Address, bytes]]' = asyncio.Queue(
+            self.max_queue_size)
+        self._packets_per_source: Counter[str] = collections.Counter()
+        self._rate_limit_window_start = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.processed_packets = 0
+        self.defective_packets = 0
+        self.rate_limited_packets = 0
+        self.dropped_packets = 0
+
+    def add(self, address: kademlia.Address, message: bytes) -> None:
+        now = time.monotonic()
+        if now - self._rate_limit_window_start > self.rate_limit_window:
+            self._packets_per_source.clear()
+            self._rate_limit_window_start = now
+        self._packets_per_source[address.ip] += 1
+        if self._packets_per_source[address.ip] > self.max_packets_per_source:
+            self.rate_limited_packets += 1
+            return
+        try:
+            self._queue.put_nowait((address, message))
+        except asyncio.QueueFull:
+            self.dropped_packets += 1
+
+    async def _run(self) -> None:
+        self.run_daemon_task(self._periodically_report_stats())
+        while self.is_operational:
+            batch = [await self.wait(self._queue.get())]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            results = await self._run_in_executor(
+                self._executor, _unpack_batch, [message for _, message in batch])
+            for (address, message), result in zip(batch, results):
+                self._handle_unpacked(address, message, result)
+
+    def _handle_unpacked(self,
+                         address: kademlia.Address,
+                         message: bytes,
+                         result: Union[UnpackedMessage, Exception]) -> None:
+        if isinstance(result, Exception):
+            self.defective_packets += 1
+            self.logger.error(
+                'error unpacking message (%s) from %s: %r', message, address, result)
+            return
+        self.processed_packets += 1
+        # Exceptions raised by handlers must not stop us from processing the remaining packets,
+        # so we log them just like asyncio would if they were raised in datagram_received().
+        try:
+            if message.startswith(V5_ID_STRING):
+                self.proto.receive_unpacked_v5(address, message, *result)
+            else:
+                self.proto.receive_unpacked(address, *result)
+        except Exception:
+            self.logger.exception("Unexpected error handling message from %s", address)
+
+    async def _periodically_report_stats(self) -> None:
+        while self.is_operational:
+            self.logger.debug(
+                "Discovery packets: processed=%d, defective=%d, rate_limited=%d, dropped=%d, "
+                "queued=%d",
+                self.processed_packets,
+                self.defective_packets,
+                self.rate_limited_packets,
+                self.dropped_packets,
+                self._queue.qsize(),
+            )
+            await self.sleep(self._report_interval)
+
+    async def _cleanup(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
 class DiscoveryService(BaseService):
     _last_lookup: float = 0
     _lookup_interval: int = 30
+    _known_good_nodes_refresh_interval: int = 30
 
     def __init__(self,
                  proto: DiscoveryProtocol,
@@ -1001,6 +1139,8 @@ class DiscoveryService(BaseService):
         self.port = port
         self._event_bus = event_bus
         self._lookup_running = asyncio.Lock()
+        self.packet_processor = DiscoveryPacketProcessor(proto, token=self.cancel_token)
+        self.proto.packet_processor = self.packet_processor
 
     async def handle_get_peer_candidates_requests(self) -> None:
         async for event in self.wait_iter(self._event_bus.stream(PeerCandidatesRequest)):
@@ -1029,11 +1169,23 @@ class DiscoveryService(BaseService):
     async def _run(self) -> None:
         self.run_daemon_task(self.handle_get_peer_candidates_requests())
         self.run_daemon_task(self.handle_get_random_bootnode_requests())
+        self.run_daemon(self.packet_processor)
+
+        if isinstance(self.proto, PreferredNodeDiscoveryProtocol):
+            await self._run_in_executor(None, self.proto.refresh_known_good_nodes)
+            self.run_daemon_task(self._periodically_refresh_known_good_nodes())
 
         await self._start_udp_listener()
         self.run_task(self.proto.bootstrap())
         await self.cancel_token.wait()
 
+    async def _periodically_refresh_known_good_nodes(self) -> None:
+        # The NodeDB is updated by the peer pool, in another process.
+        proto = cast(PreferredNodeDiscoveryProtocol, self.proto)
+        while self.is_operational:
+            await self.sleep(self._known_good_nodes_refresh_interval)
+            await self._run_in_executor(None, proto.refresh_known_good_nodes)
+
     async def _start_udp_listener(self) -> None:
         loop = asyncio.get_event_loop()
         # TODO: Support IPv6 addresses as well.
@@ -1181,7 +1333,7 @@ def _pack_v4(cmd_id: int, payload: Tuple[Any, ...], privkey: datatypes.PrivateKe
     return message_hash + signature.to_bytes() + encoded_data
 
 
-def _unpack_v4(message: bytes) -> Tuple[datatypes.PublicKey, int, Tuple[Any, ...], Hash32]:
+def _unpack_v4(message: bytes) -> UnpackedMessage:
     """Unpack a discovery v4 UDP message received from a remote node.
 
     Returns the public key used to sign the message, the cmd ID, payload and hash.
@@ -1212,7 +1364,7 @@ def _pack_v5(cmd_id: int, payload: Tuple[Any, ...], privkey: datatypes.PrivateKe
     return signature.to_bytes() + encoded_data
 
 
-def _unpack_v5(message: bytes) -> Tuple[datatypes.PublicKey, int, Tuple[Any, ...], Hash32]:
+def _unpack_v5(message: bytes) -> UnpackedMessage:
     """Unpack a discovery v5 UDP message received from a remote node.
 
     Returns the public key used to sign the message, the cmd ID, payload and msg hash.
@@ -1231,6 +1383,23 @@ def _unpack_v5(message: bytes) -> Tuple[datatypes.PublicKey, int, Tuple[Any, ...
     return remote_pubkey, cmd_id, payload, message_hash
 
 
+def _unpack_batch(messages: Sequence[bytes]) -> Tuple[Union[UnpackedMessage, Exception], ...]:
+    """Unpack the given v4/v5 messages, returning the exception raised for defective ones.
+
+    Used by DiscoveryPacketProcessor to unpack messages outside of the event loop.
+    """
+    results: List[Union[UnpackedMessage, Exception]] = []
+    for message in messages:
+        try:
+            if message.startswith(V5_ID_STRING):
+                results.append(_unpack_v5(message))
+            else:
+                results.append(_unpack_v4(message))
+        except Exception as e:
+            results.append(e)
+    return tuple(results)
+
+
 class CallbackLock:
     def __init__(self,
                  callback: Callable[..., Any],
@@ -0,0 +1,83 @@
+import asyncio
+
+# Number of bytes we try to read from the transport at a time. Most RLPx frames are much smaller
+# than this, so we can usually parse several of them out of a single read.
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class FrameReader:
+    """
+    Buffered reader for RLPx frames, reading from an ``asyncio.StreamReader``.
+
+    Data is read from the stream in large chunks into a reusable bytearray, and handed out as
+    ``memoryview`` slices of it to avoid copying frames around. A view returned by
+    :meth:`readexactly` or :meth:`consume` is only valid until the next call to either of them,
+    so callers must be done with it (or copy it) before reading again.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._reader = reader
+        self._chunk_size = chunk_size
+        self._buffer = bytearray(chunk_size)
+        self._view = memoryview(self._buffer)
+        # Buffered data that hasn't been consumed yet is in self._buffer[self._start:self._end]
+        self._start = 0
+        self._end = 0
+
+    @property
+    def buffered(self) -> int:
+        """Return the number of bytes that can be consumed without reading from the stream."""
+        return self._end - self._start
+
+    def consume(self, n: int) -> memoryview:
+        """Return a view of the next n buffered bytes.
+
+        Raises ValueError if there are less than n bytes buffered.
+        """
+        if n > self.buffered:
+            raise ValueError(f"Cannot consume {n} bytes, only {self.buffered} buffered")
+        start = self._start
+        self._start += n
+        return self._view[start:self._start]
+
+    async def readexactly(self, n: int) -> memoryview:
+        """Return a view of the next n bytes, reading from the stream if necessary.
+
+        Raises asyncio.IncompleteReadError if the stream reaches EOF before n bytes are read.
+        """
+        if n > self.buffered:
+            self._make_room(n)
+            while n > self.buffered:
+                # Read as much as we can fit in the buffer, so that subsequent frames can be
+                # consumed without waiting on the stream.
+                chunk = await self._reader.read(len(self._buffer) - self._end)
+                if not chunk:
+                    partial = bytes(self._view[self._start:self._end])
+                    self._start = self._end = 0
+                    raise asyncio.IncompleteReadError(partial, n)
+                self._buffer[self._end:self._end + len(chunk)] = chunk
+                self._end += len(chunk)
+        return self.consume(n)
+
+    def _make_room(self, n: int) -> None:
+        """Ensure the buffer has room for n bytes after the current read position.
+
+        Unconsumed data is moved to the start of the buffer, which is replaced with a larger one
+        if necessary (or with a default-sized one once we no longer need a larger one).
+        """
+        buffered = self.buffered
+        size = max(n, self._chunk_size)
+        if len(self._buffer) != size and (len(self._buffer) < n or n <= self._chunk_size):
+            # Views previously handed out may still be referenced, so instead of resizing the
+            # buffer (which would fail) we allocate a new one.
+            new_buffer = bytearray(size)
+            new_view = memoryview(new_buffer)
+            new_view[:buffered] = self._view[self._start:self._end]
+            self._buffer = new_buffer
+            self._view = new_view
+        elif self._start + n > len(self._buffer):
+            self._view[:buffered] = self._view[self._start:self._end]
+        else:
+            return
+        self._start = 0
+        self._end = buffered
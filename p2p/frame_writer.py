@@ -0,0 +1,63 @@
+import asyncio
+from typing import (
+    List,
+    cast,
+)
+
+# When the transport's write buffer grows past this many bytes, FrameWriter.drain_if_needed()
+# waits for it to be flushed.
+WRITE_HIGH_WATER_MARK = 4 * 1024 * 1024
+
+
+class FrameWriter:
+    """
+    Buffer frames written during an event loop iteration and hand them to the transport with a
+    single ``writelines()`` call at the end of it, so that pipelined frames don't cost one syscall
+    each.
+
+    Frames may be given as several parts (e.g. the separate parts returned by RLPx encryption), so
+    they don't need to be concatenated before being written.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+        # The event loop the writer's transport belongs to, where buffered frames are flushed.
+        self._loop: asyncio.AbstractEventLoop = writer._loop  # type: ignore
+        self._buffer: List[bytes] = []
+        self._buffer_size = 0
+        self._drain_lock = asyncio.Lock(loop=self._loop)
+        # Number of frames/bytes written so far.
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def write(self, *frame_parts: bytes) -> None:
+        if not self._buffer:
+            self._loop.call_soon(self._flush)
+        self._buffer.extend(frame_parts)
+        frame_size = sum(len(part) for part in frame_parts)
+        self._buffer_size += frame_size
+        self.frames_sent += 1
+        self.bytes_sent += frame_size
+
+    async def drain_if_needed(self) -> None:
+        """Wait for the transport's buffer to be flushed if it is above the high-water mark.
+
+        Frames we haven't handed to the transport yet count towards it, and are handed over
+        before we wait.
+        """
+        transport = cast(asyncio.WriteTransport, self._writer.transport)
+        if transport.get_write_buffer_size() + self._buffer_size > WRITE_HIGH_WATER_MARK:
+            self._flush()
+            # StreamWriter.drain() must not be awaited concurrently.
+            async with self._drain_lock:
+                await self._writer.drain()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def _flush(self) -> None:
+        if self._buffer and not self._writer.transport.is_closing():
+            self._writer.writelines(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
@@ -1,6 +1,8 @@
-import bisect
+import collections
 from functools import total_ordering
+import heapq
 import ipaddress
+import itertools
 import logging
 import operator
 import random
@@ -35,6 +37,7 @@ from trinity._utils.validation import validate_enode_uri
 k_b = 8  # 8 bits per hop
 
 k_bucket_size = 16
+k_max_replacements = 10                 # size of each bucket's replacement cache
 k_request_timeout = 7.2                  # timeout of message round trips
 k_idle_bucket_refresh_interval = 3600    # ping all nodes in bucket if bucket was idle
 k_find_concurrency = 3                   # parallel find node lookups
@@ -169,38 +172,16 @@ class KBucket(Sized):
         self.start = start
         self.end = end
         self.nodes: List[Node] = []
-        self.replacement_cache: List[Node] = []
+        # Keyed by node ID, least-recently seen first.
+        self.replacement_cache: 'collections.OrderedDict[int, Node]' = collections.OrderedDict()
         self.last_updated = time.monotonic()
 
-    @property
-    def midpoint(self) -> int:
-        return self.start + (self.end - self.start) // 2
-
-    def distance_to(self, id: int) -> int:
-        return self.midpoint ^ id
-
-    def nodes_by_distance_to(self, id: int) -> List[Node]:
-        return sorted(self.nodes, key=operator.methodcaller('distance_to', id))
-
-    def split(self) -> Tuple['KBucket', 'KBucket']:
-        """Split at the median id"""
-        splitid = self.midpoint
-        lower = KBucket(self.start, splitid)
-        upper = KBucket(splitid + 1, self.end)
-        for node in self.nodes:
-            bucket = lower if node.id <= splitid else upper
-            bucket.add(node)
-        for node in self.replacement_cache:
-            bucket = lower if node.id <= splitid else upper
-            bucket.replacement_cache.append(node)
-        return lower, upper
-
     def remove_node(self, node: Node) -> None:
         if node not in self:
             return
         self.nodes.remove(node)
         if self.replacement_cache:
-            replacement_node = self.replacement_cache.pop()
+            _, replacement_node = self.replacement_cache.popitem()
             self.nodes.append(replacement_node)
 
     def in_range(self, node: Node) -> bool:
@@ -218,9 +199,10 @@ class KBucket(Sized):
         If the node is not already present and the bucket has fewer than k entries, it is inserted
         at the tail of the list, and we return None.
 
-        If the bucket is full, we add the node to the bucket's replacement cache and return the
-        node at the head of the list (i.e. the least recently seen), which should be evicted if it
-        fails to respond to a ping.
+        If the bucket is full, we add the node to the tail of the bucket's replacement cache (or
+        move it there if it's already present), dropping the head of the cache if it has more than
+        k_max_replacements entries, and return the node at the head of the list (i.e. the least
+        recently seen), which should be evicted if it fails to respond to a ping.
         """
         self.last_updated = time.monotonic()
         if node in self.nodes:
@@ -229,7 +211,10 @@ class KBucket(Sized):
         elif len(self) < self.k:
             self.nodes.append(node)
         else:
-            self.replacement_cache.append(node)
+            self.replacement_cache.pop(node.id, None)
+            self.replacement_cache[node.id] = node
+            if len(self.replacement_cache) > k_max_replacements:
+                self.replacement_cache.popitem(last=False)
             return self.head
         return None
 
@@ -251,12 +236,20 @@ class KBucket(Sized):
 
 
 class RoutingTable:
+    """A Kademlia routing table with one bucket for every possible log-distance to our node.
+
+    The bucket at index i contains the nodes whose IDs share exactly k_id_size - i - 1 leading
+    bits with ours, i.e. those for which (node.id ^ this_node.id).bit_length() == i + 1. These
+    IDs form a contiguous range, so every bucket is created upfront and never needs to be split.
+    """
     logger = logging.getLogger("p2p.kademlia.RoutingTable")
 
     def __init__(self, node: Node) -> None:
         self._initialized_at = time.monotonic()
         self.this_node = node
-        self.buckets = [KBucket(0, k_max_node_id)]
+        self.buckets = [
+            KBucket(*_get_log_distance_range(node.id, i)) for i in range(k_id_size)
+        ]
 
     def get_random_nodes(self, count: int) -> Iterator[Node]:
         if count > len(self):
@@ -268,25 +261,18 @@ class RoutingTable:
                 )
             count = len(self)
         seen: List[Node] = []
+        non_empty_buckets = [bucket for bucket in self.buckets if bucket.nodes]
         # This is a rather inneficient way of randomizing nodes from all buckets, but even if we
         # iterate over all nodes in the routing table, the time it takes would still be
         # insignificant compared to the time it takes for the network roundtrips when connecting
         # to nodes.
         while len(seen) < count:
-            bucket = random.choice(self.buckets)
-            if not bucket.nodes:
-                continue
+            bucket = random.choice(non_empty_buckets)
             node = random.choice(bucket.nodes)
             if node not in seen:
                 yield node
                 seen.append(node)
 
-    def split_bucket(self, index: int) -> None:
-        bucket = self.buckets[index]
-        a, b = bucket.split()
-        self.buckets[index] = a
-        self.buckets.insert(index + 1, b)
-
     @property
     def idle_buckets(self) -> List[KBucket]:
         idle_cutoff_time = time.monotonic() - k_idle_bucket_refresh_interval
@@ -297,31 +283,37 @@ class RoutingTable:
         return [b for b in self.buckets if not b.is_full]
 
     def remove_node(self, node: Node) -> None:
-        binary_get_bucket_for_node(self.buckets, node).remove_node(node)
+        self.get_bucket_for_node(node).remove_node(node)
 
     def add_node(self, node: Node) -> Node:
+        """Try to add the given node to the routing table.
+
+        Returns None if it was added, or the least recently seen node of its bucket if that is
+        full, in which case it should be evicted if it fails to respond to a ping.
+        """
         if node == self.this_node:
             raise ValueError("Cannot add this_node to routing table")
-        bucket = binary_get_bucket_for_node(self.buckets, node)
-        eviction_candidate = bucket.add(node)
-        if eviction_candidate is not None:  # bucket is full
-            # Split if the bucket has the local node in its range or if the depth is not congruent
-            # to 0 mod k_b
-            depth = _compute_shared_prefix_bits(bucket.nodes)
-            if bucket.in_range(self.this_node) or (depth % k_b != 0 and depth != k_id_size):
-                self.split_bucket(self.buckets.index(bucket))
-                return self.add_node(node)  # retry
-            # Nothing added, ping eviction_candidate
-            return eviction_candidate
-        return None  # successfully added to not full bucket
+        return self.get_bucket_for_node(node).add(node)
 
     def get_bucket_for_node(self, node: Node) -> KBucket:
-        return binary_get_bucket_for_node(self.buckets, node)
+        return self.buckets[self._get_bucket_index(node.id)]
+
+    def _get_bucket_index(self, node_id: int) -> int:
+        distance = self.this_node.id ^ node_id
+        if not 0 < distance <= k_max_node_id:
+            raise ValueError(f"No bucket found for node with id {node_id}")
+        return distance.bit_length() - 1
 
-    def buckets_by_distance_to(self, id: int) -> List[KBucket]:
-        return sorted(self.buckets, key=operator.methodcaller('distance_to', id))
+    def is_known(self, node: Node) -> bool:
+        """Return True if the given node is in its bucket or in that bucket's replacement cache."""
+        if node.id == self.this_node.id:
+            return False
+        bucket = self.get_bucket_for_node(node)
+        return node in bucket or node.id in bucket.replacement_cache
 
     def __contains__(self, node: Node) -> bool:
+        if node.id == self.this_node.id:
+            return False
         return node in self.get_bucket_for_node(node)
 
     def __len__(self) -> int:
@@ -333,17 +325,41 @@ class RoutingTable:
                 yield n
 
     def neighbours(self, node_id: int, k: int = k_bucket_size) -> List[Node]:
-        """Return up to k neighbours of the given node."""
-        nodes = []
-        # Sorting by bucket.midpoint does not work in edge cases, so build a short list of k * 2
-        # nodes and sort it by distance_to.
-        for bucket in self.buckets_by_distance_to(node_id):
-            for n in bucket.nodes_by_distance_to(node_id):
-                if n is not node_id:
-                    nodes.append(n)
-                    if len(nodes) == k * 2:
-                        break
-        return sort_by_distance(nodes, node_id)[:k]
+        """Return up to k neighbours of the given node, closest first.
+
+        If the target is in bucket j, the nodes in that bucket are closer to it than any others.
+        Then come the nodes in all buckets below j, which are all at the same log-distance
+        (j + 1) from the target, followed by the nodes in buckets j + 1, j + 2, and so on, in
+        that order. So we only need to sort nodes within those groups and can stop as soon as
+        we have k of them.
+        """
+        # This is -1 if node_id is our own ID, in which case buckets are already in order.
+        target_index = (self.this_node.id ^ node_id).bit_length() - 1
+        nodes: List[Node] = []
+        if target_index >= 0:
+            nodes.extend(sort_by_distance(self.buckets[target_index].nodes, node_id))
+            if len(nodes) < k:
+                nodes.extend(heapq.nsmallest(
+                    k - len(nodes),
+                    itertools.chain.from_iterable(
+                        bucket.nodes for bucket in self.buckets[:target_index]),
+                    key=operator.methodcaller('distance_to', node_id),
+                ))
+        for bucket in self.buckets[target_index + 1:]:
+            if len(nodes) >= k:
+                break
+            nodes.extend(sort_by_distance(bucket.nodes, node_id))
+        return nodes[:k]
+
+
+def _get_log_distance_range(node_id: int, log_distance: int) -> Tuple[int, int]:
+    """Return the range of IDs whose XOR distance to node_id has its highest bit at log_distance.
+
+    Those share all bits above log_distance with node_id, have the opposite bit at log_distance
+    and any combination of bits below it.
+    """
+    start = ((node_id >> log_distance) ^ 1) << log_distance
+    return start, start + (1 << log_distance) - 1
 
 
 def check_relayed_addr(sender: Address, addr: Address) -> bool:
@@ -363,36 +379,5 @@ def check_relayed_addr(sender: Address, addr: Address) -> bool:
     return True
 
 
-def binary_get_bucket_for_node(buckets: List[KBucket], node: Node) -> KBucket:
-    """Given a list of ordered buckets, returns the bucket for a given node."""
-    bucket_ends = [bucket.end for bucket in buckets]
-    bucket_position = bisect.bisect_left(bucket_ends, node.id)
-    # Prevents edge cases where bisect_left returns an out of range index
-    try:
-        bucket = buckets[bucket_position]
-        assert bucket.start <= node.id <= bucket.end
-        return bucket
-    except (IndexError, AssertionError):
-        raise ValueError(f"No bucket found for node with id {node.id}")
-
-
-def _compute_shared_prefix_bits(nodes: List[Node]) -> int:
-    """Count the number of prefix bits shared by all nodes."""
-    def to_binary(x: int) -> str:  # left padded bit representation
-        b = bin(x)[2:]
-        return '0' * (k_id_size - len(b)) + b
-
-    if len(nodes) < 2:
-        return k_id_size
-
-    bits = [to_binary(n.id) for n in nodes]
-    for i in range(1, k_id_size + 1):
-        if len(set(b[:i] for b in bits)) != 1:
-            return i - 1
-    # This means we have at least two nodes with the same ID, so raise an AssertionError
-    # because we don't want it to be caught accidentally.
-    raise AssertionError("Unable to calculate number of shared prefix bits")
-
-
 def sort_by_distance(nodes: List[Node], target_id: int) -> List[Node]:
     return sorted(nodes, key=operator.methodcaller('distance_to', target_id))
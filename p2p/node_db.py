@@ -0,0 +1,159 @@
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import (
+    Any,
+    List,
+    Tuple,
+)
+
+from p2p.kademlia import Node
+
+# Changes to a node's score when we connect to it, fail to connect to it, or when we disconnect
+# from it because it misbehaved.
+HANDSHAKE_SUCCESS_SCORE = 1
+HANDSHAKE_FAILURE_SCORE = -1
+MISBEHAVIOUR_SCORE = -10
+
+# Number of seconds during which a node is not offered as a connection candidate after we
+# failed to connect to it.
+FAILURE_BACKOFF = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    enode TEXT PRIMARY KEY,
+    score INTEGER NOT NULL DEFAULT 0,
+    handshake_successes INTEGER NOT NULL DEFAULT 0,
+    handshake_failures INTEGER NOT NULL DEFAULT 0,
+    sub_protocol TEXT,
+    throughput REAL NOT NULL DEFAULT 0,
+    last_seen REAL,
+    last_failure REAL,
+    last_failure_reason TEXT,
+    last_disconnect_reason TEXT
+)
+"""
+
+
+class NodeDB:
+    """
+    A persistent record of the nodes we've connected to (or tried to), backed by SQLite.
+
+    Every node has a reputation score, which goes up whenever we complete a handshake with it
+    and down when that fails or when we disconnect from it because it misbehaved. This allows
+    us to try historically good nodes first when (re)starting, instead of waiting for discovery
+    to find them again.
+
+    The DB is written by the peer pool and read by the discovery service, which run in separate
+    processes, so every process must create its own instance.
+
+    Updates are only queued when recorded, and written to the DB (in a single transaction) by
+    :meth:`flush`, which may be called from another thread so that the commit doesn't block the
+    event loop. Queued updates are also written before reading from the DB and on :meth:`close`.
+    """
+    logger = logging.getLogger('p2p.node_db.NodeDB')
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=5, check_same_thread=False)
+        # WAL allows the discovery process to read the DB while the peer pool writes to it, and
+        # as we only record (small) updates we don't need to fsync after every commit.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+        # Statements (and their parameters) recorded since the last flush.
+        self._pending_updates: List[Tuple[str, Tuple[Any, ...]]] = []
+        # Guards _pending_updates, and is never held while using the connection so that
+        # recording an update doesn't wait for a commit to finish.
+        self._pending_lock = threading.Lock()
+        self._conn_lock = threading.Lock()
+
+    def flush(self) -> None:
+        """Write all queued updates to the DB."""
+        with self._conn_lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._conn_lock:
+            self._flush()
+            self._conn.close()
+
+    def record_handshake_success(self, remote: Node, sub_protocol: str) -> None:
+        self._update(
+            remote,
+            "UPDATE nodes SET score = score + ?, handshake_successes = handshake_successes + 1,"
+            " sub_protocol = ?, last_seen = ? WHERE enode = ?",
+            (HANDSHAKE_SUCCESS_SCORE, sub_protocol, time.time(), remote.uri()),
+        )
+
+    def record_handshake_failure(self, remote: Node, reason: str) -> None:
+        self._update(
+            remote,
+            "UPDATE nodes SET score = score + ?, handshake_failures = handshake_failures + 1,"
+            " last_failure = ?, last_failure_reason = ? WHERE enode = ?",
+            (HANDSHAKE_FAILURE_SCORE, time.time(), reason, remote.uri()),
+        )
+
+    def record_disconnect(self,
+                          remote: Node,
+                          reason: str,
+                          misbehaved: bool,
+                          throughput: float) -> None:
+        """Record that we're no longer connected to the given remote.
+
+        The throughput is only recorded if non-zero, so that a short-lived connection doesn't
+        overwrite what we measured in previous ones.
+        """
+        score_change = MISBEHAVIOUR_SCORE if misbehaved else 0
+        self._update(
+            remote,
+            "UPDATE nodes SET score = score + ?, last_seen = ?, last_disconnect_reason = ?,"
+            " throughput = CASE WHEN ? > 0 THEN ? ELSE throughput END WHERE enode = ?",
+            (score_change, time.time(), reason, throughput, throughput, remote.uri()),
+        )
+
+    def get_score(self, remote: Node) -> int:
+        """Return the given remote's score, or 0 if we know nothing about it."""
+        with self._conn_lock:
+            self._flush()
+            row = self._conn.execute(
+                "SELECT score FROM nodes WHERE enode = ?", (remote.uri(),)).fetchone()
+        if row is None:
+            return 0
+        return row[0]
+
+    def get_best_nodes(self, count: int) -> Tuple[Node, ...]:
+        """Return up to count nodes with a positive score, best ones first.
+
+        Nodes are ranked by score and then by throughput. Those we failed to connect to in the
+        last FAILURE_BACKOFF seconds are skipped.
+        """
+        with self._conn_lock:
+            self._flush()
+            rows = self._conn.execute(
+                "SELECT enode FROM nodes WHERE score > 0"
+                " AND (last_failure IS NULL OR last_failure < ?)"
+                " ORDER BY score DESC, throughput DESC LIMIT ?",
+                (time.time() - FAILURE_BACKOFF, count),
+            ).fetchall()
+        return tuple(Node.from_uri(enode) for enode, in rows)
+
+    def _update(self, remote: Node, statement: str, params: Tuple[Any, ...]) -> None:
+        with self._pending_lock:
+            self._pending_updates.append(
+                ("INSERT OR IGNORE INTO nodes (enode) VALUES (?)", (remote.uri(),)))
+            self._pending_updates.append((statement, params))
+
+    def _flush(self) -> None:
+        # Must be called with self._conn_lock held.
+        with self._pending_lock:
+            updates, self._pending_updates = self._pending_updates, []
+        if not updates:
+            return
+        with self._conn:
+            for statement, params in updates:
+                self._conn.execute(statement, params)
@@ -3,7 +3,8 @@ from typing import (
     cast,
     Any,
     Dict,
-    TYPE_CHECKING
+    TYPE_CHECKING,
+    Union,
 )
 
 from eth_utils.toolz import assoc
@@ -36,7 +37,7 @@ class Hello(Command):
         ('remote_pubkey', sedes.binary)
     ]
 
-    def decompress_payload(self, raw_payload: bytes) -> bytes:
+    def decompress_payload(self, raw_payload: Union[bytes, memoryview]) -> Union[bytes, memoryview]:
         # The `Hello` command doesn't support snappy compression
         return raw_payload
 
@@ -73,12 +74,12 @@ class Disconnect(Command):
         except ValueError:
             return "unknown reason"
 
-    def decode(self, data: bytes) -> _DecodedMsgType:
+    def decode(self, data: Union[bytes, memoryview]) -> _DecodedMsgType:
         try:
             raw_decoded = cast(Dict[str, int], super().decode(data))
         except rlp.exceptions.ListDeserializationError:
-            self.logger.warning("Malformed Disconnect message: %s", data)
-            raise MalformedMessage(f"Malformed Disconnect message: {data}")
+            self.logger.warning("Malformed Disconnect message: %s", bytes(data))
+            raise MalformedMessage(f"Malformed Disconnect message: {bytes(data)}")
         return assoc(raw_decoded, 'reason_name', self.get_reason_name(raw_decoded['reason']))
 
 
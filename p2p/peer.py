@@ -22,6 +22,7 @@ from typing import (
     Tuple,
     Type,
     TYPE_CHECKING,
+    Union,
 )
 
 import sha3
@@ -39,6 +40,8 @@ from eth_utils import (
 
 from eth_keys import datatypes
 
+from eth.tools.logging import DEBUG2_LEVEL_NUM
+
 from cancel_token import CancelToken
 
 from p2p import auth
@@ -57,9 +60,12 @@ from p2p.exceptions import (
     UnknownProtocolCommand,
     UnreachablePeer,
 )
+from p2p.frame_reader import FrameReader
+from p2p.frame_writer import FrameWriter
 from p2p.service import BaseService
 from p2p._utils import (
     get_devp2p_cmd_id,
+    get_msg_decoding_executor,
     roundup_16,
     sxor,
     time_since,
@@ -173,6 +179,9 @@ class BasePeer(BaseService):
     listen_port = 30303
     # Will be set upon the successful completion of a P2P handshake.
     sub_proto: protocol.Protocol = None
+    # Set when either we or the remote disconnect, respectively.
+    disconnect_reason: DisconnectReason = None
+    remote_disconnect_reason: str = None
 
     def __init__(self,
                  remote: Node,
@@ -196,6 +205,11 @@ class BasePeer(BaseService):
         # Networking reader and writer objects for communication
         self.reader = connection.reader
         self.writer = connection.writer
+        # All reads from self.reader must go through this, as it may buffer data read from it.
+        self.frame_reader = FrameReader(self.reader)
+        # Likewise, all writes must go through this as it buffers them until the end of the
+        # current event loop iteration.
+        self.frame_writer = FrameWriter(self.writer)
         # Initially while doing the handshake, the base protocol shouldn't support
         # snappy compression
         self.base_protocol = P2PProtocol(self, snappy_support=False)
@@ -235,6 +249,13 @@ class BasePeer(BaseService):
     def get_extra_stats(self) -> List[str]:
         return []
 
+    def get_throughput(self) -> float:
+        """Return how many items per second we've been receiving from this peer.
+
+        Recorded in the NodeDB when we disconnect, to help choose which nodes to reconnect to.
+        """
+        return 0.0
+
     @property
     def boot_manager_class(self) -> Type[BasePeerBootManager]:
         return BasePeerBootManager
@@ -267,6 +288,14 @@ class BasePeer(BaseService):
     def received_msgs_count(self) -> int:
         return sum(self.received_msgs.values())
 
+    @property
+    def sent_frames_count(self) -> int:
+        return self.frame_writer.frames_sent
+
+    @property
+    def sent_bytes_count(self) -> int:
+        return self.frame_writer.bytes_sent
+
     @property
     def uptime(self) -> str:
         return '%d:%02d:%02d:%02d' % time_since(self.start_time)
@@ -325,7 +354,7 @@ class BasePeer(BaseService):
     def capabilities(self) -> List[Tuple[str, int]]:
         return [(klass.name, klass.version) for klass in self._supported_sub_protocols]
 
-    def get_protocol_command_for(self, msg: bytes) -> protocol.Command:
+    def get_protocol_command_for(self, msg: Union[bytes, memoryview]) -> protocol.Command:
         """Return the Command corresponding to the cmd_id encoded in the given msg."""
         cmd_id = get_devp2p_cmd_id(msg)
         self.logger.debug2("Got msg with cmd_id: %s", cmd_id)
@@ -336,10 +365,19 @@ class BasePeer(BaseService):
         else:
             raise UnknownProtocolCommand(f"No protocol found for cmd_id {cmd_id}")
 
-    async def read(self, n: int) -> bytes:
+    async def read(self, n: int) -> memoryview:
+        """Return a view of the next n bytes sent by the remote.
+
+        The returned view is only valid until the next call to this method.
+        """
+        if self.frame_reader.buffered >= n:
+            # We read from the transport in large chunks, so most of the time the data we want
+            # is already buffered and there's no need to wait for it.
+            return self.frame_reader.consume(n)
         self.logger.debug2("Waiting for %s bytes from %s", n, self.remote)
         try:
-            return await self.wait(self.reader.readexactly(n), timeout=self.conn_idle_timeout)
+            return await self.wait(
+                self.frame_reader.readexactly(n), timeout=self.conn_idle_timeout)
         except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError) as e:
             raise PeerConnectionLost(repr(e))
 
@@ -352,7 +390,7 @@ class BasePeer(BaseService):
         """
         if not self.reader.at_eof():
             self.reader.feed_eof()
-        self.writer.close()
+        self.frame_writer.close()
 
     @property
     def is_closing(self) -> bool:
@@ -414,12 +452,8 @@ class BasePeer(BaseService):
             )
             raise MalformedMessage from err
         cmd = self.get_protocol_command_for(msg)
-        # NOTE: This used to be a bottleneck but it doesn't seem to be so anymore. If we notice
-        # too much time is being spent on this again, we need to consider running this in a
-        # ProcessPoolExecutor(). Need to make sure we don't use all CPUs in the machine for that,
-        # though, otherwise asyncio's event loop can't run and we can't keep up with other peers.
         try:
-            decoded_msg = cast(Dict[str, Any], cmd.decode(msg))
+            decoded_msg = cast(Dict[str, Any], await self.decode_msg(cmd, msg))
         except MalformedMessage as err:
             self.logger.debug(
                 "Malformed message from peer %s: CMD:%s Error: %r",
@@ -431,16 +465,33 @@ class BasePeer(BaseService):
             self.received_msgs[cmd] += 1
             return cmd, decoded_msg
 
+    async def decode_msg(
+            self, cmd: protocol.Command, msg: Union[bytes, memoryview]) -> protocol.PayloadType:
+        """Decode the given msg, in the msg decoding executor if it's large enough.
+
+        With many peers streaming large msgs (e.g. block bodies or receipts), decoding them in the
+        event loop would block it for too long, so when the msg decoding executor has been
+        started, msgs for which `cmd.is_decoding_slow` is set are decoded there if they're larger
+        than its threshold. We wait for the result before reading this peer's next msg, so
+        msgs are still processed in the order they were received.
+        """
+        executor, size_threshold = get_msg_decoding_executor()
+        if executor is not None and cmd.is_decoding_slow and len(msg) >= size_threshold:
+            return await self._run_in_executor(executor, cmd.decode, bytes(msg))
+        else:
+            return cmd.decode(msg)
+
     def handle_p2p_msg(self, cmd: protocol.Command, msg: protocol.PayloadType) -> None:
         """Handle the base protocol (P2P) messages."""
         if isinstance(cmd, Disconnect):
             msg = cast(Dict[str, Any], msg)
+            self.remote_disconnect_reason = msg['reason_name']
             raise RemoteDisconnected(msg['reason_name'])
         elif isinstance(cmd, Ping):
             self.base_protocol.send_pong()
         elif isinstance(cmd, Pong):
-            # Currently we don't do anything when we get a pong, but eventually we should
-            # update the last time we heard from a peer in our DB (which doesn't exist yet).
+            # Currently we don't do anything when we get a pong. The last time we heard from a
+            # peer is recorded in the NodeDB by our PeerPool when we disconnect.
             pass
         else:
             raise UnexpectedMessage(f"Unexpected msg: {cmd} ({msg})")
@@ -501,6 +552,9 @@ class BasePeer(BaseService):
             self.remote, self.sub_proto)
 
     def encrypt(self, header: bytes, frame: bytes) -> bytes:
+        return b''.join(self._encrypt(header, frame))
+
+    def _encrypt(self, header: bytes, frame: bytes) -> Tuple[bytes, bytes, bytes, bytes]:
         if len(header) != HEADER_LEN:
             raise ValueError(f"Unexpected header length: {len(header)}")
 
@@ -517,9 +571,9 @@ class BasePeer(BaseService):
         self.egress_mac.update(sxor(self.mac_enc(mac_secret), fmac_seed))
         frame_mac = self.egress_mac.digest()[:HEADER_LEN]
 
-        return header_ciphertext + header_mac + frame_ciphertext + frame_mac
+        return header_ciphertext, header_mac, frame_ciphertext, frame_mac
 
-    def decrypt_header(self, data: bytes) -> bytes:
+    def decrypt_header(self, data: Union[bytes, memoryview]) -> bytes:
         if len(data) != HEADER_LEN + MAC_LEN:
             raise ValueError(
                 f"Unexpected header length: {len(data)}, expected {HEADER_LEN} + {MAC_LEN}"
@@ -531,13 +585,13 @@ class BasePeer(BaseService):
         aes = self.mac_enc(mac_secret)[:HEADER_LEN]
         self.ingress_mac.update(sxor(aes, header_ciphertext))
         expected_header_mac = self.ingress_mac.digest()[:HEADER_LEN]
-        if not bytes_eq(expected_header_mac, header_mac):
+        if not bytes_eq(expected_header_mac, bytes(header_mac)):
             raise DecryptionError(
-                f'Invalid header mac: expected {expected_header_mac}, got {header_mac}'
+                f'Invalid header mac: expected {expected_header_mac}, got {bytes(header_mac)}'
             )
         return self.aes_dec.update(header_ciphertext)
 
-    def decrypt_body(self, data: bytes, body_size: int) -> bytes:
+    def decrypt_body(self, data: Union[bytes, memoryview], body_size: int) -> memoryview:
         read_size = roundup_16(body_size)
         if len(data) < read_size + MAC_LEN:
             raise ValueError(
@@ -551,11 +605,16 @@ class BasePeer(BaseService):
         fmac_seed = self.ingress_mac.digest()[:MAC_LEN]
         self.ingress_mac.update(sxor(self.mac_enc(fmac_seed), fmac_seed))
         expected_frame_mac = self.ingress_mac.digest()[:MAC_LEN]
-        if not bytes_eq(expected_frame_mac, frame_mac):
+        if not bytes_eq(expected_frame_mac, bytes(frame_mac)):
             raise DecryptionError(
-                f'Invalid frame mac: expected {expected_frame_mac}, got {frame_mac}'
+                f'Invalid frame mac: expected {expected_frame_mac}, got {bytes(frame_mac)}'
             )
-        return self.aes_dec.update(frame_ciphertext)[:body_size]
+        # Decrypt straight into a buffer of our own, as update() copies its output twice, and return
+        # a view of it to avoid copying the (potentially large) frame just to drop its padding.
+        # update_into() needs room for one more block than the ciphertext.
+        plaintext = bytearray(read_size + algorithms.AES.block_size // 8 - 1)
+        self.aes_dec.update_into(frame_ciphertext, plaintext)
+        return memoryview(plaintext)[:body_size]
 
     def get_frame_size(self, header: bytes) -> int:
         # The frame size is encoded in the header as a 3-byte int, so before we unpack we need
@@ -565,13 +624,26 @@ class BasePeer(BaseService):
         return size
 
     def send(self, header: bytes, body: bytes) -> None:
-        cmd_id = rlp.decode(body[:1], sedes=rlp.sedes.big_endian_int)
-        self.logger.debug2("Sending msg with cmd id %d to %s", cmd_id, self)
         if self.is_closing:
             self.logger.error(
-                "Attempted to send msg with cmd id %d to disconnected peer %s", cmd_id, self)
+                "Attempted to send msg with cmd id %d to disconnected peer %s",
+                get_devp2p_cmd_id(body), self)
             return
-        self.writer.write(self.encrypt(header, body))
+        if self.logger.isEnabledFor(DEBUG2_LEVEL_NUM):
+            self.logger.debug2("Sending msg with cmd id %d to %s", get_devp2p_cmd_id(body), self)
+        self.frame_writer.write(*self._encrypt(header, body))
+
+    async def drain(self) -> None:
+        """Wait until the transport's write buffer is below its high-water mark.
+
+        Msgs are sent without waiting for them to be written to the socket, so code sending
+        lots of data to a peer should use this to avoid buffering too much of it in memory.
+        """
+        try:
+            await self.wait(self.frame_writer.drain_if_needed())
+        except (ConnectionResetError, BrokenPipeError) as err:
+            # Our read loop will notice it too, and stop this peer.
+            self.logger.debug("Connection to %s lost while draining: %r", self, err)
 
     def _disconnect(self, reason: DisconnectReason) -> None:
         if not isinstance(reason, DisconnectReason):
@@ -579,6 +651,7 @@ class BasePeer(BaseService):
                 f"Reason must be an item of DisconnectReason, got {reason}"
             )
         self.logger.debug("Disconnecting from remote peer %s; reason: %s", self.remote, reason.name)
+        self.disconnect_reason = reason
         self.base_protocol.send_disconnect(reason.value)
         self.close()
 
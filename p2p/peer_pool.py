@@ -3,6 +3,7 @@ from abc import (
 )
 import asyncio
 import operator
+import time
 from typing import (
     AsyncIterator,
     AsyncIterable,
@@ -10,6 +11,7 @@ from typing import (
     Dict,
     Iterator,
     List,
+    Set,
     Tuple,
     Type,
 )
@@ -29,6 +31,8 @@ from lahja import (
 )
 
 from p2p.constants import (
+    DEFAULT_DIAL_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_DIALS,
     DEFAULT_MAX_PEERS,
     DEFAULT_PEER_BOOT_TIMEOUT,
     DISOVERY_INTERVAL,
@@ -52,6 +56,9 @@ from p2p.kademlia import (
     from_uris,
     Node,
 )
+from p2p.node_db import (
+    NodeDB,
+)
 from p2p.peer import (
     BasePeer,
     BasePeerFactory,
@@ -68,30 +75,54 @@ from p2p.service import (
 )
 
 
+# When we disconnect from a peer for any of these reasons, its score in our NodeDB is lowered.
+MISBEHAVIOUR_DISCONNECT_REASONS = (
+    DisconnectReason.bad_protocol,
+    DisconnectReason.subprotocol_error,
+    DisconnectReason.useless_peer,
+)
+
+
 class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
     """
     PeerPool maintains connections to up-to max_peers on a given network.
     """
     _report_interval = 60
+    # Number of seconds between writes of the connection outcomes we queued in our NodeDB.
+    _node_db_flush_interval = 5
     _peer_boot_timeout = DEFAULT_PEER_BOOT_TIMEOUT
+    _max_concurrent_dials = DEFAULT_MAX_CONCURRENT_DIALS
+    _dial_timeout = DEFAULT_DIAL_TIMEOUT
 
     def __init__(self,
                  privkey: datatypes.PrivateKey,
                  context: BasePeerContext,
                  max_peers: int = DEFAULT_MAX_PEERS,
                  token: CancelToken = None,
-                 event_bus: Endpoint = None
+                 event_bus: Endpoint = None,
+                 node_db: NodeDB = None,
                  ) -> None:
         super().__init__(token)
 
         self.privkey = privkey
         self.max_peers = max_peers
         self.context = context
+        # Where we record the outcome of our connections, if given.
+        self.node_db = node_db
 
         self.connected_nodes: Dict[Node, BasePeer] = {}
         self._subscribers: List[PeerSubscriber] = []
         self.event_bus = event_bus
 
+        # Dialing stats, included in our periodic reports.
+        self._dial_attempts = 0
+        self._dial_successes = 0
+        # Peers we dialed that are booting; they count against max_peers so that dials completing
+        # together don't overfill the pool.
+        self._num_booting_peers = 0
+        self._start_time: float = None
+        self._time_to_full: float = None
+
     async def accept_connect_commands(self) -> None:
         async for command in self.wait_iter(self.event_bus.stream(ConnectToNodeCommand)):
             self.logger.debug('Received request to connect to %s', command.node)
@@ -196,10 +227,14 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
             await peer.disconnect(DisconnectReason.timeout)
             return
         else:
-            if peer.is_operational:
-                self._add_peer(peer, buffer.get_messages())
-            else:
+            if not peer.is_operational:
                 self.logger.debug('%s disconnected during boot-up, not adding to pool', peer)
+            elif self.is_full:
+                # Other peers were added while this one was booting.
+                self.logger.debug("Pool filled up while %s was booting, disconnecting", peer)
+                await peer.disconnect(DisconnectReason.too_many_peers)
+            else:
+                self._add_peer(peer, buffer.get_messages())
 
     def _add_peer(self,
                   peer: BasePeer,
@@ -211,6 +246,12 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
         """
         self.logger.info('Adding %s to pool', peer)
         self.connected_nodes[peer.remote] = peer
+        if self.node_db is not None:
+            self.node_db.record_handshake_success(
+                peer.remote, f"{peer.sub_proto.name}/{peer.sub_proto.version}")
+        if self.is_full and self._time_to_full is None and self._start_time is not None:
+            self._time_to_full = time.monotonic() - self._start_time
+            self.logger.info("Peer pool filled up in %.1f seconds", self._time_to_full)
         peer.add_finished_callback(self._peer_finished)
         for subscriber in self._subscribers:
             subscriber.register_peer(peer)
@@ -219,6 +260,7 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
                 subscriber.add_msg(msg)
 
     async def _run(self) -> None:
+        self._start_time = time.monotonic()
         # FIXME: PeerPool should probably no longer be a BaseService, but for now we're keeping it
         # so in order to ensure we cancel all peers when we terminate.
         if self.event_bus is not None:
@@ -226,6 +268,8 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
             self.run_daemon_task(self.maybe_connect_more_peers())
             self.run_daemon_task(self.accept_connect_commands())
         self.run_daemon_task(self._periodically_report_stats())
+        if self.node_db is not None:
+            self.run_daemon_task(self._periodically_flush_node_db())
         await self.cancel_token.wait()
 
     async def stop_all_peers(self) -> None:
@@ -237,11 +281,17 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
 
     async def _cleanup(self) -> None:
         await self.stop_all_peers()
+        if self.node_db is not None:
+            # Peers record their disconnection in the NodeDB when they finish, so it must only
+            # be closed once they're all stopped.
+            await self.get_event_loop().run_in_executor(None, self.node_db.close)
 
-    async def connect(self, remote: Node) -> BasePeer:
+    async def connect(self, remote: Node, token: CancelToken = None) -> BasePeer:
         """
         Connect to the given remote and return a Peer instance when successful.
         Returns None if the remote is unreachable, times out or is useless.
+
+        If given, the token is chained with ours, and triggering it aborts the connection attempt.
         """
         if remote in self.connected_nodes:
             self.logger.debug("Skipping %s; already connected to it", remote)
@@ -256,41 +306,108 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
             self.logger.debug2("Connecting to %s...", remote)
             # We use self.wait() as well as passing our CancelToken to handshake() as a workaround
             # for https://github.com/ethereum/py-evm/issues/670.
-            peer = await self.wait(handshake(remote, self.get_peer_factory()))
+            peer = await self.wait(
+                handshake(remote, self.get_peer_factory()),
+                token=token,
+                timeout=self._dial_timeout,
+            )
 
             return peer
         except OperationCancelled:
             # Pass it on to instruct our main loop to stop.
             raise
-        except BadAckMessage:
+        except BadAckMessage as e:
             # This is kept separate from the `expected_exceptions` to be sure that we aren't
             # silencing an error in our authentication code.
             self.logger.error('Got bad auth ack from %r', remote)
             # dump the full stacktrace in the debug logs
             self.logger.debug('Got bad auth ack from %r', remote, exc_info=True)
-        except MalformedMessage:
+            self._record_handshake_failure(remote, e)
+        except MalformedMessage as e:
             # This is kept separate from the `expected_exceptions` to be sure that we aren't
             # silencing an error in how we decode messages during handshake.
             self.logger.error('Got malformed response from %r during handshake', remote)
             # dump the full stacktrace in the debug logs
             self.logger.debug('Got malformed response from %r', remote, exc_info=True)
+            self._record_handshake_failure(remote, e)
         except expected_exceptions as e:
             self.logger.debug("Could not complete handshake with %r: %s", remote, repr(e))
-        except Exception:
+            self._record_handshake_failure(remote, e)
+        except Exception as e:
             self.logger.exception("Unexpected error during auth/p2p handshake with %r", remote)
+            self._record_handshake_failure(remote, e)
         return None
 
+    def _record_handshake_failure(self, remote: Node, error: Exception) -> None:
+        if self.node_db is not None:
+            self.node_db.record_handshake_failure(remote, error.__class__.__name__)
+
     async def connect_to_nodes(self, nodes: Iterator[Node]) -> None:
-        for node in nodes:
-            if self.is_full or not self.is_operational:
-                return
+        """Connect to the given nodes until our pool is full.
+
+        Up to self._max_concurrent_dials nodes are dialed concurrently, and once our pool is full
+        any dials still in progress are cancelled. Returns when there are no more nodes to dial
+        and all dials have completed.
+        """
+        # Triggered once we're full, to abort any pending dials.
+        dials_token = CancelToken('connect_to_nodes').chain(self.cancel_token)
+        dial_slots = asyncio.Semaphore(self._max_concurrent_dials)
+        pending_dials: Set['asyncio.Future[None]'] = set()
+
+        def on_dial_done(dial: 'asyncio.Future[None]') -> None:
+            pending_dials.discard(dial)
+            dial_slots.release()
+            if not dial.cancelled() and dial.exception() is not None:
+                self.logger.error(
+                    "Unexpected error dialing node: %r",
+                    dial.exception(),
+                    exc_info=dial.exception(),
+                )
+
+        try:
+            for node in nodes:
+                await self.wait(dial_slots.acquire(), token=dials_token)
+                if self.is_full or not self.is_operational:
+                    dial_slots.release()
+                    break
+                dial = asyncio.ensure_future(self._dial(node, dials_token))
+                pending_dials.add(dial)
+                dial.add_done_callback(on_dial_done)
+        except OperationCancelled:
+            if self.cancel_token.triggered:
+                raise
+        finally:
+            if pending_dials:
+                await asyncio.wait(pending_dials)
+
+    async def _dial(self, remote: Node, dials_token: CancelToken) -> None:
+        self._dial_attempts += 1
+        # TODO: Consider changing connect() to raise an exception instead of returning None,
+        # as discussed in
+        # https://github.com/ethereum/py-evm/pull/139#discussion_r152067425
+        try:
+            peer = await self.connect(remote, token=dials_token)
+        except OperationCancelled:
+            return
+        if peer is None:
+            return
 
-            # TODO: Consider changing connect() to raise an exception instead of returning None,
-            # as discussed in
-            # https://github.com/ethereum/py-evm/pull/139#discussion_r152067425
-            peer = await self.connect(node)
-            if peer is not None:
-                await self.start_peer(peer)
+        self._dial_successes += 1
+        if len(self) + self._num_booting_peers >= self.max_peers:
+            # Other dials completed while this one was in progress.
+            self.logger.debug("Pool filled up while connecting to %s, disconnecting", peer)
+            await peer.disconnect(DisconnectReason.too_many_peers)
+            return
+
+        # Reserve a slot in the pool for the peer while it boots, released once it's either added
+        # to the pool or failed to boot.
+        self._num_booting_peers += 1
+        try:
+            await self.start_peer(peer)
+        finally:
+            self._num_booting_peers -= 1
+        if self.is_full:
+            dials_token.trigger()
 
     def _peer_finished(self, peer: BaseService) -> None:
         """Remove the given peer from our list of connected nodes.
@@ -300,21 +417,45 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
         if peer.remote in self.connected_nodes:
             self.logger.info("%s finished, removing from pool", peer)
             self.connected_nodes.pop(peer.remote)
+            if self.node_db is not None:
+                self._record_disconnect(peer)
         else:
             self.logger.warning(
                 "%s finished but was not found in connected_nodes (%s)", peer, self.connected_nodes)
         for subscriber in self._subscribers:
             subscriber.deregister_peer(peer)
 
+    def _record_disconnect(self, peer: BasePeer) -> None:
+        if peer.disconnect_reason is not None:
+            reason = peer.disconnect_reason.name
+        elif peer.remote_disconnect_reason is not None:
+            reason = f"remote: {peer.remote_disconnect_reason}"
+        else:
+            reason = "connection lost"
+        misbehaved = peer.disconnect_reason in MISBEHAVIOUR_DISCONNECT_REASONS
+        self.node_db.record_disconnect(peer.remote, reason, misbehaved, peer.get_throughput())
+
     def __aiter__(self) -> AsyncIterator[BasePeer]:
         return ConnectedPeersIterator(tuple(self.connected_nodes.values()))
 
+    async def _periodically_flush_node_db(self) -> None:
+        while self.is_operational:
+            await self.sleep(self._node_db_flush_interval)
+            await self._run_in_executor(None, self.node_db.flush)
+
     async def _periodically_report_stats(self) -> None:
         while self.is_operational:
             inbound_peers = len(
                 [peer for peer in self.connected_nodes.values() if peer.inbound])
             self.logger.info("Connected peers: %d inbound, %d outbound",
                              inbound_peers, (len(self.connected_nodes) - inbound_peers))
+            if self._dial_attempts:
+                self.logger.info(
+                    "Dials: %d attempted, %.0f%% successful, time to full pool: %s",
+                    self._dial_attempts,
+                    100 * self._dial_successes / self._dial_attempts,
+                    "n/a" if self._time_to_full is None else "%.1fs" % self._time_to_full,
+                )
             subscribers = len(self._subscribers)
             if subscribers:
                 longest_queue = max(
@@ -332,9 +473,11 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
                 most_received_type, count = max(
                     peer.received_msgs.items(), key=operator.itemgetter(1))
                 self.logger.debug(
-                    "%s: uptime=%s, received_msgs=%d, most_received=%s(%d)",
+                    "%s: uptime=%s, received_msgs=%d, most_received=%s(%d), "
+                    "sent_frames=%d, sent_bytes=%d",
                     peer, peer.uptime, peer.received_msgs_count,
-                    most_received_type, count)
+                    most_received_type, count,
+                    peer.sent_frames_count, peer.sent_bytes_count)
                 for line in peer.get_extra_stats():
                     self.logger.debug("    %s", line)
             self.logger.debug("== End peer details == ")
@@ -56,6 +56,9 @@ _DecodedMsgType = PayloadType
 class Command:
     _cmd_id: int = None
     decode_strict = True
+    # Commands which may carry large payloads that take long to decode should set this, so that
+    # their msgs are decoded outside of the event loop when possible. See BasePeer.read_msg().
+    is_decoding_slow = False
     structure: List[Tuple[str, Any]] = []
 
     _logger: logging.Logger = None
@@ -114,17 +117,20 @@ class Command:
             in zip(self.structure, data)
         }
 
-    def decode(self, data: bytes) -> PayloadType:
+    def decode(self, data: Union[bytes, memoryview]) -> PayloadType:
         packet_type = get_devp2p_cmd_id(data)
         if packet_type != self.cmd_id:
             raise MalformedMessage(f"Wrong packet type: {packet_type}, expected {self.cmd_id}")
 
+        # When given a memoryview (as BasePeer.read_msg() does), slicing it doesn't copy the
+        # payload. We only need an actual bytes object for RLP-decoding it, and snappy already
+        # returns one when decompressing.
         compressed_payload = data[1:]
         encoded_payload = self.decompress_payload(compressed_payload)
 
-        return self.decode_payload(encoded_payload)
+        return self.decode_payload(bytes(encoded_payload))
 
-    def decompress_payload(self, raw_payload: bytes) -> bytes:
+    def decompress_payload(self, raw_payload: Union[bytes, memoryview]) -> Union[bytes, memoryview]:
         # Do the Snappy Decompression only if Snappy Compression is supported by the protocol
         if self.snappy_support:
             return snappy.decompress(raw_payload)
@@ -6,6 +6,7 @@ from typing import (
     Callable,
     cast,
     Dict,
+    Iterable,
     Tuple,
 )
 
@@ -50,15 +51,25 @@ class MockTransport:
     def is_closing(self) -> bool:
         return self._is_closing
 
+    def get_write_buffer_size(self) -> int:
+        return 0
+
 
 class MockStreamWriter:
     def __init__(self, write_target: Callable[..., None]) -> None:
         self._target = write_target
+        self._loop = asyncio.get_event_loop()
         self.transport = MockTransport()
 
     def write(self, *args: Any, **kwargs: Any) -> None:
         self._target(*args, **kwargs)
 
+    def writelines(self, data: Iterable[bytes]) -> None:
+        self._target(b''.join(data))
+
+    async def drain(self) -> None:
+        pass
+
     def close(self) -> None:
         self.transport.close()
 
@@ -0,0 +1,139 @@
+"""Compare keys/sec of single-key and multi-key DB access over the DB process' IPC sockets, using
+both the ``BaseManager`` proxy and the native asyncio DB protocol.
+
+Run with `python -m scripts.benchmarks.db_ipc [-keys <n>] [-batch-size <n>]`.
+"""
+import argparse
+import asyncio
+import logging
+from multiprocessing.managers import BaseManager
+import os
+import pathlib
+import tempfile
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Sequence,
+)
+
+from eth.db.atomic import AtomicDB
+
+from trinity.db.async_ipc import (
+    AsyncDBClient,
+    get_async_db_ipc_path,
+    serve_async_db_in_thread,
+)
+from trinity.db.base import (
+    AsyncDBProxy,
+    BaseAsyncDB,
+    MultiKeyDB,
+)
+from trinity._utils.ipc import (
+    kill_process_gracefully,
+    wait_for_ipc,
+)
+from trinity._utils.mp import (
+    TracebackRecorder,
+    ctx,
+)
+
+
+class ServerManager(BaseManager):
+    pass
+
+
+class ClientManager(BaseManager):
+    pass
+
+
+def _serve(ipc_path: pathlib.Path) -> None:
+    base_db = AtomicDB()
+    ServerManager.register(
+        'get_db',
+        callable=lambda: TracebackRecorder(MultiKeyDB(base_db)),
+        proxytype=AsyncDBProxy,
+    )
+    manager = ServerManager(address=str(ipc_path))  # type: ignore
+    with serve_async_db_in_thread(base_db, get_async_db_ipc_path(ipc_path)):
+        manager.get_server().serve_forever()  # type: ignore
+
+
+async def _measure(name: str,
+                   num_keys: int,
+                   fn: Callable[[], Awaitable[None]]) -> None:
+    start = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - start
+    logging.info("%-26s %10d keys/sec  (%.3fs)", name, num_keys / elapsed, elapsed)
+
+
+async def _run(name: str, db: BaseAsyncDB, keys: Sequence[bytes], batch_size: int) -> None:
+    items = tuple((key, key) for key in keys)
+    batches = tuple(keys[i:i + batch_size] for i in range(0, len(keys), batch_size))
+    item_batches = tuple(items[i:i + batch_size] for i in range(0, len(items), batch_size))
+
+    async def single_set() -> None:
+        for key, value in items:
+            await db.coro_set(key, value)
+
+    async def multi_set() -> None:
+        for batch in item_batches:
+            await db.coro_multi_set(batch)
+
+    async def single_exists() -> None:
+        for key in keys:
+            await db.coro_exists(key)
+
+    async def multi_exists() -> None:
+        for batch in batches:
+            await db.coro_multi_exists(batch)
+
+    async def multi_get() -> None:
+        for batch in batches:
+            await db.coro_multi_get(batch)
+
+    async def concurrent_exists() -> None:
+        for batch in batches:
+            await asyncio.gather(*(db.coro_exists(key) for key in batch))
+
+    logging.info("%s:", name)
+    await _measure("coro_set", len(keys), single_set)
+    await _measure("coro_multi_set", len(keys), multi_set)
+    await _measure("coro_exists", len(keys), single_exists)
+    await _measure("coro_exists (concurrent)", len(keys), concurrent_exists)
+    await _measure("coro_multi_exists", len(keys), multi_exists)
+    await _measure("coro_multi_get", len(keys), multi_get)
+
+
+def _main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-keys', type=int, default=20000)
+    parser.add_argument('-batch-size', type=int, default=384)
+    args = parser.parse_args()
+
+    keys = tuple(os.urandom(32) for _ in range(args.keys))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipc_path = pathlib.Path(temp_dir) / 'db.ipc'
+        server = ctx.Process(target=_serve, args=(ipc_path,))
+        server.start()
+        try:
+            wait_for_ipc(ipc_path)
+            ClientManager.register('get_db', proxytype=AsyncDBProxy)
+            manager = ClientManager(address=str(ipc_path))  # type: ignore
+            manager.connect()
+            db = manager.get_db()  # type: ignore
+            async_db = AsyncDBClient(get_async_db_ipc_path(ipc_path), db)
+            loop = asyncio.get_event_loop()
+            loop.run_until_complete(_run("BaseManager proxy", db, keys, args.batch_size))
+            loop.run_until_complete(_run("Async DB protocol", async_db, keys, args.batch_size))
+            async_db.close()
+        finally:
+            kill_process_gracefully(server, logging.getLogger())
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,138 @@
+"""Compare calls/sec of ``eth_getBalance`` over the JSON-RPC IPC socket when sent one request at a
+time and in batch requests.
+
+Run with `python -m scripts.benchmarks.json_rpc_batches [-calls <n>] [-batch-sizes <n>,<n>,...]`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import tempfile
+import time
+from typing import (
+    Any,
+    Dict,
+    Sequence,
+)
+
+from eth_utils import (
+    encode_hex,
+    to_wei,
+)
+from lahja import (
+    Endpoint,
+    EventBus,
+)
+
+from eth import constants
+from eth.db.atomic import AtomicDB
+from eth.vm.forks.byzantium import ByzantiumVM
+
+from trinity.chains.full import FullChain
+from trinity.rpc.ipc import IPCServer
+from trinity.rpc.main import RPCServer
+from trinity.rpc.modules import Eth
+
+NUM_ACCOUNTS = 1000
+
+
+def _mk_chain(addresses: Sequence[bytes]) -> FullChain:
+    chain_class = FullChain.configure(vm_configuration=((0, ByzantiumVM),))
+    genesis_params = {
+        'block_number': constants.GENESIS_BLOCK_NUMBER,
+        'difficulty': constants.GENESIS_DIFFICULTY,
+        'gas_limit': 3141592,
+        'timestamp': 0,
+    }
+    genesis_state = {
+        address: {'balance': to_wei(1, 'ether'), 'nonce': 0, 'code': b'', 'storage': {}}
+        for address in addresses
+    }
+    return chain_class.from_genesis(AtomicDB(), genesis_params, genesis_state)
+
+
+def _mk_request(request_id: int, address: bytes) -> Dict[str, Any]:
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': 'eth_getBalance',
+        'params': [encode_hex(address), 'latest'],
+    }
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Any:
+    response = b''
+    while True:
+        separator = b']' if response.startswith(b'[') else b'}'
+        response += await reader.readuntil(separator)
+        try:
+            return json.loads(response.decode())
+        except json.JSONDecodeError:
+            continue
+
+
+async def _measure(ipc_path: pathlib.Path,
+                   addresses: Sequence[bytes],
+                   num_calls: int,
+                   batch_size: int) -> None:
+    # the responses to large batches don't fit in the default buffer of the reader
+    reader, writer = await asyncio.open_unix_connection(str(ipc_path), limit=2 ** 24)
+    requests = [_mk_request(i, addresses[i % len(addresses)]) for i in range(num_calls)]
+
+    start = time.perf_counter()
+    if batch_size == 1:
+        for request in requests:
+            writer.write(json.dumps(request).encode())
+            await _read_response(reader)
+    else:
+        for i in range(0, num_calls, batch_size):
+            writer.write(json.dumps(requests[i:i + batch_size]).encode())
+            await _read_response(reader)
+    elapsed = time.perf_counter() - start
+    writer.close()
+
+    name = "unbatched" if batch_size == 1 else f"batches of {batch_size}"
+    logging.info("%-20s %8d calls/sec  (%.3fs)", name, num_calls / elapsed, elapsed)
+
+
+async def _run(event_bus: Endpoint, num_calls: int, batch_sizes: Sequence[int]) -> None:
+    addresses = tuple(i.to_bytes(20, 'big') for i in range(1, NUM_ACCOUNTS + 1))
+    rpc = RPCServer((Eth(_mk_chain(addresses), event_bus),), event_bus)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipc_path = pathlib.Path(temp_dir) / 'jsonrpc.ipc'
+        ipc_server = IPCServer(rpc, ipc_path)
+        asyncio.ensure_future(ipc_server.run())
+        while not ipc_path.exists():
+            await asyncio.sleep(0.05)
+        try:
+            for batch_size in (1,) + tuple(batch_sizes):
+                await _measure(ipc_path, addresses, num_calls, batch_size)
+        finally:
+            await ipc_server.cancel()
+
+
+def _main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-calls', type=int, default=5000)
+    parser.add_argument('-batch-sizes', type=str, default='10,100,1000')
+    args = parser.parse_args()
+    batch_sizes = tuple(int(size) for size in args.batch_sizes.split(','))
+
+    loop = asyncio.get_event_loop()
+    bus = EventBus()
+    event_bus = bus.create_endpoint('benchmark')
+    bus.start(loop)
+    loop.run_until_complete(event_bus.connect(loop))
+    try:
+        loop.run_until_complete(_run(event_bus, args.calls, batch_sizes))
+    finally:
+        event_bus.stop()
+        bus.stop()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,151 @@
+"""Compare headers/sec fetched from a single simulated peer with one request in flight per command
+(the default) and with adaptive request pipelining (``--max-pipelined-requests``).
+
+The simulated peer replies to requests in the order it gets them, after a network latency in
+each direction and a fixed time to serve each request, so with a single request in flight most
+of the round trip is spent waiting on the network.
+
+Run with `python -m scripts.benchmarks.request_pipelining [-batches <n>] [-latency <secs>]
+[-service-time <secs>] [-max-depths <n>,<n>,...]`.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+
+from eth.rlp.headers import BlockHeader
+
+# p2p.kademlia imports from trinity, which imports p2p.kademlia back, so trinity must be
+# imported first.
+import trinity  # noqa: F401
+
+from p2p.peer import PeerMessage, PeerSubscriber
+from p2p.service import BaseService
+
+from trinity.protocol.common.context import ChainContext
+from trinity.protocol.eth.commands import BlockHeaders
+from trinity.protocol.eth.handlers import ETHExchangeHandler
+from trinity.protocol.eth.requests import GetBlockHeadersRequest
+
+BATCH_SIZE = 192
+CONCURRENT_REQUESTS = 16
+
+
+def mk_header_chain(length: int) -> Tuple[BlockHeader, ...]:
+    parent = BlockHeader(difficulty=100, block_number=0, gas_limit=3000000)
+    headers = [parent]
+    for _ in range(length - 1):
+        parent = BlockHeader(
+            difficulty=100,
+            block_number=parent.block_number + 1,
+            parent_hash=parent.hash,
+            gas_limit=3000000,
+        )
+        headers.append(parent)
+    return tuple(headers)
+
+
+class SimulatedPeer(BaseService):
+    """
+    Stands in for an ETHPeer, replying to GetBlockHeaders requests with headers from the given
+    chain.
+    """
+    def __init__(self,
+                 headers: Sequence[BlockHeader],
+                 latency: float,
+                 service_time: float,
+                 max_pipelined_requests: int) -> None:
+        super().__init__()
+        self.context = ChainContext(
+            headerdb=None,
+            network_id=1,
+            vm_configuration=(),
+            max_pipelined_requests=max_pipelined_requests,
+        )
+        # The exchange managers send their requests via peer.sub_proto.
+        self.sub_proto = self
+        self._headers = headers
+        self._latency = latency
+        self._service_time = service_time
+        self._busy_until = 0.0
+        self._subscribers: List[PeerSubscriber] = []
+
+    def add_subscriber(self, subscriber: PeerSubscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    def remove_subscriber(self, subscriber: PeerSubscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    def send_request(self, request: GetBlockHeadersRequest) -> None:
+        loop = asyncio.get_event_loop()
+        # Requests are served one at a time, in the order they arrive.
+        arrival = loop.time() + self._latency
+        self._busy_until = max(arrival, self._busy_until) + self._service_time
+        start = request.command_payload['block_number_or_hash']
+        headers = self._headers[start:start + request.command_payload['max_headers']]
+        loop.call_at(self._busy_until + self._latency, self._deliver, headers)
+
+    def _deliver(self, headers: Tuple[BlockHeader, ...]) -> None:
+        cmd = BlockHeaders(cmd_id_offset=16, snappy_support=False)
+        for subscriber in self._subscribers:
+            subscriber.add_msg(PeerMessage(self, cmd, headers))  # type: ignore
+
+    async def _run(self) -> None:
+        await self.cancellation()
+
+
+async def fetch_headers(peer: SimulatedPeer, batches: int) -> float:
+    handler = ETHExchangeHandler(peer, peer.context.max_pipelined_requests)  # type: ignore
+    starts: 'asyncio.Queue[int]' = asyncio.Queue()
+    for batch in range(batches):
+        starts.put_nowait(batch * BATCH_SIZE)
+
+    async def fetch() -> None:
+        while not starts.empty():
+            start = starts.get_nowait()
+            await handler.get_block_headers(start, BATCH_SIZE, skip=0, reverse=False)
+
+    start_at = time.perf_counter()
+    await asyncio.gather(*(fetch() for _ in range(CONCURRENT_REQUESTS)))
+    return time.perf_counter() - start_at
+
+
+async def run(args: argparse.Namespace) -> None:
+    headers = mk_header_chain(args.batches * BATCH_SIZE)
+    for max_depth in args.max_depths:
+        peer = SimulatedPeer(headers, args.latency, args.service_time, max_depth)
+        asyncio.ensure_future(peer.run())
+        await peer.events.started.wait()
+        elapsed = await fetch_headers(peer, args.batches)
+        await peer.cancel()
+        logging.info(
+            "max-pipelined-requests=%-3d headers=%-7d time=%.2fs  headers/sec=%d",
+            max_depth, len(headers), elapsed, len(headers) / elapsed)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-batches', type=int, default=100)
+    parser.add_argument('-latency', type=float, default=0.05)
+    parser.add_argument('-service-time', type=float, default=0.005)
+    parser.add_argument(
+        '-max-depths',
+        type=lambda value: tuple(int(depth) for depth in value.split(',')),
+        default=(1, 2, 4, 8),
+    )
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure how many RLPx frames per second BasePeer.read_msg() can read and decode.
+
+Synthetic encrypted traffic is generated by a peer linked directly to the one reading it, and
+fed to the reader's stream before we start measuring. Compares the buffered FrameReader used by
+BasePeer against reading every header/body with StreamReader.readexactly(), as it used to.
+
+Run with `python -m scripts.benchmarks.rlpx_frames [-frames <n>] [-frame-size <n>]`.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from types import MethodType
+
+# p2p.kademlia imports from trinity, which imports p2p.kademlia back, so trinity must be
+# imported first.
+import trinity  # noqa: F401
+
+from p2p.peer import BasePeer
+from p2p.p2p_proto import Hello
+from p2p.tools.paragon.helpers import get_directly_linked_peers_without_handshake
+
+
+async def legacy_read(self: BasePeer, n: int) -> bytes:
+    return await self.wait(self.reader.readexactly(n), timeout=self.conn_idle_timeout)
+
+
+async def measure(name: str, num_frames: int, frame_size: int, use_legacy_reader: bool) -> None:
+    alice, bob = await get_directly_linked_peers_without_handshake()
+    if use_legacy_reader:
+        bob.read = MethodType(legacy_read, bob)  # type: ignore
+
+    # Hello msgs are never compressed, so we can control the size of the frames precisely.
+    hello = Hello(cmd_id_offset=0, snappy_support=False)
+    payload = dict(
+        version=5,
+        client_version_string='x' * frame_size,
+        capabilities=[('paragon', 1)],
+        listen_port=30303,
+        remote_pubkey=alice.privkey.public_key.to_bytes(),
+    )
+    for _ in range(num_frames):
+        header, body = hello.encode(payload)
+        alice.send(header, body)
+    # Let alice's FrameWriter flush the frames to bob's stream.
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        cmd, _ = await bob.read_msg()
+        assert isinstance(cmd, Hello)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        "%-8s frames=%-7d frame_size=%-8d time=%.2fs  frames/sec=%-8d MB/sec=%.1f",
+        name,
+        num_frames,
+        frame_size,
+        elapsed,
+        num_frames / elapsed,
+        num_frames * frame_size / elapsed / 1024 / 1024,
+    )
+
+
+async def _main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-frames', type=int, default=20 * 1000)
+    parser.add_argument('-frame-size', type=int, action='append')
+    args = parser.parse_args()
+
+    frame_sizes = args.frame_size or [128, 4 * 1024, 256 * 1024]
+    for frame_size in frame_sizes:
+        # Larger frames take much longer to generate, so we use less of them.
+        num_frames = max(args.frames * 128 // frame_size, 100)
+        num_frames = min(num_frames, args.frames)
+        await measure("legacy", num_frames, frame_size, use_legacy_reader=True)
+        await measure("buffered", num_frames, frame_size, use_legacy_reader=False)
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(_main())
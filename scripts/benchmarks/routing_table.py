@@ -0,0 +1,59 @@
+"""Measure how many add_node() and neighbours() calls per second our RoutingTable can handle.
+
+The table is filled with random nodes (as our discovery service would do when bonding with
+them) and then queried for the neighbours of random IDs, as when we reply to a FIND_NODE or
+do a lookup.
+
+Run with `python -m scripts.benchmarks.routing_table [-nodes <n>] [-lookups <n>]`.
+"""
+import argparse
+import logging
+import random
+import time
+
+from eth_keys import keys
+from eth_utils import int_to_big_endian
+
+# p2p.kademlia imports from trinity, which imports p2p.kademlia back, so trinity must be
+# imported first.
+import trinity  # noqa: F401
+
+from p2p import kademlia
+
+
+def random_node() -> kademlia.Node:
+    pubkey = int_to_big_endian(random.getrandbits(kademlia.k_pubkey_size))
+    pubkey = b'\x00' * (kademlia.k_pubkey_size // 8 - len(pubkey)) + pubkey
+    return kademlia.Node(keys.PublicKey(pubkey), kademlia.Address('127.0.0.1', 30303))
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-nodes', type=int, default=10 * 1000)
+    parser.add_argument('-lookups', type=int, default=10 * 1000)
+    args = parser.parse_args()
+
+    table = kademlia.RoutingTable(random_node())
+    nodes = [random_node() for _ in range(args.nodes)]
+    start = time.perf_counter()
+    for node in nodes:
+        table.add_node(node)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        "add_node:   calls=%-7d time=%.2fs  calls/sec=%-8d (%d nodes in table)",
+        len(nodes), elapsed, len(nodes) / elapsed, len(table))
+
+    targets = [random.getrandbits(kademlia.k_id_size) for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for target in targets:
+        table.neighbours(target)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        "neighbours: calls=%-7d time=%.2fs  calls/sec=%-8d",
+        len(targets), elapsed, len(targets) / elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure time and memory needed to schedule and dequeue state sync requests.
+
+Compares the SyncRequestQueue used by HexaryTrieSync against the sorted list (kept in order with
+bisect.insort) it replaced. The legacy approach is quadratic, so it is only run for up to
+`-legacy-max` requests.
+
+Run with `python -m scripts.benchmarks.trie_sync_queue [-requests <n>] [-legacy-max <n>]`.
+"""
+import argparse
+import bisect
+import logging
+import os
+import random
+import time
+import tracemalloc
+from typing import (
+    Any,
+    Callable,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from trinity.sync.full.hexary_trie import (
+    SyncRequest,
+    SyncRequestQueue,
+)
+
+
+BATCH_SIZE = 384
+
+
+class LegacySyncRequest:
+    # What SyncRequest looked like before using __slots__.
+    def __init__(self, node_key: bytes, parent: Any, depth: int) -> None:
+        self.node_key = node_key
+        self.parents: List[Any] = []
+        if parent is not None:
+            self.parents = [parent]
+        self.depth = depth
+        self.leaf_callback = None
+        self.is_raw = False
+        self.dependencies = 0
+        self.data: bytes = None
+
+    def __lt__(self, other: 'LegacySyncRequest') -> bool:
+        return self.depth < other.depth
+
+
+def run_legacy(keys: Sequence[Tuple[bytes, int]]) -> int:
+    queue: List[LegacySyncRequest] = []
+    for node_key, depth in keys:
+        bisect.insort(queue, LegacySyncRequest(node_key, None, depth))
+    dequeued = 0
+    while queue:
+        batch = list(reversed(queue[-BATCH_SIZE:]))
+        queue = queue[:-BATCH_SIZE]
+        dequeued += len(batch)
+    return dequeued
+
+
+def run_current(keys: Sequence[Tuple[bytes, int]]) -> int:
+    queue = SyncRequestQueue()
+    for node_key, depth in keys:
+        queue.push(SyncRequest(node_key, None, depth, None))
+    dequeued = 0
+    while len(queue):
+        dequeued += len(queue.pop_batch(BATCH_SIZE))
+    return dequeued
+
+
+def measure(name: str, fn: Callable[[Sequence[Tuple[bytes, int]]], int], num_requests: int) -> None:
+    # Node keys are generated up front so that they're not included in the measurements.
+    keys = [(os.urandom(32), random.randint(0, 128)) for _ in range(num_requests)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    dequeued = fn(keys)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert dequeued == num_requests
+    logging.info(
+        "%-8s requests=%-9d time=%.2fs  requests/sec=%-9d peak_mem=%.1fMB  bytes/request=%d",
+        name,
+        num_requests,
+        elapsed,
+        num_requests / elapsed,
+        peak / 1024 / 1024,
+        peak / num_requests,
+    )
+
+
+def _main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-requests', type=int, default=10 * 1000 * 1000)
+    parser.add_argument('-legacy-max', type=int, default=200 * 1000)
+    args = parser.parse_args()
+
+    legacy_requests = min(args.requests, args.legacy_max)
+    measure("legacy", run_legacy, legacy_requests)
+    measure("current", run_current, legacy_requests)
+    if args.requests > legacy_requests:
+        measure("current", run_current, args.requests)
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,34 @@
+import os
+
+from trinity._utils.bloom import RotatingBloomFilter
+
+
+def test_rotating_bloom_filter_membership():
+    bloom = RotatingBloomFilter(generation_size=100)
+    keys = [os.urandom(32) for _ in range(100)]
+    bloom.update(keys)
+
+    assert all(key in bloom for key in keys)
+    # With a 1% error rate, virtually all of these should be reported as absent.
+    others = [os.urandom(32) for _ in range(100)]
+    assert sum(key in bloom for key in others) < 10
+
+
+def test_rotating_bloom_filter_forgets_old_generations():
+    bloom = RotatingBloomFilter(generation_size=10)
+    first_generation = [os.urandom(32) for _ in range(10)]
+    second_generation = [os.urandom(32) for _ in range(10)]
+    bloom.update(first_generation)
+    bloom.update(second_generation)
+
+    # Both generations are still remembered.
+    assert all(key in bloom for key in first_generation + second_generation)
+    memory_bytes = bloom.memory_bytes
+
+    # Adding one more item discards the first generation.
+    bloom.add(os.urandom(32))
+    assert all(key in bloom for key in second_generation)
+    assert sum(key in bloom for key in first_generation) < 5
+
+    # And memory usage doesn't grow.
+    assert bloom.memory_bytes == memory_bytes
@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from eth.chains.base import Chain
+from eth.rlp.headers import BlockHeader
+from eth.vm.forks.byzantium import ByzantiumVM
+from eth_utils import ValidationError
+import pytest
+
+from trinity._utils.header_validation import (
+    SEAL_CHECKS_PER_JOB,
+    validate_header_chains,
+)
+
+VALID_NONCE = b'\x01' * 8
+
+
+class SealCheckingVM(ByzantiumVM):
+    @classmethod
+    def validate_seal(cls, header):
+        if header.nonce != VALID_NONCE:
+            raise ValidationError(f"Invalid nonce: {header.nonce}")
+
+
+class CountingProcessPoolExecutor(ProcessPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def mk_header_chain(length, invalid_seal_at=None):
+    parent = BlockHeader(
+        difficulty=1,
+        block_number=0,
+        gas_limit=3141592,
+        timestamp=0,
+        nonce=VALID_NONCE,
+    )
+    headers = [parent]
+    for number in range(1, length):
+        parent = BlockHeader(
+            difficulty=1,
+            block_number=number,
+            gas_limit=3141592,
+            timestamp=number,
+            parent_hash=parent.hash,
+            nonce=b'\x00' * 8 if number == invalid_seal_at else VALID_NONCE,
+        )
+        headers.append(parent)
+    return headers[0], tuple(headers[1:])
+
+
+@pytest.fixture
+def executor():
+    executor = CountingProcessPoolExecutor(2)
+    try:
+        yield executor
+    finally:
+        executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chains_in_process_pool(executor):
+    chain_class = Chain.configure(vm_configuration=((0, SealCheckingVM),))
+    segments = (mk_header_chain(SEAL_CHECKS_PER_JOB + 1), mk_header_chain(3))
+
+    await validate_header_chains(chain_class, segments, executor=executor)
+    # Seals are checked in jobs of up to SEAL_CHECKS_PER_JOB headers
+    assert executor.submitted == 2
+
+    with pytest.raises(ValidationError, match="invalid seal"):
+        await validate_header_chains(
+            chain_class,
+            (mk_header_chain(3), mk_header_chain(5, invalid_seal_at=4)),
+            executor=executor,
+        )
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chains_checks_links_before_seals(executor):
+    chain_class = Chain.configure(vm_configuration=((0, SealCheckingVM),))
+    root, headers = mk_header_chain(5, invalid_seal_at=4)
+
+    with pytest.raises(ValidationError, match="Invalid header chain"):
+        await validate_header_chains(
+            chain_class,
+            ((root, headers[:1] + headers[2:]),),
+            executor=executor,
+        )
+    assert executor.submitted == 0
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chains_unpicklable_vm(executor):
+    checked = []
+
+    def validate_seal(header):
+        checked.append(header)
+    vm_class = ByzantiumVM.configure(validate_seal=validate_seal)
+    chain_class = Chain.configure(vm_configuration=((0, vm_class),))
+    root, headers = mk_header_chain(11)
+
+    # Seals of VMs that can't be sent to the worker processes are checked in this one.
+    await validate_header_chains(chain_class, ((root, headers),), executor=executor)
+    assert checked == list(headers)
+    assert executor.submitted == 0
+
+    # Only a sample of seals is checked, if requested
+    checked.clear()
+    await validate_header_chains(chain_class, ((root, headers),), 5, executor=executor)
+    assert len(checked) == 2
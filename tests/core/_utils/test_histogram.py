@@ -0,0 +1,20 @@
+import pytest
+
+from trinity._utils.histogram import LatencyHistogram
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1))
+    for latency in (0.005, 0.01, 0.05, 0.05, 0.5, 2):
+        histogram.observe(latency)
+
+    assert histogram.counts == [2, 2, 1, 1]
+    assert histogram.total == 6
+    assert histogram.percentile(0.5) == 0.1
+    assert histogram.percentile(0.8) == 1
+    assert histogram.percentile(0.99) == float('inf')
+
+
+def test_latency_histogram_without_data():
+    with pytest.raises(ValueError):
+        LatencyHistogram().percentile(0.5)
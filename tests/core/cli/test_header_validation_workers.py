@@ -0,0 +1,17 @@
+import pytest
+
+from trinity.cli_parser import parser
+
+
+def test_cli_header_validation_workers():
+    assert parser.parse_args([]).header_validation_workers == 0
+    assert parser.parse_args(['--header-validation-workers', '2']).header_validation_workers == 2
+
+
+@pytest.mark.parametrize('value', ['-1', 'two'])
+def test_cli_header_validation_workers_error_for_invalid_values(capsys, value):
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--header-validation-workers', value])
+    # this prevents the messaging that this error prints to stdout from
+    # escaping the test run.
+    capsys.readouterr()
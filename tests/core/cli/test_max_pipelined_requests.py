@@ -0,0 +1,17 @@
+import pytest
+
+from trinity.cli_parser import parser
+
+
+def test_cli_max_pipelined_requests():
+    assert parser.parse_args([]).max_pipelined_requests is None
+    assert parser.parse_args(['--max-pipelined-requests', '4']).max_pipelined_requests == 4
+
+
+@pytest.mark.parametrize('value', ['0', '-1', 'two'])
+def test_cli_max_pipelined_requests_error_for_invalid_values(capsys, value):
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--max-pipelined-requests', value])
+    # this prevents the messaging that this error prints to stdout from
+    # escaping the test run.
+    capsys.readouterr()
@@ -0,0 +1,25 @@
+import pytest
+
+from trinity.cli_parser import parser
+
+
+def test_cli_msg_decoding_defaults():
+    args = parser.parse_args([])
+    assert args.msg_decoding_workers == 0
+    assert args.msg_decoding_threshold > 0
+
+
+@pytest.mark.parametrize('option', ['--msg-decoding-workers', '--msg-decoding-threshold'])
+def test_cli_msg_decoding_accepts_zero(option):
+    args = parser.parse_args([option, '0'])
+    assert getattr(args, option[2:].replace('-', '_')) == 0
+
+
+@pytest.mark.parametrize('option', ['--msg-decoding-workers', '--msg-decoding-threshold'])
+@pytest.mark.parametrize('value', ['-1', 'two'])
+def test_cli_msg_decoding_error_for_invalid_values(capsys, option, value):
+    with pytest.raises(SystemExit):
+        parser.parse_args([option, value])
+    # this prevents the messaging that this error prints to stdout from
+    # escaping the test run.
+    capsys.readouterr()
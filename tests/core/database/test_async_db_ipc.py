@@ -0,0 +1,126 @@
+import asyncio
+import pathlib
+import tempfile
+
+import pytest
+
+from eth.db.atomic import AtomicDB
+
+from trinity.db.async_ipc import (
+    AsyncDBClient,
+    AsyncDBServer,
+    get_async_db_ipc_path,
+    serve_async_db_in_thread,
+)
+
+
+@pytest.fixture
+def core_db():
+    db = AtomicDB()
+    db[b'key-a'] = b'value-a'
+    db[b'empty'] = b''
+    return db
+
+
+@pytest.fixture
+async def db_client(core_db):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipc_path = pathlib.Path(temp_dir) / 'db-async.ipc'
+        server = AsyncDBServer(core_db, ipc_path)
+        await server.start()
+        client = AsyncDBClient(ipc_path, core_db)
+        try:
+            yield client
+        finally:
+            client.close()
+            await server.stop()
+
+
+def test_get_async_db_ipc_path():
+    path = get_async_db_ipc_path(pathlib.Path('/tmp/ipcs/db.ipc'))
+    assert path == pathlib.Path('/tmp/ipcs/db-async.ipc')
+
+
+@pytest.mark.asyncio
+async def test_single_key_requests(db_client, core_db):
+    assert await db_client.coro_get(b'key-a') == b'value-a'
+    assert await db_client.coro_exists(b'key-a')
+    assert not await db_client.coro_exists(b'key-b')
+
+    with pytest.raises(KeyError):
+        await db_client.coro_get(b'key-b')
+
+    await db_client.coro_set(b'key-b', b'value-b')
+    assert core_db[b'key-b'] == b'value-b'
+
+    await db_client.coro_delete(b'key-b')
+    assert b'key-b' not in core_db
+
+
+@pytest.mark.asyncio
+async def test_multi_key_requests(db_client, core_db):
+    await db_client.coro_multi_set(((b'key-b', b'value-b'), (b'key-c', b'value-c')))
+    assert core_db[b'key-b'] == b'value-b'
+    assert core_db[b'key-c'] == b'value-c'
+
+    keys = (b'key-a', b'missing', b'empty', b'key-c')
+    assert await db_client.coro_multi_exists(keys) == (True, False, True, True)
+    assert await db_client.coro_multi_get(keys) == (b'value-a', None, b'', b'value-c')
+
+
+@pytest.mark.asyncio
+async def test_concurrent_in_flight_requests(db_client, core_db):
+    keys = [bytes([i]) * 32 for i in range(200)]
+    for key in keys:
+        core_db[key] = key[:1]
+
+    results = await asyncio.gather(*(db_client.coro_get(key) for key in keys))
+
+    assert list(results) == [key[:1] for key in keys]
+    assert db_client.pending_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_close_stops_reading_responses(db_client):
+    assert await db_client.coro_get(b'key-a') == b'value-a'
+    reader_task = db_client._reader_task
+
+    db_client.close()
+    await asyncio.sleep(0)
+
+    assert reader_task.cancelled()
+    # A new connection is opened for the next request.
+    assert await db_client.coro_get(b'key-a') == b'value-a'
+
+
+@pytest.mark.asyncio
+async def test_sync_api_delegates_to_sync_db(db_client, core_db):
+    assert db_client[b'key-a'] == b'value-a'
+    assert b'key-a' in db_client
+
+    with db_client.atomic_batch() as batch:
+        batch[b'key-b'] = b'value-b'
+
+    assert core_db[b'key-b'] == b'value-b'
+
+
+@pytest.mark.asyncio
+async def test_serve_async_db_in_thread(core_db):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipc_path = pathlib.Path(temp_dir) / 'db-async.ipc'
+        with serve_async_db_in_thread(core_db, ipc_path):
+            client = AsyncDBClient(ipc_path, core_db)
+            try:
+                assert await client.coro_get(b'key-a') == b'value-a'
+            finally:
+                client.close()
+
+        assert not ipc_path.exists()
+
+
+def test_serve_async_db_in_thread_start_failure(core_db):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipc_path = pathlib.Path(temp_dir) / 'missing' / 'db-async.ipc'
+        with pytest.raises(OSError):
+            with serve_async_db_in_thread(core_db, ipc_path):
+                pass
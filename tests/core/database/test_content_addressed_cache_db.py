@@ -0,0 +1,41 @@
+from eth_hash.auto import keccak
+
+from eth.db.atomic import AtomicDB
+
+from trinity.db.cache import ContentAddressedCacheDB
+
+
+def test_content_addressed_cache_db():
+    core_db = AtomicDB()
+    values = [bytes([i]) * 100 for i in range(3)]
+    for value in values:
+        core_db[keccak(value)] = value
+    core_db[b'head'] = b'old'
+
+    db = ContentAddressedCacheDB(core_db, max_size_bytes=200)
+    assert db[keccak(values[0])] == values[0]
+    assert db[keccak(values[0])] == values[0]
+    assert (db.hits, db.misses) == (1, 1)
+    assert db.summarize_stats() == "hits=1  misses=1  hit_rate=50.0%  size=0.0MB"
+    assert keccak(values[0]) in db
+
+    # Values that aren't stored under their hash are never cached
+    assert db[b'head'] == b'old'
+    core_db[b'head'] = b'new'
+    assert db[b'head'] == b'new'
+    assert db.size_bytes == 100
+
+    # The least recently used value is evicted once over the size limit
+    assert db[keccak(values[1])] == values[1]
+    assert db[keccak(values[0])] == values[0]
+    assert db[keccak(values[2])] == values[2]
+    assert db.size_bytes == 200
+    del core_db[keccak(values[1])]
+    del core_db[keccak(values[0])]
+    assert db[keccak(values[0])] == values[0]
+    assert keccak(values[1]) not in db
+
+    # Writes go straight to the wrapped database
+    with db.atomic_batch() as batch:
+        batch[b'head'] = b'newer'
+    assert core_db[b'head'] == b'newer'
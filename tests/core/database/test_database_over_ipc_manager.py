@@ -14,6 +14,9 @@ from eth.db.atomic import (
 from eth.db.chain import (
     ChainDB,
 )
+from eth.rlp.headers import BlockHeader
+from eth.rlp.receipts import Receipt
+from eth.vm.forks.frontier.blocks import FrontierBlock
 
 from trinity.db.eth1.manager import (
     create_db_server_manager,
@@ -114,3 +117,59 @@ def test_atomic_batch_over_ipc_manager(manager):
     assert db[b'key-b'] == b'value-b'
     assert b'key-c' in db
     assert db[b'key-c'] == b'value-c'
+
+
+def test_multi_key_api_over_ipc_manager(manager):
+    db = manager.get_db()
+
+    assert db.multi_exists((b'key-a', b'key-d', b'key-e')) == (True, False, False)
+
+    db.multi_set(((b'key-d', b'value-d'), (b'key-e', b'value-e')))
+
+    assert db.multi_exists((b'key-a', b'key-d', b'key-e')) == (True, True, True)
+    assert db.multi_get((b'key-e', b'not-present', b'key-d')) == (b'value-e', None, b'value-d')
+
+
+def test_chaindb_multi_get_over_ipc_manager(manager):
+    chaindb = manager.get_chaindb()
+
+    assert chaindb.multi_get((b'key-a', b'not-present')) == (b'value-a', None)
+
+
+def test_chaindb_persist_blocks_over_ipc_manager(manager):
+    chaindb = manager.get_chaindb()
+
+    parent = ROPSTEN_GENESIS_HEADER
+    blocks = []
+    for _ in range(3):
+        header = BlockHeader(
+            difficulty=parent.difficulty,
+            block_number=parent.block_number + 1,
+            gas_limit=parent.gas_limit,
+            timestamp=parent.timestamp + 1,
+            parent_hash=parent.hash,
+        )
+        blocks.append(FrontierBlock(header))
+        parent = header
+
+    chaindb.persist_blocks(tuple(blocks))
+
+    assert chaindb.get_canonical_head() == blocks[-1].header
+    for block in blocks:
+        assert chaindb.get_canonical_block_hash(block.number) == block.hash
+
+
+def test_chaindb_batched_lookups_over_ipc_manager(manager):
+    chaindb = manager.get_chaindb()
+    genesis_hash = ROPSTEN_GENESIS_HEADER.hash
+    missing_hash = b'\x01' * 32
+
+    assert chaindb.get_canonical_headers((0, 1, 2)) == (ROPSTEN_GENESIS_HEADER,)
+
+    genesis_body, missing_body = chaindb.get_block_bodies(
+        (genesis_hash, missing_hash), FrontierBlock.transaction_class)
+    assert genesis_body.transactions == ()
+    assert genesis_body.uncles == ()
+    assert missing_body is None
+
+    assert chaindb.get_block_receipts((genesis_hash, missing_hash), Receipt) == ([], None)
@@ -15,7 +15,6 @@ from eth.chains.base import (
 from eth.db.backends.level import LevelDB
 from eth.db.backends.memory import MemoryDB
 from eth.db.atomic import AtomicDB
-from eth.db.chain import ChainDB
 from eth.tools.builder.chain import (
     build,
     byzantium_at,
@@ -25,8 +24,14 @@ from eth.tools.builder.chain import (
 from eth.db.header import HeaderDB
 from eth.vm.forks.byzantium import ByzantiumVM
 
-from trinity.db.base import BaseAsyncDB
-from trinity.db.eth1.chain import BaseAsyncChainDB
+from trinity.db.base import (
+    BaseAsyncDB,
+    MultiKeyMixin,
+)
+from trinity.db.eth1.chain import (
+    BaseAsyncChainDB,
+    BatchChainDB,
+)
 from trinity.db.eth1.header import BaseAsyncHeaderDB
 
 ZIPPED_FIXTURES_PATH = Path(__file__).parent.parent / 'integration' / 'fixtures'
@@ -52,19 +57,28 @@ def async_passthrough(base_name):
     return passthrough_method
 
 
-class FakeAsyncAtomicDB(AtomicDB, BaseAsyncDB):
+class FakeAsyncAtomicDB(AtomicDB, MultiKeyMixin, BaseAsyncDB):
     coro_set = async_passthrough('set')
     coro_exists = async_passthrough('exists')
+    coro_multi_get = async_passthrough('multi_get')
+    coro_multi_exists = async_passthrough('multi_exists')
+    coro_multi_set = async_passthrough('multi_set')
 
 
-class FakeAsyncMemoryDB(MemoryDB, BaseAsyncDB):
+class FakeAsyncMemoryDB(MemoryDB, MultiKeyMixin, BaseAsyncDB):
     coro_set = async_passthrough('set')
     coro_exists = async_passthrough('exists')
+    coro_multi_get = async_passthrough('multi_get')
+    coro_multi_exists = async_passthrough('multi_exists')
+    coro_multi_set = async_passthrough('multi_set')
 
 
-class FakeAsyncLevelDB(LevelDB, BaseAsyncDB):
+class FakeAsyncLevelDB(LevelDB, MultiKeyMixin, BaseAsyncDB):
     coro_set = async_passthrough('set')
     coro_exists = async_passthrough('exists')
+    coro_multi_get = async_passthrough('multi_get')
+    coro_multi_exists = async_passthrough('multi_exists')
+    coro_multi_set = async_passthrough('multi_set')
 
 
 class FakeAsyncHeaderDB(BaseAsyncHeaderDB, HeaderDB):
@@ -78,14 +92,19 @@ class FakeAsyncHeaderDB(BaseAsyncHeaderDB, HeaderDB):
     coro_persist_header_chain = async_passthrough('persist_header_chain')
 
 
-class FakeAsyncChainDB(BaseAsyncChainDB, FakeAsyncHeaderDB, ChainDB):
+class FakeAsyncChainDB(BaseAsyncChainDB, FakeAsyncHeaderDB, MultiKeyMixin, BatchChainDB):
     coro_persist_block = async_passthrough('persist_block')
+    coro_persist_blocks = async_passthrough('persist_blocks')
     coro_persist_uncles = async_passthrough('persist_uncles')
     coro_persist_trie_data_dict = async_passthrough('persist_trie_data_dict')
     coro_get = async_passthrough('get')
+    coro_multi_get = async_passthrough('multi_get')
     coro_get_block_transactions = async_passthrough('get_block_transactions')
     coro_get_block_uncles = async_passthrough('get_block_uncles')
     coro_get_receipts = async_passthrough('get_receipts')
+    coro_get_canonical_headers = async_passthrough('get_canonical_headers')
+    coro_get_block_bodies = async_passthrough('get_block_bodies')
+    coro_get_block_receipts = async_passthrough('get_block_receipts')
 
 
 async def coro_import_block(chain, block, perform_validation=True):
@@ -95,10 +114,16 @@ async def coro_import_block(chain, block, perform_validation=True):
     return chain.import_block(block, perform_validation=perform_validation)
 
 
+async def coro_validate_chains(chain, segments, seal_check_random_sample_rate=1):
+    for parent, headers in segments:
+        chain.validate_chain(parent, headers, seal_check_random_sample_rate)
+
+
 class FakeAsyncRopstenChain(RopstenChain):
     chaindb_class = FakeAsyncChainDB
     coro_import_block = coro_import_block
     coro_validate_chain = async_passthrough('validate_chain')
+    coro_validate_chains = coro_validate_chains
     coro_validate_receipt = async_passthrough('validate_receipt')
 
 
@@ -106,12 +131,14 @@ class FakeAsyncMainnetChain(MainnetChain):
     chaindb_class = FakeAsyncChainDB
     coro_import_block = coro_import_block
     coro_validate_chain = async_passthrough('validate_chain')
+    coro_validate_chains = coro_validate_chains
     coro_validate_receipt = async_passthrough('validate_receipt')
 
 
 class FakeAsyncChain(MiningChain):
     coro_import_block = coro_import_block
     coro_validate_chain = async_passthrough('validate_chain')
+    coro_validate_chains = coro_validate_chains
     coro_validate_receipt = async_passthrough('validate_receipt')
     chaindb_class = FakeAsyncChainDB
 
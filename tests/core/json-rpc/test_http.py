@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from eth_hash.auto import keccak
+from eth_utils import encode_hex
+import pytest
+
+from trinity.rpc.http import HTTPServer
+from trinity.rpc.main import RPCServer
+from trinity.rpc.modules import Web3
+
+
+def build_http_request(body, headers=()):
+    head = [
+        'POST / HTTP/1.1',
+        'Host: localhost',
+        'Content-Type: application/json',
+        f'Content-Length: {len(body)}',
+    ] + list(headers)
+    return ('\r\n'.join(head) + '\r\n\r\n').encode() + body
+
+
+def build_sha3_request(data):
+    request = {'jsonrpc': '2.0', 'id': 3, 'method': 'web3_sha3', 'params': [encode_hex(data)]}
+    return json.dumps(request).encode()
+
+
+async def read_http_response(reader):
+    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 1)
+    status_line, *header_lines = head.decode().strip().split('\r\n')
+    headers = dict(line.split(': ', 1) for line in header_lines)
+    body = await reader.readexactly(int(headers['Content-Length']))
+    return int(status_line.split(' ')[1]), headers, json.loads(body.decode())
+
+
+async def start_server(**kwargs):
+    server = HTTPServer(RPCServer((Web3(),)), '127.0.0.1', 0, **kwargs)
+    asyncio.ensure_future(server.run())
+    while server.server is None:
+        await asyncio.sleep(0.01)
+    return server
+
+
+@pytest.mark.asyncio
+async def test_http_keep_alive_and_pipelining():
+    server = await start_server()
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        payloads = (b'\x01' * 1000, b'\x02', b'')
+        writer.write(b''.join(build_http_request(build_sha3_request(data)) for data in payloads))
+
+        # The pipelined requests get their responses in order, over the same connection
+        for data in payloads:
+            status, headers, body = await read_http_response(reader)
+            assert status == 200
+            assert 'Connection' not in headers
+            assert body == {'id': 3, 'jsonrpc': '2.0', 'result': encode_hex(keccak(data))}
+
+        writer.write(build_http_request(build_sha3_request(b'\x03'), ['Connection: close']))
+        status, headers, body = await read_http_response(reader)
+        assert headers['Connection'] == 'close'
+        assert body['result'] == encode_hex(keccak(b'\x03'))
+        assert await asyncio.wait_for(reader.read(), 1) == b''
+        assert server.latency.total == 4
+    finally:
+        await server.cancel()
+
+
+@pytest.mark.asyncio
+async def test_http_errors_and_connection_limit():
+    server = await start_server(max_connections=1)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(b'GET / HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        status, headers, body = await read_http_response(reader)
+        assert status == 405
+        assert headers['Allow'] == 'POST'
+
+        # The first connection is still open, so there's no room for another one
+        other_reader, _ = await asyncio.open_connection('127.0.0.1', server.port)
+        status, headers, body = await read_http_response(other_reader)
+        assert status == 503
+        assert body == {'error': "Too many connections"}
+
+        writer.write(b'POST / HTTP/1.1\r\nContent-Length: nope\r\n\r\n')
+        status, headers, body = await read_http_response(reader)
+        assert status == 400
+        assert headers['Connection'] == 'close'
+    finally:
+        await server.cancel()
@@ -7,8 +7,10 @@ import time
 from eth_utils.toolz import (
     assoc,
 )
+from eth_hash.auto import keccak
 from eth_utils import (
     decode_hex,
+    encode_hex,
     function_signature_to_4byte_selector,
     to_bytes,
     to_hex,
@@ -23,6 +25,9 @@ from trinity.nodes.events import (
     NetworkIdRequest,
     NetworkIdResponse,
 )
+from trinity.rpc.ipc import (
+    JSONFramer,
+)
 from trinity.sync.common.events import (
     SyncingRequest,
     SyncingResponse,
@@ -85,7 +90,13 @@ async def get_ipc_response(
     await writer.drain()
     result_bytes = b''
     while not can_decode_json(result_bytes):
-        result_bytes += await asyncio.tasks.wait_for(reader.readuntil(b'}'), 0.25, loop=event_loop)
+        separator = b']' if result_bytes.startswith(b'[') else b'}'
+        # Long enough for the slowest requests, like eth_call running out of gas in a loop
+        result_bytes += await asyncio.tasks.wait_for(
+            reader.readuntil(separator),
+            5,
+            loop=event_loop,
+        )
 
     writer.close()
     return json.loads(result_bytes.decode())
@@ -164,6 +175,10 @@ def mock_network_id(network_id):
             b'{}',
             {'error': "Invalid Request: empty"},
         ),
+        (
+            b'[]',
+            {'error': "Invalid Request: empty"},
+        ),
         (
             build_request('notamethod'),
             {'error': "Invalid RPC method: 'notamethod'", 'id': 3, 'jsonrpc': '2.0'},
@@ -220,6 +235,79 @@ async def test_ipc_requests(
     assert result == expected
 
 
+@pytest.mark.asyncio
+async def test_batch_ipc_request(
+        jsonrpc_ipc_pipe_path,
+        event_loop,
+        ipc_server):
+    request_msg = b'[' + b','.join((
+        build_request('eth_accounts'),
+        build_request('web3_sha3', ['0x']),
+        b'1',
+        build_request('notamethod'),
+    )) + b']'
+    expected = [
+        {'result': [], 'id': 3, 'jsonrpc': '2.0'},
+        {
+            'result': '0xc5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470',
+            'id': 3,
+            'jsonrpc': '2.0',
+        },
+        {'error': "Invalid Request: 1", 'id': -1, 'jsonrpc': '2.0'},
+        {'error': "Invalid RPC method: 'notamethod'", 'id': 3, 'jsonrpc': '2.0'},
+    ]
+    result = await get_ipc_response(jsonrpc_ipc_pipe_path, request_msg, event_loop)
+    assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_pipelined_ipc_requests(
+        jsonrpc_ipc_pipe_path,
+        event_loop,
+        ipc_server):
+    assert wait_for(jsonrpc_ipc_pipe_path), "IPC server did not successfully start with IPC file"
+    reader, writer = await asyncio.open_unix_connection(str(jsonrpc_ipc_pipe_path), loop=event_loop)
+
+    # Several requests in a single write, the last of them split across two writes
+    requests = b''.join(
+        build_request('web3_sha3', ['0x' + '01' * size]) for size in (1, 10000, 100)
+    )
+    writer.write(requests[:-10])
+    await writer.drain()
+    writer.write(requests[-10:] + b' garbage {}')
+    await writer.drain()
+
+    responses = [
+        {'result': encode_hex(keccak(b'\x01' * size)), 'id': 3, 'jsonrpc': '2.0'}
+        for size in (1, 10000, 100)
+    ] + [
+        {'error': "Cannot parse json: garbage"},
+        {'error': "Invalid Request: empty"},
+    ]
+    for expected in responses:
+        result = await asyncio.wait_for(reader.readuntil(b'}'), 0.25, loop=event_loop)
+        assert json.loads(result.decode()) == expected
+    writer.close()
+
+
+@pytest.mark.parametrize(
+    'chunks, expected',
+    (
+        ((b'{"a": 1}',), [('', b'{"a": 1}')]),
+        ((b'{"a": "}{\\"}"}',), [('', b'{"a": "}{\\"}"}')]),
+        ((b'{"a": "\\', b'"}"}', b'[{}, []]'), [('', b'{"a": "\\"}"}'), ('', b'[{}, []]')]),
+        ((b'junk {"a"', b': [1, 2]} ', b'{}'), [('junk', b'{"a": [1, 2]}'), ('', b'{}')]),
+        ((b'{"a": [', b']'), []),
+    ),
+)
+def test_json_framer(chunks, expected):
+    framer = JSONFramer()
+    frames = []
+    for chunk in chunks:
+        frames.extend(framer.feed(chunk))
+    assert frames == expected
+
+
 @pytest.mark.asyncio
 async def test_network_id_ipc_request(
         jsonrpc_ipc_pipe_path,
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+
+from trinity.rpc.executor import RPCMethodExecutor
+
+
+@pytest.mark.asyncio
+async def test_rpc_method_executor_limits_concurrent_calls():
+    executor = RPCMethodExecutor(max_concurrent_calls=2, method_limits={'call': 1})
+    release = threading.Event()
+
+    def blocking_call(value):
+        release.wait(timeout=5)
+        return value
+
+    calls = [
+        asyncio.ensure_future(executor.run('call', blocking_call, 0)),
+        asyncio.ensure_future(executor.run('call', blocking_call, 1)),
+        asyncio.ensure_future(executor.run('getBalance', blocking_call, 2)),
+        asyncio.ensure_future(executor.run('getBalance', blocking_call, 3)),
+        asyncio.ensure_future(executor.run('getBalance', blocking_call, 4)),
+    ]
+    await asyncio.sleep(0.01)
+
+    # The blocking calls don't hold up the event loop, but only some of them run at once
+    assert executor.running == {'call': 1, 'getBalance': 2}
+    assert executor.waiting == {'call': 1, 'getBalance': 1}
+    assert executor.summarize_stats() == (
+        "call=1/1 (peak 1 waiting)  getBalance=2/1 (peak 1 waiting)"
+    )
+
+    release.set()
+    assert await asyncio.wait_for(asyncio.gather(*calls), timeout=1) == [0, 1, 2, 3, 4]
+    assert executor.running == {'call': 0, 'getBalance': 0}
+    assert executor.waiting == {'call': 0, 'getBalance': 0}
+    assert executor.peak_waiting == {'call': 1, 'getBalance': 1}
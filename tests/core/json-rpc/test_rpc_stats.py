@@ -0,0 +1,23 @@
+import logging
+
+from trinity.rpc.stats import RPCStatsReporter
+from trinity._utils.histogram import LatencyHistogram
+
+
+def test_rpc_stats_reporter_logs_each_source(caplog):
+    latency = LatencyHistogram()
+    reporter = RPCStatsReporter()
+    reporter.add_source("Cache", lambda: "hits=1")
+    reporter.add_source("Latencies", lambda: str(latency))
+
+    with caplog.at_level(logging.INFO):
+        reporter.report()
+        latency.observe(0.002)
+        reporter.report()
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Cache: hits=1",
+        "Latencies: no requests",
+        "Cache: hits=1",
+        "Latencies: requests=1  mean=2.0ms  p50<=2.5ms  p99<=2.5ms",
+    ]
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from eth_hash.auto import keccak
+from eth_utils import encode_hex
+import pytest
+import websockets
+
+from trinity.rpc.main import RPCServer
+from trinity.rpc.modules import Web3
+from trinity.rpc.ws import (
+    TOO_MANY_CONNECTIONS,
+    WebSocketServer,
+)
+
+
+async def start_server(**kwargs):
+    server = WebSocketServer(RPCServer((Web3(),)), '127.0.0.1', 0, **kwargs)
+    asyncio.ensure_future(server.run())
+    while server.server is None:
+        await asyncio.sleep(0.01)
+    return server
+
+
+@pytest.mark.asyncio
+async def test_websocket_requests():
+    server = await start_server(max_connections=1)
+    try:
+        async with websockets.connect(f'ws://127.0.0.1:{server.port}') as websocket:
+            requests = [
+                {'jsonrpc': '2.0', 'id': request_id, 'method': 'web3_sha3', 'params': ['0x']}
+                for request_id in range(3)
+            ]
+            await websocket.send(json.dumps(requests[0]))
+            await websocket.send(json.dumps(requests[1:]))
+
+            responses = [json.loads(await websocket.recv()) for _ in range(2)]
+            expected_result = encode_hex(keccak(b''))
+            single = next(response for response in responses if isinstance(response, dict))
+            batch = next(response for response in responses if isinstance(response, list))
+            assert single == {'id': 0, 'jsonrpc': '2.0', 'result': expected_result}
+            assert batch == [
+                {'id': 1, 'jsonrpc': '2.0', 'result': expected_result},
+                {'id': 2, 'jsonrpc': '2.0', 'result': expected_result},
+            ]
+
+            # There's no room for a second client
+            async with websockets.connect(f'ws://127.0.0.1:{server.port}') as other_websocket:
+                with pytest.raises(websockets.ConnectionClosed) as excinfo:
+                    await other_websocket.recv()
+                assert excinfo.value.code == TOO_MANY_CONNECTIONS
+        assert server.latency.total == 2
+    finally:
+        await server.cancel()
@@ -1,10 +1,17 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 import pytest
 
+import p2p.peer
 from p2p.exceptions import NoMatchingPeerCapabilities
 from p2p.p2p_proto import DisconnectReason, P2PProtocol
 
+from trinity.protocol.eth.commands import (
+    GetNodeData,
+    NodeData,
+)
 from trinity.protocol.eth.peer import ETHPeer
 from trinity.protocol.eth.proto import ETHProtocol
 from trinity.protocol.les.peer import LESPeer
@@ -105,3 +112,42 @@ class ProtoMatchingPeer(LESPeer):
     def __init__(self, supported_sub_protocols, snappy_support):
         self._supported_sub_protocols = supported_sub_protocols
         self.base_protocol = P2PProtocol(self, snappy_support)
+
+
+class CountingProcessPoolExecutor(ProcessPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_msg_decoding_executor(monkeypatch):
+    alice, bob = await get_directly_linked_peers_without_handshake()
+    await asyncio.gather(alice.do_p2p_handshake(), bob.do_p2p_handshake())
+    await asyncio.gather(alice.do_sub_proto_handshake(), bob.do_sub_proto_handshake())
+
+    executor = CountingProcessPoolExecutor(1)
+    size_threshold = 1024
+    monkeypatch.setattr(p2p.peer, 'get_msg_decoding_executor', lambda: (executor, size_threshold))
+    try:
+        large_nodes = tuple(os.urandom(size_threshold) for _ in range(4))
+        small_nodes = (os.urandom(32),)
+        alice.sub_proto.send_node_data(large_nodes)
+        alice.sub_proto.send_node_data(small_nodes)
+        alice.sub_proto.send_get_node_data(large_nodes)
+
+        # Only the first msg is large enough and of a command slow to decode, so only that one
+        # is decoded in the executor. Msgs are returned in the order they were sent regardless.
+        cmd, msg = await bob.read_msg()
+        assert isinstance(cmd, NodeData)
+        assert tuple(msg) == large_nodes
+        cmd, msg = await bob.read_msg()
+        assert isinstance(cmd, NodeData)
+        assert tuple(msg) == small_nodes
+        cmd, msg = await bob.read_msg()
+        assert isinstance(cmd, GetNodeData)
+        assert executor.submitted == 1
+    finally:
+        executor.shutdown(wait=True)
@@ -7,6 +7,13 @@ from p2p.peer import (
 )
 import pytest
 
+from trinity.protocol.common.managers import ResponseCandidateStream
+from trinity.protocol.eth.commands import (
+    BlockHeaders,
+    GetBlockHeaders as ETHGetBlockHeaders,
+)
+from trinity.protocol.eth.handlers import ETHExchangeHandler
+from trinity.protocol.eth.trackers import GetBlockHeadersTracker
 from trinity.protocol.les.commands import GetBlockHeaders
 from trinity.protocol.les.peer import LESPeer
 
@@ -44,6 +51,15 @@ def mk_header_chain(length):
         parent = header
 
 
+class ETHRequestMonitor(PeerSubscriber):
+    subscription_msg_types = {ETHGetBlockHeaders}
+    msg_queue_maxsize = 100
+
+    async def next_block_number(self):
+        msg = await self.msg_queue.get()
+        return msg.payload['block_number_or_hash']
+
+
 @pytest.fixture
 async def eth_peer_and_remote(request, event_loop):
     peer, remote = await get_directly_linked_peers(
@@ -95,29 +111,91 @@ async def test_eth_peer_get_headers_round_trip_concurrent_requests(eth_peer_and_
     peer, remote = eth_peer_and_remote
     headers = mk_header_chain(1)
 
+    request_monitor = ETHRequestMonitor()
+
+    # The requests are sent one at a time, and a response that the peer reads before the request
+    # it's for was sent is discarded as unexpected. So the remote must only reply to a request
+    # once it has arrived: replying on a timer races with the peer, which (reading frames from a
+    # buffer) may process several responses back to back when the event loop is busy, before
+    # the next request is sent, leaving that request to time out.
     async def send_headers():
-        await asyncio.sleep(0.01)
-        remote.sub_proto.send_block_headers(headers)
-        await asyncio.sleep(0.01)
-        remote.sub_proto.send_block_headers(headers)
-        await asyncio.sleep(0.01)
-        remote.sub_proto.send_block_headers(headers)
+        for _ in range(3):
+            await request_monitor.next_block_number()
+            remote.sub_proto.send_block_headers(headers)
 
     params = (0, 1, 0, False)
 
-    tasks = [
-        asyncio.ensure_future(peer.requests.get_block_headers(*params)),
-        asyncio.ensure_future(peer.requests.get_block_headers(*params)),
-        asyncio.ensure_future(peer.requests.get_block_headers(*params)),
-    ]
-    asyncio.ensure_future(send_headers())
-    results = await asyncio.gather(*tasks)
+    with request_monitor.subscribe_peer(remote):
+        tasks = [
+            asyncio.ensure_future(peer.requests.get_block_headers(*params)),
+            asyncio.ensure_future(peer.requests.get_block_headers(*params)),
+            asyncio.ensure_future(peer.requests.get_block_headers(*params)),
+        ]
+        asyncio.ensure_future(send_headers())
+        results = await asyncio.gather(*tasks)
 
     for response in results:
         assert len(response) == 1
         assert response[0] == headers[0]
 
 
+@pytest.mark.asyncio
+async def test_eth_peer_get_headers_pipelined_requests(eth_peer_and_remote):
+    peer, remote = eth_peer_and_remote
+    headers = mk_header_chain(4)
+    requests = ETHExchangeHandler(peer, max_pipelined_requests=3)
+
+    request_monitor = ETHRequestMonitor()
+    with request_monitor.subscribe_peer(remote):
+        task = asyncio.ensure_future(requests.get_block_headers(0, 1))
+        assert await request_monitor.next_block_number() == 0
+        remote.sub_proto.send_block_headers(headers[:1])
+        assert await task == headers[:1]
+
+        # Skip the ramp up of the pipeline, which depends on how fast responses arrive.
+        requests.get_block_headers._manager.service.pipeline_depth = 3
+
+        tasks = [
+            asyncio.ensure_future(requests.get_block_headers(header.block_number, 1))
+            for header in headers[1:]
+        ]
+        # All requests are sent before we get any response.
+        requested = [await request_monitor.next_block_number() for _ in tasks]
+        assert sorted(requested) == [header.block_number for header in headers[1:]]
+
+    # Responses are matched to the requests they are for, in the order they were sent.
+    for block_number in requested:
+        remote.sub_proto.send_block_headers((headers[block_number],))
+    results = await asyncio.gather(*tasks)
+
+    assert results == [(header,) for header in headers[1:]]
+
+
+@pytest.mark.asyncio
+async def test_eth_peer_pipeline_depth_adapts_to_round_trip(eth_peer_and_remote):
+    peer, _ = eth_peer_and_remote
+    stream = ResponseCandidateStream(
+        peer, BlockHeaders, peer.cancel_token, max_pipelined_requests=3)
+    tracker = GetBlockHeadersTracker()
+
+    # A peer that hasn't given us anything only gets one request at a time.
+    stream.record_response(0.1, tracker)
+    assert stream.pipeline_depth == 1
+
+    tracker.items_per_second_ema.update(100)
+    for _ in range(5):
+        stream.record_response(0.1, tracker)
+    assert stream.pipeline_depth == 3
+
+    # Responses queued by the peer make the pipeline shallower, timeouts halve it.
+    stream.record_response(0.2, tracker)
+    assert stream.pipeline_depth == 3
+    stream.record_response(0.4, tracker)
+    assert stream.pipeline_depth == 2
+    stream._on_timeout()
+    assert stream.pipeline_depth == 1
+
+
 @pytest.mark.parametrize(
     'params,headers',
     (
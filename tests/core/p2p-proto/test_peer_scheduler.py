@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from trinity.protocol.common.context import ChainContext
+from trinity.protocol.eth.commands import (
+    BlockBodies,
+    Receipts,
+)
+from trinity.protocol.eth.trackers import (
+    GetBlockBodiesTracker,
+    GetReceiptsTracker,
+)
+from trinity.sync.common.peers import PeerScheduler
+
+
+class FakeExchange:
+    def __init__(self, response_cmd_type, tracker):
+        self.response_cmd_type = response_cmd_type
+        self.tracker = tracker
+
+
+class FakePeer:
+    is_operational = True
+
+    def __init__(self, name, max_pipelined_requests=1):
+        self.name = name
+        self.context = ChainContext(None, 1, (), max_pipelined_requests)
+        self.bodies = FakeExchange(BlockBodies, GetBlockBodiesTracker())
+        self.receipts = FakeExchange(Receipts, GetReceiptsTracker())
+        self.requests = (self.bodies, self.receipts)
+
+    def record_throughput(self, exchange, items_per_second):
+        exchange.tracker.total_msgs += 1
+        exchange.tracker.items_per_second_ema.update(items_per_second)
+
+    def __repr__(self):
+        return self.name
+
+
+@pytest.mark.asyncio
+async def test_scheduler_prefers_fast_idle_peers():
+    fast, slow = FakePeer('fast'), FakePeer('slow')
+    fast.record_throughput(fast.bodies, 1000)
+    fast.record_throughput(fast.receipts, 1000)
+    slow.record_throughput(slow.bodies, 600)
+    slow.record_throughput(slow.receipts, 600)
+
+    scheduler = PeerScheduler(max_requests_per_peer=4)
+    scheduler.register_peer(slow)
+    scheduler.register_peer(fast)
+
+    assert await scheduler.reserve(BlockBodies) is fast
+    # The fast peer is busy with bodies, so its share of throughput for receipts is lower
+    assert await scheduler.reserve(Receipts) is slow
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_slow_peers():
+    fast, slow = FakePeer('fast', max_pipelined_requests=4), FakePeer('slow')
+    fast.record_throughput(fast.bodies, 1000)
+    fast.record_throughput(fast.receipts, 600)
+    slow.record_throughput(slow.bodies, 50)
+    slow.record_throughput(slow.receipts, 1000)
+
+    scheduler = PeerScheduler(max_requests_per_peer=4)
+    scheduler.register_peer(fast)
+    scheduler.register_peer(slow)
+
+    assert await scheduler.reserve(Receipts) is slow
+    # The slow peer may only serve one request at a time, so it's not used for bodies
+    for _ in range(4):
+        assert await scheduler.reserve(BlockBodies) is fast
+
+    # The fast peer is serving all the requests it can, so we have to wait for a free slot
+    waiting = asyncio.ensure_future(scheduler.reserve(BlockBodies))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    scheduler.release(slow, Receipts)
+    assert await asyncio.wait_for(waiting, timeout=1) is slow
+
+
+@pytest.mark.asyncio
+async def test_scheduler_drops_offline_peers():
+    online, offline = FakePeer('online'), FakePeer('offline')
+    offline.record_throughput(offline.bodies, 1000)
+
+    scheduler = PeerScheduler()
+    scheduler.register_peer(online)
+    scheduler.register_peer(offline)
+    offline.is_operational = False
+
+    assert await scheduler.reserve(BlockBodies) is online
+    # Releasing a peer that went offline is a no-op
+    scheduler.release(offline, BlockBodies)
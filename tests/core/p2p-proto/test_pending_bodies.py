@@ -0,0 +1,106 @@
+import asyncio
+
+from eth.rlp.headers import BlockHeader
+from eth.rlp.transactions import BaseTransactionFields
+import pytest
+import rlp
+
+from trinity.protocol.eth.commands import BlockBodies
+from trinity.rlp.block_body import BlockBody
+from trinity.sync.full.bodies import PendingBodies
+
+
+def mk_header(block_number):
+    return BlockHeader(difficulty=1, block_number=block_number, gas_limit=3141592, timestamp=0)
+
+
+def mk_body(data_size):
+    transaction = BaseTransactionFields(
+        nonce=0,
+        gas_price=1,
+        gas=21000,
+        to=b'\x01' * 20,
+        value=0,
+        data=b'\x00' * data_size,
+        v=27,
+        r=1,
+        s=1,
+    )
+    return BlockBody(transactions=[transaction], uncles=[])
+
+
+@pytest.mark.asyncio
+async def test_pending_bodies_memory_budget():
+    bodies = {mk_header(number): mk_body(100) for number in range(10, 13)}
+    body_size = len(rlp.encode(mk_body(100)))
+    pending = PendingBodies(max_memory_bytes=body_size * 3)
+
+    for header, body in bodies.items():
+        assert pending.has_room_for(header)
+        pending.add(header, body)
+
+    assert len(pending) == 3
+    assert pending.memory_bytes == body_size * 3
+    # Over budget, so only bodies of blocks before all the pending ones may be downloaded
+    assert not pending.has_room_for(mk_header(13))
+    assert pending.has_room_for(mk_header(9))
+
+    waiting = asyncio.ensure_future(pending.wait_for_room())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    header = mk_header(10)
+    assert pending.pop(header) == bodies[header]
+    await asyncio.wait_for(waiting, timeout=1)
+    assert pending.has_room_for(mk_header(13))
+    assert pending.pop_peak_bytes() == (body_size * 3, 0)
+    assert pending.pop_peak_bytes() == (body_size * 2, 0)
+
+    with pytest.raises(KeyError):
+        pending.pop(header)
+
+
+def test_pending_bodies_spill_to_disk():
+    headers = tuple(mk_header(number) for number in range(5))
+    bodies = {header: mk_body(1000) for header in headers}
+    body_size = len(rlp.encode(mk_body(1000)))
+    pending = PendingBodies(max_memory_bytes=body_size * 2, max_spilled_bytes=body_size * 2)
+
+    try:
+        for header in headers:
+            pending.add(header, bodies[header])
+
+        assert pending.memory_bytes == body_size * 3
+        assert pending.spilled_bytes == body_size * 2
+        assert not pending.has_room_for(mk_header(5))
+
+        for header in headers:
+            assert header in pending
+            assert pending.pop(header) == bodies[header]
+        assert len(pending) == 0
+        assert pending.pop_peak_bytes() == (body_size * 3, body_size * 2)
+        spill_db = pending._spill_db
+    finally:
+        pending.close()
+
+    # The temporary database is closed and removed
+    assert spill_db.db.closed
+    assert not spill_db.db_path.exists()
+
+
+def test_pending_bodies_size_of_received_bodies(monkeypatch):
+    payload = BlockBodies(cmd_id_offset=0, snappy_support=False).encode_payload(
+        [mk_body(100), mk_body(200)])
+    received_bodies = BlockBodies(cmd_id_offset=0, snappy_support=False).decode_payload(payload)
+    body_sizes = [len(rlp.encode(mk_body(100))), len(rlp.encode(mk_body(200)))]
+
+    def fail_encode(*args, **kwargs):
+        raise AssertionError("Bodies received from peers should not be encoded again")
+    monkeypatch.setattr(rlp, 'encode', fail_encode)
+
+    pending = PendingBodies(max_memory_bytes=sum(body_sizes))
+    for number, body in enumerate(received_bodies):
+        pending.add(mk_header(number), body)
+
+    # Their sizes are taken from the payload they were decoded from
+    assert pending.memory_bytes == sum(body_sizes)
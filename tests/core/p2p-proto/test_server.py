@@ -17,6 +17,7 @@ from p2p.kademlia import (
     Address,
 )
 from p2p.peer import PeerConnection
+from p2p.p2p_proto import DisconnectReason
 from p2p.tools.paragon import (
     ParagonContext,
     ParagonPeer,
@@ -187,3 +188,111 @@ async def test_peer_pool_answers_connect_commands(event_loop, event_bus, server)
 
     assert len(server.peer_pool.connected_nodes) == 1
     await initiator_peer_pool.cancel()
+
+
+class FakeDialedPeer:
+    def __init__(self, remote):
+        self.remote = remote
+        self.disconnect_reason = None
+
+    async def disconnect(self, reason):
+        self.disconnect_reason = reason
+
+
+@pytest.mark.asyncio
+async def test_peer_pool_dials_concurrently(monkeypatch):
+    peer_pool = ParagonPeerPool(privkey=INITIATOR_PRIVKEY, context=ParagonContext())
+    monkeypatch.setattr(peer_pool, '_max_concurrent_dials', 3)
+    monkeypatch.setattr(peer_pool, 'max_peers', 3)
+    in_progress = 0
+    max_in_progress = 0
+    dialed = []
+    dials_started = asyncio.Event()
+    release_dials = asyncio.Event()
+
+    async def mock_connect(remote, token=None):
+        nonlocal in_progress, max_in_progress
+        dialed.append(remote)
+        in_progress += 1
+        max_in_progress = max(in_progress, max_in_progress)
+        if in_progress == 3:
+            dials_started.set()
+        try:
+            await peer_pool.wait(release_dials.wait(), token=token)
+        finally:
+            in_progress -= 1
+        return FakeDialedPeer(remote)
+
+    async def mock_start_peer(peer):
+        peer_pool.connected_nodes[peer.remote] = peer
+
+    monkeypatch.setattr(peer_pool, 'connect', mock_connect)
+    monkeypatch.setattr(peer_pool, 'start_peer', mock_start_peer)
+
+    asyncio.ensure_future(peer_pool.run())
+    await peer_pool.events.started.wait()
+    nodes = [Node(keys.PrivateKey(bytes([i]) * 32).public_key, SERVER_ADDRESS) for i in range(1, 7)]
+    connect = asyncio.ensure_future(peer_pool.connect_to_nodes(iter(nodes)))
+    await asyncio.wait_for(dials_started.wait(), timeout=1)
+    # Give the pool a chance to start any dials past _max_concurrent_dials
+    for _ in range(5):
+        await asyncio.sleep(0)
+    # Only _max_concurrent_dials nodes are dialed at a time.
+    assert max_in_progress == 3
+    assert dialed == nodes[:3]
+
+    # Once the dials complete, the pool is full, so no further nodes are dialed.
+    release_dials.set()
+    await asyncio.wait_for(connect, timeout=1)
+    assert peer_pool.is_full
+    assert dialed == nodes[:3]
+
+    # Our fake peers can't be stopped, so make sure the pool doesn't try to.
+    peer_pool.connected_nodes.clear()
+    await peer_pool.cancel()
+
+
+@pytest.mark.asyncio
+async def test_peer_pool_dials_completing_together_do_not_overfill_it(monkeypatch):
+    peer_pool = ParagonPeerPool(privkey=INITIATOR_PRIVKEY, context=ParagonContext())
+    monkeypatch.setattr(peer_pool, '_max_concurrent_dials', 4)
+    # The pool only has room for one more peer
+    monkeypatch.setattr(peer_pool, 'max_peers', 1)
+    nodes = [Node(keys.PrivateKey(bytes([i]) * 32).public_key, SERVER_ADDRESS) for i in range(1, 5)]
+    dialed_peers = []
+    dials_started = asyncio.Event()
+    release_dials = asyncio.Event()
+
+    async def mock_connect(remote, token=None):
+        peer = FakeDialedPeer(remote)
+        dialed_peers.append(peer)
+        if len(dialed_peers) == 4:
+            dials_started.set()
+        await release_dials.wait()
+        return peer
+
+    async def mock_start_peer(peer):
+        # Booting takes a while, so that the other dials complete in the meantime
+        await asyncio.sleep(0.01)
+        peer_pool.connected_nodes[peer.remote] = peer
+
+    monkeypatch.setattr(peer_pool, 'connect', mock_connect)
+    monkeypatch.setattr(peer_pool, 'start_peer', mock_start_peer)
+
+    asyncio.ensure_future(peer_pool.run())
+    await peer_pool.events.started.wait()
+    connect = asyncio.ensure_future(peer_pool.connect_to_nodes(iter(nodes)))
+    await asyncio.wait_for(dials_started.wait(), timeout=1)
+
+    release_dials.set()
+    await asyncio.wait_for(connect, timeout=1)
+    assert len(peer_pool) == 1
+    disconnected = [peer for peer in dialed_peers if peer.disconnect_reason is not None]
+    assert len(disconnected) == 3
+    assert all(
+        peer.disconnect_reason == DisconnectReason.too_many_peers for peer in disconnected
+    )
+
+    # Our fake peers can't be stopped, so make sure the pool doesn't try to.
+    peer_pool.connected_nodes.clear()
+    await peer_pool.cancel()
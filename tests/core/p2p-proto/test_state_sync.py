@@ -1,3 +1,4 @@
+from concurrent.futures import ProcessPoolExecutor
 import os
 import random
 import time
@@ -18,7 +19,12 @@ from eth.db.backends.memory import MemoryDB
 from eth.db.account import AccountDB
 from eth.tools.logging import ExtendedDebugLogger
 
-from trinity.sync.full.hexary_trie import HexaryTrieSync
+from trinity.exceptions import InvalidSyncCheckpoint
+from trinity.sync.full.hexary_trie import (
+    HexaryTrieSync,
+    SyncRequest,
+    SyncRequestQueue,
+)
 from trinity.sync.full.state import StateSync, TrieNodeRequestTracker
 
 from tests.core.integration_test_helpers import FakeAsyncMemoryDB
@@ -111,6 +117,185 @@ async def test_state_sync():
         await scheduler.process(results)
         requests = scheduler.next_batch(10)
 
+    assert_state_synced(dest_db, state_root, contents)
+
+
+@pytest.mark.asyncio
+async def test_state_sync_decoding_in_executor():
+    raw_db, state_root, contents = make_random_state(1000)
+    dest_db = FakeAsyncMemoryDB()
+    nodes_cache = MemoryDB()
+    with ProcessPoolExecutor(2) as executor:
+        scheduler = StateSync(
+            state_root, dest_db, nodes_cache, ExtendedDebugLogger('test'), executor=executor)
+        requests = scheduler.next_batch(100)
+        while requests:
+            # Include a duplicate node in every batch, as we may get the same node from
+            # different peers.
+            results = [(request.node_key, raw_db[request.node_key]) for request in requests]
+            await scheduler.process(results + results[:1])
+            requests = scheduler.next_batch(100)
+
+    assert_state_synced(dest_db, state_root, contents)
+
+
+@pytest.mark.asyncio
+async def test_state_sync_checks_existing_nodes_in_bulk():
+    raw_db, state_root, contents = make_random_state(1000)
+    dest_db = FakeAsyncMemoryDB()
+    await sync_state(raw_db, state_root, dest_db)
+
+    # Change some accounts so that most of the new state's nodes are already in dest_db.
+    account_db = AccountDB(raw_db, state_root)
+    for addr in random.sample(list(contents), 10):
+        balance, nonce, storage, code = contents[addr]
+        account_db.set_balance(addr, balance + 1)
+        contents[addr] = (balance + 1, nonce, storage, code)
+    account_db.persist()
+    new_state_root = account_db.state_root
+    existing_keys = set(dest_db.kv_store)
+
+    scheduler = StateSync(new_state_root, dest_db, MemoryDB(), ExtendedDebugLogger('test'))
+    requested_keys = set()
+    requests = scheduler.next_batch(10)
+    while requests:
+        requested_keys.update(request.node_key for request in requests)
+        await scheduler.process(get_results(raw_db, requests))
+        requests = scheduler.next_batch(10)
+
+    assert_state_synced(dest_db, new_state_root, contents)
+    # Only the nodes missing from dest_db were requested, and all of them were written to it.
+    assert requested_keys
+    assert requested_keys.isdisjoint(existing_keys)
+    assert requested_keys == set(dest_db.kv_store) - existing_keys
+    # Every batch needs at most one round trip to check which of the children of its nodes exist
+    # in the DB and another one to write its nodes.
+    assert scheduler.processed_batches > 0
+    assert scheduler.db_round_trips <= 2 * scheduler.processed_batches
+
+
+@pytest.mark.asyncio
+async def test_state_sync_resume_from_checkpoint():
+    raw_db, state_root, contents = make_random_state(1000)
+    dest_db = FakeAsyncMemoryDB()
+    scheduler = StateSync(state_root, dest_db, MemoryDB(), ExtendedDebugLogger('test'))
+    for _ in range(10):
+        requests = scheduler.next_batch(10)
+        await scheduler.process(get_results(raw_db, requests))
+    # Leave some requests in flight, as a checkpoint may be taken while we wait for replies.
+    scheduler.next_batch(10)
+    checkpoint = await scheduler.get_checkpoint()
+    committed_nodes = scheduler.committed_nodes
+
+    resumed = StateSync(state_root, dest_db, MemoryDB(), ExtendedDebugLogger('test'))
+    resumed.resume(checkpoint)
+
+    assert resumed.requests.keys() == scheduler.requests.keys()
+    assert len(resumed.queue) == len(scheduler.queue) + 10
+    requests = resumed.next_batch(10)
+    while requests:
+        await resumed.process(get_results(raw_db, requests))
+        requests = resumed.next_batch(10)
+
+    assert_state_synced(dest_db, state_root, contents)
+    # Nodes committed before the checkpoint was taken were not fetched again.
+    assert resumed.committed_nodes + committed_nodes == len(dest_db.kv_store)
+
+
+@pytest.mark.asyncio
+async def test_state_sync_resume_from_invalid_checkpoint():
+    raw_db, state_root, _ = make_random_state(10)
+    scheduler = StateSync(state_root, FakeAsyncMemoryDB(), MemoryDB(), ExtendedDebugLogger('test'))
+    checkpoint = await scheduler.get_checkpoint()
+    other_scheduler = StateSync(
+        b'\x01' * 32, FakeAsyncMemoryDB(), MemoryDB(), ExtendedDebugLogger('test'))
+
+    with pytest.raises(InvalidSyncCheckpoint):
+        other_scheduler.resume(checkpoint)
+    with pytest.raises(InvalidSyncCheckpoint):
+        scheduler.resume(checkpoint[:-1])
+    with pytest.raises(InvalidSyncCheckpoint):
+        scheduler.resume(checkpoint + b'\x00')
+
+
+@pytest.mark.asyncio
+async def test_state_sync_checkpoint_with_many_parents():
+    raw_db, state_root, _ = make_random_state(10)
+    scheduler = StateSync(state_root, FakeAsyncMemoryDB(), MemoryDB(), ExtendedDebugLogger('test'))
+    root_request = scheduler.requests[state_root]
+    # e.g. the code of a contract deployed by lots of accounts
+    code_request = SyncRequest(os.urandom(32), root_request, 1, None, is_raw=True)
+    code_request.parents *= 70000
+    scheduler.requests[code_request.node_key] = code_request
+    checkpoint = await scheduler.get_checkpoint()
+
+    resumed = StateSync(state_root, FakeAsyncMemoryDB(), MemoryDB(), ExtendedDebugLogger('test'))
+    resumed.resume(checkpoint)
+
+    resumed_parents = resumed.requests[code_request.node_key].parents
+    assert resumed_parents == [resumed.requests[state_root]] * 70000
+
+
+class FailingWritesDB(FakeAsyncMemoryDB):
+    fail_writes = False
+
+    async def coro_multi_set(self, items):
+        if self.fail_writes:
+            raise ValueError("Write failed")
+        await super().coro_multi_set(items)
+
+
+@pytest.mark.asyncio
+async def test_state_sync_reschedules_nodes_when_write_fails():
+    raw_db, state_root, contents = make_random_state(100)
+    dest_db = FailingWritesDB()
+    scheduler = StateSync(state_root, dest_db, MemoryDB(), ExtendedDebugLogger('test'))
+    for _ in range(10):
+        requests = scheduler.next_batch(10)
+        await scheduler.process(get_results(raw_db, requests))
+    committed_nodes = scheduler.committed_nodes
+    pending_requests = len(scheduler.requests)
+
+    # Process batches until one of them commits some nodes, whose write then fails.
+    dest_db.fail_writes = True
+    while True:
+        requests = scheduler.next_batch(10)
+        assert requests
+        try:
+            await scheduler.process(get_results(raw_db, requests))
+        except ValueError:
+            break
+    dest_db.fail_writes = False
+
+    # The nodes whose write failed are neither counted as committed nor cached, and they're
+    # still pending.
+    assert scheduler.committed_nodes == committed_nodes
+    assert len(scheduler.requests) >= pending_requests
+    assert all(key not in scheduler.nodes_cache for key in scheduler.requests)
+
+    requests = scheduler.next_batch(10)
+    while requests:
+        await scheduler.process(get_results(raw_db, requests))
+        requests = scheduler.next_batch(10)
+
+    assert_state_synced(dest_db, state_root, contents)
+    assert scheduler.committed_nodes == len(dest_db.kv_store)
+
+
+async def sync_state(raw_db, state_root, dest_db):
+    scheduler = StateSync(state_root, dest_db, MemoryDB(), ExtendedDebugLogger('test'))
+    requests = scheduler.next_batch(10)
+    while requests:
+        await scheduler.process(get_results(raw_db, requests))
+        requests = scheduler.next_batch(10)
+    return scheduler
+
+
+def get_results(raw_db, requests):
+    return [(request.node_key, raw_db[request.node_key]) for request in requests]
+
+
+def assert_state_synced(dest_db, state_root, contents):
     result_account_db = AccountDB(dest_db, state_root)
     for addr, account_data in contents.items():
         balance, nonce, storage, code = account_data
@@ -120,6 +305,25 @@ async def test_state_sync():
         assert result_account_db.get_code(addr) == code
 
 
+def test_sync_request_queue_returns_deepest_requests_first():
+    queue = SyncRequestQueue()
+    requests = [
+        SyncRequest(os.urandom(32), None, depth, None)
+        for depth in (3, 1, 3, 0, 2, 3, 1)
+    ]
+    for request in requests:
+        queue.push(request)
+    assert len(queue) == len(requests)
+
+    # Deepest first, and the most recently scheduled first amongst those with the same depth.
+    assert queue.pop_batch(2) == [requests[5], requests[2]]
+    assert queue.pop_batch(3) == [requests[0], requests[4], requests[6]]
+    assert len(queue) == 2
+    assert queue.pop_batch(10) == [requests[1], requests[3]]
+    assert len(queue) == 0
+    assert queue.pop_batch(10) == []
+
+
 REPLY_TIMEOUT = 5
 
 
@@ -201,3 +405,26 @@ def test_node_request_tracker_get_next_timeout():
     # timeout to be (oldest_req_time + 1) + REPLY_TIMEOUT as expected.
     tracker.active_requests.pop(peer1)
     assert tracker.get_next_timeout() == oldest_req_time + 1 + REPLY_TIMEOUT
+
+
+def test_node_request_tracker_throughput():
+    tracker = TrieNodeRequestTracker(REPLY_TIMEOUT, ExtendedDebugLogger('name'))
+    slow_peer, fast_peer, new_peer = object(), object(), object()
+    now = time.time()
+    tracker.active_requests[slow_peer] = (now - 4, [])
+    tracker.active_requests[fast_peer] = (now - 1, [])
+
+    tracker.record_reply(slow_peer, 100)
+    tracker.record_reply(fast_peer, 100)
+
+    assert slow_peer not in tracker.active_requests
+    assert fast_peer not in tracker.active_requests
+    assert tracker.get_throughput(fast_peer) > tracker.get_throughput(slow_peer)
+    # Peers we haven't heard from yet are ranked first so that we measure them.
+    assert tracker.get_throughput(new_peer) > tracker.get_throughput(fast_peer)
+
+    # A timeout drags a peer's throughput down.
+    throughput = tracker.get_throughput(fast_peer)
+    tracker.active_requests[fast_peer] = (now - REPLY_TIMEOUT - 1, [])
+    tracker.get_timed_out()
+    assert tracker.get_throughput(fast_peer) < throughput
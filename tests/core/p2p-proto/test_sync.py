@@ -1,10 +1,15 @@
 import asyncio
+import pathlib
 
 import pytest
 
-from trinity.protocol.eth.servers import ETHRequestServer
+from eth.constants import ZERO_HASH32
+
+from trinity.protocol.eth.peer import ETHPeer
+from trinity.protocol.eth.servers import ETHPeerRequestHandler, ETHRequestServer
 from trinity.protocol.les.peer import LESPeer
 from trinity.protocol.les.servers import LightRequestServer
+from trinity.sync.common.headers import SkeletonSyncer
 from trinity.sync.full.chain import FastChainSyncer, RegularChainSyncer
 from trinity.sync.full.state import StateDownloader
 from trinity.sync.light.chain import LightChainSyncer
@@ -35,7 +40,7 @@ def small_header_batches(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_fast_syncer(request, event_loop, chaindb_fresh, chaindb_20):
+async def test_fast_syncer(request, event_loop, chaindb_fresh, chaindb_20, tmpdir):
     client_peer, server_peer = await get_directly_linked_peers(
         request, event_loop,
         alice_headerdb=FakeAsyncHeaderDB(chaindb_fresh.db),
@@ -67,11 +72,19 @@ async def test_fast_syncer(request, event_loop, chaindb_fresh, chaindb_20):
     assert head == chaindb_20.get_canonical_head()
 
     # Now download the state for the chain's head.
+    checkpoint_path = pathlib.Path(tmpdir) / 'checkpoint'
     state_downloader = StateDownloader(
-        chaindb_fresh, chaindb_fresh.db, head.state_root, client_peer_pool)
+        chaindb_fresh,
+        chaindb_fresh.db,
+        head.state_root,
+        client_peer_pool,
+        checkpoint_path=checkpoint_path,
+    )
     await asyncio.wait_for(state_downloader.run(), timeout=2)
 
     assert head.state_root in chaindb_fresh.db
+    # The checkpoint is removed once the state sync is complete.
+    assert not checkpoint_path.exists()
 
 
 @pytest.mark.asyncio
@@ -114,6 +127,129 @@ async def test_skeleton_syncer(request, event_loop, chaindb_fresh, chaindb_1000)
     assert head.state_root in chaindb_fresh.db
 
 
+class SkeletonCountingRequestHandler(ETHPeerRequestHandler):
+    """
+    Count the requests for skeleton headers (i.e. with a skip) we reply to.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skeleton_requests = 0
+
+    async def lookup_headers(self, request):
+        if request.skip != 0:
+            self.skeleton_requests += 1
+        return await super().lookup_headers(request)
+
+
+@pytest.mark.asyncio
+async def test_skeleton_syncer_with_helper_peers(
+        request, event_loop, monkeypatch, chaindb_fresh, chaindb_1000):
+    # Use short skeleton requests, so that the skeleton spans several windows
+    monkeypatch.setattr(SkeletonSyncer, '_skip_length', 11)
+    monkeypatch.setattr(ETHPeer, 'max_headers_fetch', 10)
+
+    client_peers = []
+    request_handlers = []
+    for _ in range(3):
+        client_peer, server_peer = await get_directly_linked_peers(
+            request, event_loop,
+            alice_headerdb=FakeAsyncHeaderDB(chaindb_fresh.db),
+            bob_headerdb=FakeAsyncHeaderDB(chaindb_1000.db))
+        client_peers.append(client_peer)
+        server_peer_pool = MockPeerPoolWithConnectedPeers([server_peer])
+        server_request_handler = ETHRequestServer(
+            FakeAsyncChainDB(chaindb_1000.db), server_peer_pool)
+        server_request_handler._handler = SkeletonCountingRequestHandler(
+            FakeAsyncChainDB(chaindb_1000.db), server_request_handler.cancel_token)
+        request_handlers.append(server_request_handler._handler)
+        asyncio.ensure_future(server_request_handler.run())
+        request.addfinalizer(
+            lambda handler=server_request_handler: event_loop.run_until_complete(handler.cancel())
+        )
+
+    class ClientPeerPool(MockPeerPoolWithConnectedPeers):
+        highest_td_peer = client_peers[0]
+
+    client_peer_pool = ClientPeerPool(client_peers)
+    client = FastChainSyncer(ByzantiumTestChain(chaindb_fresh.db), chaindb_fresh, client_peer_pool)
+
+    # FastChainSyncer.run() will return as soon as it's caught up with the peer.
+    await asyncio.wait_for(client.run(), timeout=20)
+
+    head = chaindb_fresh.get_canonical_head()
+    assert head == chaindb_1000.get_canonical_head()
+    # Only the skeleton peer is asked for parent headers, so the other peers got skeleton
+    # requests only when they were asked for the children of a window
+    _, *helper_handlers = request_handlers
+    for handler in helper_handlers:
+        assert handler.skeleton_requests > 0
+
+
+class SkeletonLyingRequestHandler(ETHPeerRequestHandler):
+    """
+    Reply to requests for skeleton headers (i.e. with a skip) with headers that don't match
+    their parents.
+    """
+    async def lookup_headers(self, request):
+        headers = await super().lookup_headers(request)
+        if request.skip == 0:
+            return headers
+        return tuple(header.copy(parent_hash=ZERO_HASH32) for header in headers)
+
+
+@pytest.mark.asyncio
+async def test_skeleton_syncer_with_lying_helper_peer(
+        request, event_loop, monkeypatch, chaindb_fresh, chaindb_1000):
+    # Use short skeleton requests, so that the skeleton spans several windows
+    monkeypatch.setattr(SkeletonSyncer, '_skip_length', 11)
+    monkeypatch.setattr(ETHPeer, 'max_headers_fetch', 10)
+
+    client_peers = []
+    handler_classes = (ETHPeerRequestHandler, ETHPeerRequestHandler, SkeletonLyingRequestHandler)
+    for handler_class in handler_classes:
+        client_peer, server_peer = await get_directly_linked_peers(
+            request, event_loop,
+            alice_headerdb=FakeAsyncHeaderDB(chaindb_fresh.db),
+            bob_headerdb=FakeAsyncHeaderDB(chaindb_1000.db))
+        client_peers.append(client_peer)
+        server_peer_pool = MockPeerPoolWithConnectedPeers([server_peer])
+        server_request_handler = ETHRequestServer(
+            FakeAsyncChainDB(chaindb_1000.db), server_peer_pool)
+        server_request_handler._handler = handler_class(
+            FakeAsyncChainDB(chaindb_1000.db), server_request_handler.cancel_token)
+        asyncio.ensure_future(server_request_handler.run())
+        request.addfinalizer(
+            lambda handler=server_request_handler: event_loop.run_until_complete(handler.cancel())
+        )
+    skeleton_peer, helper_peer, lying_peer = client_peers
+
+    class ClientPeerPool(MockPeerPoolWithConnectedPeers):
+        # The skeleton peer is the authority, so it must be one of the honest ones
+        highest_td_peer = skeleton_peer
+
+    skeleton_syncers = []
+    original_init = SkeletonSyncer.__init__
+
+    def init_and_record(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        skeleton_syncers.append(self)
+    monkeypatch.setattr(SkeletonSyncer, '__init__', init_and_record)
+
+    client_peer_pool = ClientPeerPool(client_peers)
+    client = FastChainSyncer(ByzantiumTestChain(chaindb_fresh.db), chaindb_fresh, client_peer_pool)
+
+    # FastChainSyncer.run() will return as soon as it's caught up with the peer.
+    await asyncio.wait_for(client.run(), timeout=20)
+
+    head = chaindb_fresh.get_canonical_head()
+    assert head == chaindb_1000.get_canonical_head()
+    # The headers from the lying helper were not used, and the skeleton peer was not blamed
+    assert skeleton_peer.is_operational
+    assert helper_peer.is_operational
+    assert any(lying_peer in syncer._failed_helpers for syncer in skeleton_syncers)
+    assert not any(helper_peer in syncer._failed_helpers for syncer in skeleton_syncers)
+
+
 @pytest.mark.asyncio
 async def test_regular_syncer(request, event_loop, chaindb_fresh, chaindb_20):
     client_peer, server_peer = await get_directly_linked_peers(
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from pathlib import Path
 import random
 import re
 
@@ -17,6 +18,7 @@ from cancel_token import CancelToken
 
 from p2p import discovery
 from p2p import kademlia
+from p2p.node_db import NodeDB
 
 from tests.p2p.helpers import (
     get_discovery_protocol,
@@ -339,6 +341,36 @@ def test_find_node_neighbours_v5():
     _test_find_node_neighbours(use_v5=True)
 
 
+@pytest.mark.asyncio
+async def test_packet_processor():
+    alice = get_discovery_protocol(b"alice")
+    bob = get_discovery_protocol(b"bob")
+    processor = discovery.DiscoveryPacketProcessor(bob, CancelToken("test"))
+    processor.max_packets_per_source = 2
+    bob.packet_processor = processor
+    link_transports(alice, bob)
+    received_pings = []
+    bob.recv_ping_v4 = lambda node, payload, hash_: received_pings.append(node)
+
+    for _ in range(3):
+        alice.send_ping_v4(bob.this_node)
+    bob.datagram_received(b'garbage', ('127.0.0.1', 30303))
+    # Packets are only queued when received, and the last ping exceeds the rate limit.
+    assert received_pings == []
+    assert processor.rate_limited_packets == 1
+
+    asyncio.ensure_future(processor.run())
+    for _ in range(100):
+        if processor.processed_packets + processor.defective_packets == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert [node.id for node in received_pings] == [alice.this_node.id] * 2
+    assert processor.processed_packets == 2
+    assert processor.defective_packets == 1
+    assert processor.dropped_packets == 0
+    await processor.cancel()
+
+
 def test_topic_table():
     table = discovery.TopicTable(logging.getLogger("test"))
     topic = b'topic'
@@ -366,6 +398,26 @@ def test_topic_table():
     assert node2 not in table.get_nodes(topic)
 
 
+def test_preferred_nodes_include_known_good_nodes(tmpdir):
+    preferred, known_good = random_node(), random_node()
+    node_db = NodeDB(Path(tmpdir) / 'nodes.sqlite')
+    node_db.record_handshake_success(known_good, 'eth/63')
+    proto = discovery.PreferredNodeDiscoveryProtocol(
+        keys.PrivateKey(keccak(b"seed")),
+        random_address(),
+        (),
+        (preferred,),
+        CancelToken("discovery-test"),
+        node_db=node_db,
+    )
+
+    # The NodeDB is only read when the known good nodes are refreshed, as that blocks.
+    assert proto._get_eligible_preferred_nodes() == (preferred,)
+    proto.refresh_known_good_nodes()
+    assert proto._get_eligible_preferred_nodes() == (preferred, known_good)
+    node_db.close()
+
+
 def remove_whitespace(s):
     return re.sub(r"\s+", "", s)
 
@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+import pytest
+
+from p2p.frame_reader import FrameReader
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_reads_multiple_frames_per_chunk():
+    stream = asyncio.StreamReader()
+    reader = FrameReader(stream, chunk_size=64)
+    data = os.urandom(48)
+    stream.feed_data(data)
+
+    assert bytes(await reader.readexactly(16)) == data[:16]
+    # The rest of the data was read together with the first frame, so it's already buffered.
+    assert reader.buffered == 32
+    assert bytes(reader.consume(16)) == data[16:32]
+    assert bytes(reader.consume(16)) == data[32:]
+    with pytest.raises(ValueError):
+        reader.consume(1)
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_frames_larger_than_chunk_size():
+    stream = asyncio.StreamReader()
+    reader = FrameReader(stream, chunk_size=64)
+    data = os.urandom(1000)
+    stream.feed_data(data)
+
+    head = await reader.readexactly(40)
+    assert bytes(head) == data[:40]
+    # This will not fit in the buffer, so it'll have to grow. Views handed out before that must
+    # not prevent it.
+    assert bytes(await reader.readexactly(900)) == data[40:940]
+    # And once large frames are consumed, we go back to a buffer of the default size.
+    assert bytes(await reader.readexactly(60)) == data[940:]
+    assert len(reader._buffer) == 64
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_waits_for_data():
+    stream = asyncio.StreamReader()
+    reader = FrameReader(stream, chunk_size=64)
+    data = os.urandom(48)
+
+    read_task = asyncio.ensure_future(reader.readexactly(48))
+    for i in range(0, 48, 16):
+        await asyncio.sleep(0)
+        assert not read_task.done()
+        stream.feed_data(data[i:i + 16])
+
+    assert bytes(await read_task) == data
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_eof():
+    stream = asyncio.StreamReader()
+    reader = FrameReader(stream, chunk_size=64)
+    stream.feed_data(b'\x01' * 10)
+    stream.feed_eof()
+
+    with pytest.raises(asyncio.IncompleteReadError) as excinfo:
+        await reader.readexactly(16)
+    assert excinfo.value.partial == b'\x01' * 10
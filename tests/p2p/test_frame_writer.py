@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from p2p import frame_writer
+from p2p.frame_writer import FrameWriter
+from p2p.tools.paragon.helpers import MockStreamWriter
+
+
+@pytest.mark.asyncio
+async def test_frame_writer_coalesces_writes():
+    writes = []
+    writer = FrameWriter(MockStreamWriter(writes.append))
+
+    writer.write(b'header1', b'frame1')
+    writer.write(b'header2', b'frame2')
+    assert writes == []
+    assert writer.frames_sent == 2
+    assert writer.bytes_sent == 26
+
+    # All frames written in the same event loop iteration are written to the transport at once.
+    await asyncio.sleep(0)
+    assert writes == [b'header1frame1header2frame2']
+
+    writer.write(b'header3', b'frame3')
+    await asyncio.sleep(0)
+    assert writes == [b'header1frame1header2frame2', b'header3frame3']
+
+
+@pytest.mark.asyncio
+async def test_frame_writer_close_flushes_pending_frames():
+    writes = []
+    stream_writer = MockStreamWriter(writes.append)
+    writer = FrameWriter(stream_writer)
+
+    writer.write(b'header', b'frame')
+    writer.close()
+    assert writes == [b'headerframe']
+    assert stream_writer.transport.is_closing()
+
+    # Nothing is written once the transport is closed.
+    writer.write(b'header', b'frame')
+    await asyncio.sleep(0)
+    assert writes == [b'headerframe']
+
+
+@pytest.mark.asyncio
+async def test_frame_writer_drain_counts_buffered_frames(monkeypatch):
+    monkeypatch.setattr(frame_writer, 'WRITE_HIGH_WATER_MARK', 10)
+    writes = []
+    writer = FrameWriter(MockStreamWriter(writes.append))
+
+    writer.write(b'header', b'frame')
+    await writer.drain_if_needed()
+    # The transport's buffer is empty, but not the frames we are yet to hand over to it.
+    assert writes == [b'headerframe']
+
+    writer.write(b'short')
+    await writer.drain_if_needed()
+    assert writes == [b'headerframe']
+    await asyncio.sleep(0)
+    assert writes == [b'headerframe', b'short']
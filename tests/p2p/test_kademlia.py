@@ -22,26 +22,40 @@ def test_node_from_uri():
     assert node.pubkey.to_hex() == '0x' + pubkey
 
 
-def test_routingtable_split_bucket():
+def test_routingtable_buckets():
     table = kademlia.RoutingTable(random_node())
-    assert len(table.buckets) == 1
-    old_bucket = table.buckets[0]
-    table.split_bucket(0)
-    assert len(table.buckets) == 2
-    assert old_bucket not in table.buckets
+    assert len(table.buckets) == kademlia.k_id_size
+    for log_distance, bucket in enumerate(table.buckets):
+        node = random_node(table.this_node.id ^ random_id_at_log_distance(log_distance))
+        assert bucket.in_range(node)
+        assert table.get_bucket_for_node(node) is bucket
+    # The buckets cover every ID but our own.
+    assert sum(bucket.end - bucket.start + 1 for bucket in table.buckets) == kademlia.k_max_node_id
 
 
 def test_routingtable_add_node():
     table = kademlia.RoutingTable(random_node())
-    for i in range(table.buckets[0].k):
+    bucket = table.buckets[-1]
+    nodes = [
+        random_node(table.this_node.id ^ random_id_at_log_distance(kademlia.k_id_size - 1))
+        for _ in range(bucket.k + 1)
+    ]
+    for i, node in enumerate(nodes[:-1]):
         # As long as the bucket is not full, the new node is added to the bucket and None is
         # returned.
-        assert table.add_node(random_node()) is None
-        assert len(table.buckets) == 1
+        assert table.add_node(node) is None
         assert len(table) == i + 1
-    assert table.buckets[0].is_full
-    # Now that the bucket is full, an add_node() should cause it to be split.
-    assert table.add_node(random_node()) is None
+    assert bucket.is_full
+    # Now that the bucket is full, the new node goes into its replacement cache and we get the
+    # least recently seen node, which should be evicted if it doesn't reply to a ping.
+    assert table.add_node(nodes[-1]) == nodes[0]
+    assert nodes[-1] not in table
+    assert list(bucket.replacement_cache.values()) == [nodes[-1]]
+    # Nodes in a replacement cache are still known, and are not added to it twice.
+    assert table.is_known(nodes[-1])
+    assert table.add_node(nodes[-1]) == nodes[0]
+    assert list(bucket.replacement_cache.values()) == [nodes[-1]]
+    assert not table.is_known(random_node())
 
 
 def test_routingtable_remove_node():
@@ -64,24 +78,28 @@ def test_routingtable_add_node_error():
 def test_routingtable_neighbours():
     table = kademlia.RoutingTable(random_node())
     for i in range(1000):
-        assert table.add_node(random_node()) is None
-        assert i == len(table) - 1
-
-    for i in range(100):
         node = random_node()
-        nearest_bucket = table.buckets_by_distance_to(node.id)[0]
-        if not nearest_bucket.nodes:
-            continue
-        # Change nodeid to something that is in this bucket's range.
-        node_a = nearest_bucket.nodes[0]
-        node_b = random_node(node_a.id + 1)
-        assert node_a == table.neighbours(node_b.id)[0]
+        if random.random() < 0.5:
+            # Make sure the lower buckets are not all empty.
+            node.id = table.this_node.id ^ random_id_at_log_distance(random.randint(0, 240))
+        table.add_node(node)
+    nodes = list(table)
+
+    targets = [random_node().id for _ in range(100)] + [node.id for node in nodes[:100]]
+    targets.append(table.this_node.id)
+    for target in targets:
+        expected = kademlia.sort_by_distance(nodes, target)[:kademlia.k_bucket_size]
+        assert table.neighbours(target) == expected
+        assert table.neighbours(target, k=3) == expected[:3]
 
 
 def test_routingtable_get_random_nodes():
     table = kademlia.RoutingTable(random_node())
     for i in range(100):
-        assert table.add_node(random_node()) is None
+        # Spread nodes across 20 buckets so that none of them gets full.
+        log_distance = kademlia.k_id_size - 1 - i % 20
+        node = random_node(table.this_node.id ^ random_id_at_log_distance(log_distance))
+        assert table.add_node(node) is None
 
     nodes = list(table.get_random_nodes(50))
     assert len(nodes) == 50
@@ -124,45 +142,42 @@ def test_kbucket_remove():
     for node in nodes:
         bucket.add(node)
     assert bucket.nodes == nodes
-    assert bucket.replacement_cache == []
+    assert not bucket.replacement_cache
 
     replacement_count = 10
     replacement_nodes = [random_node() for _ in range(replacement_count)]
     for replacement_node in replacement_nodes:
         bucket.add(replacement_node)
     assert bucket.nodes == nodes
-    assert bucket.replacement_cache == replacement_nodes
+    assert list(bucket.replacement_cache.values()) == replacement_nodes
 
     for node in nodes:
         bucket.remove_node(node)
     assert bucket.nodes == list(reversed(replacement_nodes))
-    assert bucket.replacement_cache == []
+    assert not bucket.replacement_cache
 
     for replacement_node in replacement_nodes:
         bucket.remove_node(replacement_node)
     assert bucket.nodes == []
-    assert bucket.replacement_cache == []
+    assert not bucket.replacement_cache
 
 
-def test_kbucket_split():
+def test_kbucket_replacement_cache_is_bounded():
     bucket = kademlia.KBucket(0, 100)
-    for i in range(1, bucket.k + 1):
-        node = random_node()
-        # Set the IDs of half the nodes below the midpoint, so when we split we should end up with
-        # two buckets containing k/2 nodes.
-        if i % 2 == 0:
-            node.id = bucket.midpoint + i
-        else:
-            node.id = bucket.midpoint - i
-        bucket.add(node)
-    assert bucket.is_full
-    bucket1, bucket2 = bucket.split()
-    assert bucket1.start == 0
-    assert bucket1.end == 50
-    assert bucket2.start == 51
-    assert bucket2.end == 100
-    assert len(bucket1) == bucket.k / 2
-    assert len(bucket2) == bucket.k / 2
+    bucket.k = 1
+    node = random_node()
+    bucket.add(node)
+
+    replacement_nodes = [random_node() for _ in range(kademlia.k_max_replacements + 2)]
+    for replacement_node in replacement_nodes:
+        assert bucket.add(replacement_node) == node
+    # The least recently seen replacements are dropped once the cache is full.
+    assert list(bucket.replacement_cache.values()) == replacement_nodes[2:]
+
+    # Seeing a node that is already in the cache moves it to the tail.
+    assert bucket.add(replacement_nodes[2]) == node
+    assert list(bucket.replacement_cache.values()) == (
+        replacement_nodes[3:] + [replacement_nodes[2]])
 
 
 def test_bucket_ordering():
@@ -174,67 +189,6 @@ def test_bucket_ordering():
         assert first > third
 
 
-@pytest.mark.parametrize(
-    "bucket_list, node_id",
-    (
-        (list([]), 5),
-        # test for node.id < bucket.end
-        (list([kademlia.KBucket(0, 4)]), 5),
-        # test for node.id > bucket.start
-        (list([kademlia.KBucket(6, 10)]), 5),
-        # test multiple buckets that don't contain node.id
-        (list(
-            [
-                kademlia.KBucket(1, 5),
-                kademlia.KBucket(6, 49),
-                kademlia.KBucket(50, 100),
-            ]
-        ), 0),
-    )
-)
-def test_binary_get_bucket_for_node_error(bucket_list, node_id):
-    node = random_node(nodeid=node_id)
-    with pytest.raises(ValueError):
-        kademlia.binary_get_bucket_for_node(bucket_list, node)
-
-
-@pytest.mark.parametrize(
-    "bucket_list, node_id, correct_position",
-    (
-        (list([kademlia.KBucket(0, 100)]), 5, 0),
-        (list([kademlia.KBucket(0, 49), kademlia.KBucket(50, 100)]), 5, 0),
-        (list(
-            [
-                kademlia.KBucket(0, 1),
-                kademlia.KBucket(2, 5),
-                kademlia.KBucket(6, 49),
-                kademlia.KBucket(50, 100)
-            ]
-        ), 5, 1),
-    )
-)
-def test_binary_get_bucket_for_node(bucket_list, node_id, correct_position):
-    node = random_node(nodeid=node_id)
-    assert kademlia.binary_get_bucket_for_node(bucket_list, node) == bucket_list[correct_position]
-
-
-def test_compute_shared_prefix_bits():
-    # When we have less than 2 nodes, the depth is k_id_size.
-    nodes = [random_node()]
-    assert kademlia._compute_shared_prefix_bits(nodes) == kademlia.k_id_size
-
-    # Otherwise the depth is the number of leading bits (in the left-padded binary representation)
-    # shared by all node IDs.
-    nodes.append(random_node())
-    nodes[0].id = int('0b1', 2)
-    nodes[1].id = int('0b0', 2)
-    assert kademlia._compute_shared_prefix_bits(nodes) == kademlia.k_id_size - 1
-
-    nodes[0].id = int('0b010', 2)
-    nodes[1].id = int('0b110', 2)
-    assert kademlia._compute_shared_prefix_bits(nodes) == kademlia.k_id_size - 3
-
-
 def test_check_relayed_addr():
     public_host = kademlia.Address('8.8.8.8', 80)
     local_host = kademlia.Address('127.0.0.1', 80)
@@ -265,3 +219,8 @@ def random_node(nodeid=None):
     if nodeid is not None:
         node.id = nodeid
     return node
+
+
+def random_id_at_log_distance(log_distance):
+    """Return a random ID whose highest set bit is the given one."""
+    return (1 << log_distance) | random.randint(0, (1 << log_distance) - 1)
@@ -0,0 +1,85 @@
+from pathlib import Path
+import time
+
+import pytest
+
+from p2p import node_db as node_db_module
+from p2p.node_db import NodeDB
+
+from tests.p2p.helpers import random_node
+
+
+@pytest.fixture
+def node_db(tmpdir):
+    db = NodeDB(Path(tmpdir) / 'nodes.sqlite')
+    yield db
+    db.close()
+
+
+def test_node_db_scores(node_db):
+    node = random_node()
+    assert node_db.get_score(node) == 0
+
+    node_db.record_handshake_success(node, 'eth/63')
+    node_db.record_handshake_success(node, 'eth/63')
+    assert node_db.get_score(node) == 2 * node_db_module.HANDSHAKE_SUCCESS_SCORE
+
+    node_db.record_disconnect(node, 'bad_protocol', misbehaved=True, throughput=0)
+    assert node_db.get_score(node) == (
+        2 * node_db_module.HANDSHAKE_SUCCESS_SCORE + node_db_module.MISBEHAVIOUR_SCORE)
+
+
+def test_node_db_best_nodes(node_db):
+    good, better, bad, unknown = [random_node() for _ in range(4)]
+    for node in (good, better):
+        node_db.record_handshake_success(node, 'eth/63')
+    node_db.record_disconnect(good, 'too_many_peers', misbehaved=False, throughput=10)
+    node_db.record_disconnect(better, 'too_many_peers', misbehaved=False, throughput=100)
+    # A zero throughput (e.g. from a short-lived connection) does not replace a previous one.
+    node_db.record_disconnect(better, 'timeout', misbehaved=False, throughput=0)
+    node_db.record_handshake_success(bad, 'eth/63')
+    node_db.record_disconnect(bad, 'useless_peer', misbehaved=True, throughput=1000)
+
+    assert node_db.get_best_nodes(10) == (better, good)
+    assert node_db.get_best_nodes(1) == (better,)
+    assert unknown not in node_db.get_best_nodes(10)
+
+
+def test_node_db_skips_recently_failed_nodes(node_db, monkeypatch):
+    node = random_node()
+    for _ in range(3):
+        node_db.record_handshake_success(node, 'eth/63')
+    node_db.record_handshake_failure(node, 'TimeoutError')
+    assert node_db.get_score(node) > 0
+    assert node_db.get_best_nodes(10) == tuple()
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + node_db_module.FAILURE_BACKOFF + 1)
+    assert node_db.get_best_nodes(10) == (node,)
+
+
+def test_node_db_is_persistent(tmpdir):
+    node = random_node()
+    db_path = Path(tmpdir) / 'nodes.sqlite'
+    db = NodeDB(db_path)
+    db.record_handshake_success(node, 'les/2')
+    db.close()
+
+    db = NodeDB(db_path)
+    assert db.get_best_nodes(10) == (node,)
+    db.close()
+
+
+def test_node_db_queues_updates_until_flushed(tmpdir):
+    node = random_node()
+    db_path = Path(tmpdir) / 'nodes.sqlite'
+    db = NodeDB(db_path)
+    reader = NodeDB(db_path)
+    db.record_handshake_success(node, 'eth/63')
+    db.record_handshake_success(node, 'eth/63')
+    assert reader.get_score(node) == 0
+
+    db.flush()
+    assert reader.get_score(node) == 2 * node_db_module.HANDSHAKE_SUCCESS_SCORE
+    db.close()
+    reader.close()
@@ -0,0 +1,68 @@
+from typing import (
+    Iterable,
+    Iterator,
+)
+
+from bloom_filter import BloomFilter
+
+
+def get_bitno_from_hash(bloom_filter: BloomFilter, key: bytes) -> Iterator[int]:
+    """
+    Derive the bit numbers of the given key directly from its bytes.
+
+    This is only suitable for keys that are already uniformly distributed (e.g. keccak hashes),
+    but is much faster than the pure-python hash functions used by default in ``BloomFilter``.
+    """
+    hash_value1 = int.from_bytes(key[:8], 'big')
+    hash_value2 = int.from_bytes(key[8:16], 'big')
+    for probeno in range(1, bloom_filter.num_probes_k + 1):
+        yield (hash_value1 + probeno * hash_value2) % bloom_filter.num_bits_m
+
+
+class RotatingBloomFilter:
+    """
+    A set of hashes with bounded memory usage and false-positive rate, at the cost of eventually
+    forgetting old items.
+
+    Items are added to the current generation, and once that is full it replaces the previous
+    generation, which is discarded. Membership is checked against both generations, so an item
+    is remembered for at least ``generation_size`` insertions.
+    """
+    def __init__(self, generation_size: int, error_rate: float = 0.01) -> None:
+        self.generation_size = generation_size
+        self.error_rate = error_rate
+        self._current = self._new_generation()
+        self._previous = self._new_generation()
+        self._current_size = 0
+
+    def _new_generation(self) -> BloomFilter:
+        return BloomFilter(
+            max_elements=self.generation_size,
+            error_rate=self.error_rate,
+            probe_bitnoer=get_bitno_from_hash,
+        )
+
+    def add(self, key: bytes) -> None:
+        if self._current_size >= self.generation_size:
+            self._previous = self._current
+            self._current = self._new_generation()
+            self._current_size = 0
+        self._current.add(key)
+        self._current_size += 1
+
+    def update(self, keys: Iterable[bytes]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._current or key in self._previous
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Return the number of bytes used by the bit arrays of both generations.
+        """
+        return sum(
+            len(bloom.backend.array_) * bloom.backend.array_.itemsize
+            for bloom in (self._current, self._previous)
+        )
@@ -140,6 +140,9 @@ def construct_trinity_config_params(
     else:
         yield 'max_peers', _default_max_peers(args.sync_mode)
 
+    if args.max_pipelined_requests is not None:
+        yield 'max_pipelined_requests', args.max_pipelined_requests
+
     if args.port is not None:
         yield 'port', args.port
 
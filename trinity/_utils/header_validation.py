@@ -0,0 +1,147 @@
+import asyncio
+from concurrent.futures import Executor
+import functools
+import pickle
+import random
+from typing import (
+    Dict,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from eth_utils import (
+    ValidationError,
+)
+from eth_utils.toolz import (
+    concatv,
+    groupby,
+    partition_all,
+    sliding_window,
+)
+
+from eth.chains.base import BaseChain
+from eth.rlp.headers import BlockHeader
+from eth.vm.base import BaseVM
+
+# A parent header and a chain of its descendants, as taken by `BaseChain.validate_chain()`
+HeaderChainSegment = Tuple[BlockHeader, Tuple[BlockHeader, ...]]
+
+# Maximum number of seals verified by a single job in the process pool. Each job has to send its
+# headers to a worker, so we don't want them to be too small.
+SEAL_CHECKS_PER_JOB = 16
+
+_is_picklable: Dict[Type[BaseVM], bool] = {}
+
+
+async def validate_header_chains(
+        chain: BaseChain,
+        segments: Sequence[HeaderChainSegment],
+        seal_check_random_sample_rate: int = 1,
+        executor: Executor = None) -> None:
+    """
+    Validate all the given segments of headers, as `BaseChain.validate_chain()` would.
+
+    When an executor is given, the seals are verified in it, in jobs of up to
+    ``SEAL_CHECKS_PER_JOB`` headers, so that segments from many peers are verified in parallel.
+    Everything else (including verifying the seals of VMs that can't be pickled) is done in the
+    default executor of the event loop.
+
+    :raise eth_utils.ValidationError: if any of the segments is invalid
+    """
+    loop = asyncio.get_event_loop()
+    if executor is None:
+        await loop.run_in_executor(None, functools.partial(
+            _validate_chains,
+            chain,
+            segments,
+            seal_check_random_sample_rate,
+        ))
+        return
+
+    seals_to_check = await loop.run_in_executor(None, functools.partial(
+        _validate_chains_except_seals,
+        chain,
+        segments,
+        seal_check_random_sample_rate,
+    ))
+    jobs = []
+    for vm_class, checks in groupby(lambda check: check[0], seals_to_check).items():
+        job_executor = executor if _is_vm_class_picklable(vm_class) else None
+        headers = tuple(header for _, header in checks)
+        for batch in partition_all(SEAL_CHECKS_PER_JOB, headers):
+            jobs.append(loop.run_in_executor(job_executor, _validate_seals, vm_class, batch))
+    await asyncio.gather(*jobs)
+
+
+def _validate_chains(
+        chain: BaseChain,
+        segments: Sequence[HeaderChainSegment],
+        seal_check_random_sample_rate: int) -> None:
+    for parent, headers in segments:
+        chain.validate_chain(parent, headers, seal_check_random_sample_rate)
+
+
+def _validate_chains_except_seals(
+        chain: BaseChain,
+        segments: Sequence[HeaderChainSegment],
+        seal_check_random_sample_rate: int) -> List[Tuple[Type[BaseVM], BlockHeader]]:
+    """
+    Validate the segments like `BaseChain.validate_chain()`, except for the seals. Instead,
+    return the headers whose seal must be verified, with the VM class to verify it.
+    """
+    seals_to_check = []
+    for root, descendants in segments:
+        indices_to_check_seal = _sample_seal_indices(
+            len(descendants),
+            seal_check_random_sample_rate,
+        )
+        header_pairs = sliding_window(2, concatv([root], descendants))
+        for index, (parent, child) in enumerate(header_pairs):
+            if child.parent_hash != parent.hash:
+                raise ValidationError(
+                    f"Invalid header chain; {child} has parent {child.parent_hash}, "
+                    f"but expected {parent.hash}"
+                )
+            vm_class = chain.get_vm_class_for_block_number(child.block_number)
+            try:
+                vm_class.validate_header(child, parent, check_seal=False)
+            except ValidationError as exc:
+                raise ValidationError(f"{child} is not a valid child of {parent}: {exc}") from exc
+            if index in indices_to_check_seal:
+                seals_to_check.append((vm_class, child))
+    return seals_to_check
+
+
+def _sample_seal_indices(num_headers: int, seal_check_random_sample_rate: int) -> Set[int]:
+    all_indices = range(num_headers)
+    if seal_check_random_sample_rate == 1:
+        return set(all_indices)
+    else:
+        sample_size = num_headers // seal_check_random_sample_rate
+        return set(random.sample(all_indices, sample_size))
+
+
+def _validate_seals(vm_class: Type[BaseVM], headers: Tuple[BlockHeader, ...]) -> None:
+    # When running in a worker process, the ethash cache of each epoch is generated the first
+    # time we verify a seal in it, and kept around (by eth.consensus.pow) for later jobs.
+    for header in headers:
+        try:
+            vm_class.validate_seal(header)
+        except ValidationError as exc:
+            raise ValidationError(f"{header} has an invalid seal: {exc}") from exc
+
+
+def _is_vm_class_picklable(vm_class: Type[BaseVM]) -> bool:
+    # VM classes created on the fly with `configure()` (e.g. in tests) can't be pickled, so
+    # they can't be sent to the worker processes.
+    if vm_class not in _is_picklable:
+        try:
+            pickle.dumps(vm_class)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            _is_picklable[vm_class] = False
+        else:
+            _is_picklable[vm_class] = True
+    return _is_picklable[vm_class]
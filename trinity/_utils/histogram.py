@@ -0,0 +1,70 @@
+import bisect
+from contextlib import contextmanager
+import time
+from typing import (
+    Iterator,
+    List,
+    Sequence,
+)
+
+# Upper bounds (in seconds) of the buckets request latencies are counted in
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class LatencyHistogram:
+    """
+    Count latencies in buckets: ``counts[i]`` is the number of latencies that were no higher than
+    ``buckets[i]`` (but higher than the bucket before it), and the last count is the number of
+    latencies higher than every bucket.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        if list(buckets) != sorted(buckets):
+            raise ValueError(f"Histogram buckets must be sorted, got {buckets}")
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, latency: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, latency)] += 1
+        self.total += 1
+        self.sum += latency
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """
+        Count the time it takes to run the body of the ``with`` statement.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Return the upper bound of the bucket that holds the given percentile (in the range
+        [0, 1]) of the latencies, or ``inf`` if it's higher than all buckets.
+        """
+        if not self.total:
+            raise ValueError("No data for percentile calculation")
+
+        rank = percentile * self.total
+        seen = 0
+        for upper_bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return upper_bound
+        return float('inf')
+
+    def __str__(self) -> str:
+        if not self.total:
+            return "no requests"
+        return "requests=%d  mean=%0.1fms  p50<=%gms  p99<=%gms" % (
+            self.total,
+            self.sum * 1000 / self.total,
+            self.percentile(0.5) * 1000,
+            self.percentile(0.99) * 1000,
+        )
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import (
+    Sequence,
+    Tuple,
+)
 
 from eth_typing import BlockNumber, Hash32
 
@@ -8,6 +11,13 @@ from eth.rlp.blocks import BaseBlock
 from eth.rlp.headers import BlockHeader
 from eth.rlp.receipts import Receipt
 
+from p2p._utils import get_header_validation_executor
+
+from trinity._utils.header_validation import (
+    HeaderChainSegment,
+    validate_header_chains,
+)
+
 
 # This class is a work in progress; its main purpose is to define the API of an asyncio-compatible
 # Chain implementation.
@@ -27,6 +37,17 @@ class BaseAsyncChainAPI(ABC):
             seal_check_random_sample_rate: int = 1) -> None:
         pass
 
+    @abstractmethod
+    async def coro_validate_chains(
+            self,
+            segments: Sequence[HeaderChainSegment],
+            seal_check_random_sample_rate: int = 1) -> None:
+        """
+        Validate many segments of headers at once, each given as a parent header and the chain
+        of its descendants (as passed to :meth:`coro_validate_chain`).
+        """
+        pass
+
     @abstractmethod
     async def coro_validate_receipt(self,
                                     receipt: Receipt,
@@ -50,4 +71,21 @@ class BaseAsyncChainAPI(ABC):
 
 
 class BaseAsyncChain(BaseAsyncChainAPI, BaseChain):
-    pass
+    async def coro_validate_chain(
+            self,
+            parent: BlockHeader,
+            chain: Tuple[BlockHeader, ...],
+            seal_check_random_sample_rate: int = 1) -> None:
+        await self.coro_validate_chains(((parent, chain),), seal_check_random_sample_rate)
+
+    async def coro_validate_chains(
+            self,
+            segments: Sequence[HeaderChainSegment],
+            seal_check_random_sample_rate: int = 1) -> None:
+        # Seals are verified in the header validation process pool, if there is one
+        await validate_header_chains(
+            self,
+            segments,
+            seal_check_random_sample_rate,
+            get_header_validation_executor(),
+        )
@@ -56,9 +56,6 @@ from eth.vm.computation import (
 from trinity.sync.light.service import (
     BaseLightPeerChain,
 )
-from trinity._utils.async_dispatch import (
-    async_method,
-)
 
 from .base import BaseAsyncChain
 
@@ -252,5 +249,3 @@ class LightDispatchChain(BaseAsyncChain):
 
     def validate_uncles(self, block: BaseBlock) -> None:
         raise NotImplementedError("Chain classes must implement " + inspect.stack()[0][3])
-
-    coro_validate_chain = async_method('validate_chain')
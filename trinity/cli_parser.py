@@ -14,6 +14,7 @@ from p2p.kademlia import Node
 
 from trinity import __version__
 from trinity.constants import (
+    DEFAULT_MSG_DECODING_THRESHOLD,
     MAINNET_NETWORK_ID,
     ROPSTEN_NETWORK_ID,
 )
@@ -40,6 +41,20 @@ class ValidateAndStoreEnodes(argparse.Action):
         enode_list.append(enode)
 
 
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return number
+
+
 LOG_LEVEL_CHOICES = {
     # numeric versions
     '8': DEBUG2_LEVEL_NUM,
@@ -241,6 +256,45 @@ network_parser.add_argument(
     type=int,
 )
 
+network_parser.add_argument(
+    '--max-pipelined-requests',
+    help=(
+        "Maximum number of requests of each type we may have in flight to a single peer. "
+        "When greater than 1, the number of requests in flight adapts to each peer's latency "
+        "and throughput. Defaults to 1 (one request at a time)"
+    ),
+    type=positive_int,
+)
+
+network_parser.add_argument(
+    '--msg-decoding-workers',
+    help=(
+        "Number of processes used to decode large block headers, bodies, receipts and node data "
+        "msgs received from peers. By default they're decoded in the networking process"
+    ),
+    type=non_negative_int,
+    default=0,
+)
+
+network_parser.add_argument(
+    '--msg-decoding-threshold',
+    help=(
+        "Minimum size (in bytes) of msgs to be decoded by the --msg-decoding-workers"
+    ),
+    type=non_negative_int,
+    default=DEFAULT_MSG_DECODING_THRESHOLD,
+)
+
+network_parser.add_argument(
+    '--header-validation-workers',
+    help=(
+        "Number of processes used to verify the seals of headers received from peers while "
+        "syncing. By default they're verified in the networking process"
+    ),
+    type=non_negative_int,
+    default=0,
+)
+
 
 #
 # Chain configuration
@@ -45,6 +45,7 @@ from trinity.constants import (
     LOG_DIR,
     LOG_FILE,
     MAINNET_NETWORK_ID,
+    NODE_DB_FILE,
     PID_DIR,
     ROPSTEN_NETWORK_ID,
     SYNC_LIGHT,
@@ -78,6 +79,7 @@ if TYPE_CHECKING:
     from trinity.chains.light import LightDispatchChain  # noqa: F401
 
 DATABASE_DIR_NAME = 'chain'
+STATE_SYNC_DIR_NAME = 'state-sync'
 
 MAINNET_EIP1085_PATH = ASSETS_DIR / 'eip1085' / 'mainnet.json'
 ROPSTEN_EIP1085_PATH = ASSETS_DIR / 'eip1085' / 'ropsten.json'
@@ -224,6 +226,7 @@ class TrinityConfig:
                  app_identifier: str="",
                  genesis_config: Dict[str, Any]=None,
                  max_peers: int=25,
+                 max_pipelined_requests: int=1,
                  trinity_root_dir: str=None,
                  data_dir: str=None,
                  nodekey_path: str=None,
@@ -235,6 +238,7 @@ class TrinityConfig:
         self.app_identifier = app_identifier
         self.network_id = network_id
         self.max_peers = max_peers
+        self.max_pipelined_requests = max_pipelined_requests
         self.port = port
         self.use_discv5 = use_discv5
         self._app_configs = {}
@@ -374,6 +378,13 @@ class TrinityConfig:
         """
         return self.with_app_suffix(self.data_dir / IPC_DIR)
 
+    @property
+    def node_db_path(self) -> Path:
+        """
+        Path of the database where we keep track of the nodes we've connected to.
+        """
+        return self.with_app_suffix(self.data_dir / NODE_DB_FILE)
+
     @property
     def pid_dir(self) -> Path:
         """
@@ -538,6 +549,17 @@ class Eth1AppConfig(BaseAppConfig):
         else:
             raise Exception(f"Unsupported Database Mode: {self.database_mode}")
 
+    @property
+    def state_sync_checkpoint_path(self) -> Path:
+        """
+        Path where the state sync checkpoint is stored, allowing an interrupted state sync
+        to be resumed.
+
+        This is resolved relative to the ``data_dir``
+        """
+        path = self.trinity_config.data_dir / STATE_SYNC_DIR_NAME
+        return self.trinity_config.with_app_suffix(path) / "checkpoint"
+
     @property
     def database_mode(self) -> Eth1DbMode:
         if self.sync_mode == SYNC_LIGHT:
@@ -25,6 +25,7 @@ ASSETS_DIR = Path(__file__).parent / "assets"
 IPC_DIR = 'ipcs'
 LOG_DIR = 'logs'
 LOG_FILE = 'trinity.log'
+NODE_DB_FILE = 'nodes.sqlite'
 PID_DIR = 'pids'
 
 # sync modes
@@ -32,6 +33,13 @@ SYNC_FULL = 'full'
 SYNC_FAST = 'fast'
 SYNC_LIGHT = 'light'
 
+# Msgs smaller than this (in bytes) are always decoded in the event loop, as the overhead of
+# sending them to the msg decoding executor would outweigh the cost of decoding them.
+DEFAULT_MSG_DECODING_THRESHOLD = 64 * 1024
+
+# Size (in bytes) of the cache of trie nodes and block data in the JSON-RPC process
+DEFAULT_RPC_DB_CACHE_SIZE = 64 * 1024 * 1024
+
 # lahja endpoint names
 MAIN_EVENTBUS_ENDPOINT = 'main'
 NETWORKING_EVENTBUS_ENDPOINT = 'networking'
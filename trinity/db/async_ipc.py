@@ -0,0 +1,383 @@
+"""
+A native asyncio protocol for talking to the database process.
+
+Unlike the ``BaseManager`` proxies, which perform one blocking round trip per call on a thread from
+the default executor, clients of this protocol write length-prefixed request frames tagged with a
+request ID over a single Unix socket and are free to have many requests in flight at once. The
+server replies to each frame with a response tagged with the same request ID.
+
+Request frames look like ``length(4) | request_id(4) | opcode(1) | items`` and response frames
+like ``length(4) | request_id(4) | status(1) | body``, where ``items`` is a sequence of
+length-prefixed byte strings.
+"""
+import asyncio
+from contextlib import contextmanager
+import itertools
+import logging
+import pathlib
+import struct
+import threading
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from eth.db.atomic import AtomicDBWriteBatch
+from eth.db.backends.base import BaseDB
+
+from p2p.frame_writer import FrameWriter
+
+from trinity.db.base import (
+    BaseAsyncDB,
+    MultiKeyDB,
+)
+from trinity.exceptions import RemoteDBError
+
+
+LENGTH_PREFIX = struct.Struct('>I')
+FRAME_HEADER = struct.Struct('>IB')
+
+# Used in place of an item's length to signal a missing value in MULTI_GET responses.
+MISSING_ITEM = 2**32 - 1
+
+# Request opcodes
+GET = 0
+EXISTS = 1
+SET = 2
+DELETE = 3
+MULTI_GET = 4
+MULTI_EXISTS = 5
+MULTI_SET = 6
+
+# Response status codes
+STATUS_OK = 0
+STATUS_KEY_ERROR = 1
+STATUS_ERROR = 2
+
+
+def get_async_db_ipc_path(database_ipc_path: pathlib.Path) -> pathlib.Path:
+    """
+    Return the path of the async DB socket that lives alongside the ``BaseManager`` socket at
+    ``database_ipc_path``.
+    """
+    return database_ipc_path.with_name(
+        database_ipc_path.stem + '-async' + database_ipc_path.suffix)
+
+
+def encode_items(items: Iterable[Optional[bytes]]) -> bytes:
+    return b''.join(
+        LENGTH_PREFIX.pack(MISSING_ITEM) if item is None else LENGTH_PREFIX.pack(len(item)) + item
+        for item in items
+    )
+
+
+def decode_items(data: bytes) -> List[Optional[bytes]]:
+    items: List[Optional[bytes]] = []
+    offset = 0
+    while offset < len(data):
+        length, = LENGTH_PREFIX.unpack_from(data, offset)
+        offset += LENGTH_PREFIX.size
+        if length == MISSING_ITEM:
+            items.append(None)
+        else:
+            items.append(data[offset:offset + length])
+            offset += length
+    return items
+
+
+def encode_frame(request_id: int, code: int, body: bytes) -> bytes:
+    header = FRAME_HEADER.pack(request_id, code)
+    return LENGTH_PREFIX.pack(len(header) + len(body)) + header + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """
+    Read a single frame, returning its request ID, opcode/status and body.
+
+    Raises ``asyncio.IncompleteReadError`` if the connection is closed midway.
+    """
+    length_data = await reader.readexactly(LENGTH_PREFIX.size)
+    length, = LENGTH_PREFIX.unpack(length_data)
+    payload = await reader.readexactly(length)
+    request_id, code = FRAME_HEADER.unpack_from(payload)
+    return request_id, code, payload[FRAME_HEADER.size:]
+
+
+class AsyncDBServer:
+    """
+    Serve the given DB over the async DB protocol on a Unix socket.
+    """
+    logger = logging.getLogger('trinity.db.async_ipc.AsyncDBServer')
+
+    def __init__(self, db: BaseDB, ipc_path: pathlib.Path) -> None:
+        self.db = db
+        self._multi_key_db = MultiKeyDB(db)
+        self.ipc_path = ipc_path
+        self._handlers: Dict[int, Callable[[List[bytes]], bytes]] = {
+            GET: self._get,
+            EXISTS: self._exists,
+            SET: self._set,
+            DELETE: self._delete,
+            MULTI_GET: self._multi_get,
+            MULTI_EXISTS: self._multi_exists,
+            MULTI_SET: self._multi_set,
+        }
+        self._server: asyncio.AbstractServer = None
+        self._connections: Set['asyncio.Future[None]'] = set()
+
+    async def start(self) -> None:
+        if self.ipc_path.exists():
+            self.ipc_path.unlink()
+        self._server = await asyncio.start_unix_server(
+            self._accept_connection,
+            str(self.ipc_path),
+        )
+
+    async def stop(self) -> None:
+        self._server.close()
+        for connection in self._connections:
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        if self.ipc_path.exists():
+            self.ipc_path.unlink()
+
+    def _accept_connection(self,
+                           reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+        connection = asyncio.ensure_future(self._handle_connection(reader, writer))
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+
+    async def _handle_connection(self,
+                                 reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        frame_writer = FrameWriter(writer)
+        try:
+            while True:
+                request_id, opcode, body = await read_frame(reader)
+                frame_writer.write(self._handle_request(request_id, opcode, body))
+                await frame_writer.drain_if_needed()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            frame_writer.close()
+
+    def _handle_request(self, request_id: int, opcode: int, body: bytes) -> bytes:
+        try:
+            handler = self._handlers[opcode]
+        except KeyError:
+            return encode_frame(request_id, STATUS_ERROR, b'Unknown opcode: %d' % opcode)
+
+        try:
+            result = handler(decode_items(body))
+        except KeyError:
+            return encode_frame(request_id, STATUS_KEY_ERROR, b'')
+        except Exception as e:
+            self.logger.exception("Error handling async DB request")
+            return encode_frame(request_id, STATUS_ERROR, repr(e).encode())
+        return encode_frame(request_id, STATUS_OK, result)
+
+    def _get(self, args: List[bytes]) -> bytes:
+        key, = args
+        return self.db[key]
+
+    def _exists(self, args: List[bytes]) -> bytes:
+        key, = args
+        return b'\x01' if self.db.exists(key) else b''
+
+    def _set(self, args: List[bytes]) -> bytes:
+        key, value = args
+        self.db[key] = value
+        return b''
+
+    def _delete(self, args: List[bytes]) -> bytes:
+        key, = args
+        self.db.delete(key)
+        return b''
+
+    def _multi_get(self, keys: List[bytes]) -> bytes:
+        return encode_items(self._multi_key_db.multi_get(keys))
+
+    def _multi_exists(self, keys: List[bytes]) -> bytes:
+        return bytes(self._multi_key_db.multi_exists(keys))
+
+    def _multi_set(self, args: List[bytes]) -> bytes:
+        # Keys and values are sent interleaved.
+        self._multi_key_db.multi_set(tuple(zip(args[::2], args[1::2])))
+        return b''
+
+
+@contextmanager
+def serve_async_db_in_thread(db: BaseDB, ipc_path: pathlib.Path) -> Iterator[AsyncDBServer]:
+    """
+    Run an :class:`AsyncDBServer` on a new event loop in a daemon thread for as long as the
+    context is active.
+
+    The context is only entered once the server is accepting connections, so that clients may
+    connect as soon as the ``BaseManager`` socket becomes available. Any error starting the server
+    is raised here. On exit the server is stopped and its socket removed.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name='AsyncDBServer', daemon=True)
+    thread.start()
+    try:
+        server = AsyncDBServer(db, ipc_path)
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        try:
+            yield server
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+class AsyncDBClient(BaseAsyncDB):
+    """
+    An implementation of ``BaseAsyncDB`` whose ``coro_*`` methods talk to an
+    :class:`AsyncDBServer`, pipelining all requests over a single connection.
+
+    Synchronous calls are delegated to ``sync_db`` (usually a ``BaseManager`` proxy).
+    """
+    logger = logging.getLogger('trinity.db.async_ipc.AsyncDBClient')
+
+    def __init__(self, ipc_path: pathlib.Path, sync_db: BaseDB) -> None:
+        self.ipc_path = ipc_path
+        self.sync_db = sync_db
+        self._request_ids: Iterator[int] = itertools.count()
+        self._pending: Dict[int, 'asyncio.Future[bytes]'] = {}
+        self._writer: FrameWriter = None
+        self._reader_task: 'asyncio.Future[None]' = None
+        self._connect_lock: asyncio.Lock = None
+
+    #
+    # Async API
+    #
+    async def coro_get(self, key: bytes) -> bytes:
+        return await self._request(GET, (key,))
+
+    async def coro_set(self, key: bytes, value: bytes) -> None:
+        await self._request(SET, (key, value))
+
+    async def coro_delete(self, key: bytes) -> None:
+        await self._request(DELETE, (key,))
+
+    async def coro_exists(self, key: bytes) -> bool:
+        return await self._request(EXISTS, (key,)) == b'\x01'
+
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        if not keys:
+            return tuple()
+        return tuple(decode_items(await self._request(MULTI_GET, keys)))
+
+    async def coro_multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        if not keys:
+            return tuple()
+        result = await self._request(MULTI_EXISTS, keys)
+        return tuple(bool(flag) for flag in result)
+
+    async def coro_multi_set(self, items: Sequence[Tuple[bytes, bytes]]) -> None:
+        if not items:
+            return
+        await self._request(MULTI_SET, tuple(itertools.chain.from_iterable(items)))
+
+    def close(self) -> None:
+        """
+        Close the connection to the server, failing any requests still waiting for a response.
+        """
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+
+    @property
+    def pending_requests(self) -> int:
+        return len(self._pending)
+
+    async def _connect(self) -> FrameWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._writer is None:
+                reader, writer = await asyncio.open_unix_connection(str(self.ipc_path))
+                self._writer = FrameWriter(writer)
+                self._reader_task = asyncio.ensure_future(
+                    self._read_responses(reader, self._writer))
+            return self._writer
+
+    async def _request(self, opcode: int, args: Sequence[bytes]) -> bytes:
+        # The connection may be lost (and self._writer reset) whenever we yield to the event loop,
+        # so we only ever use the writer we got back from _connect(), without yielding in between.
+        writer = self._writer
+        if writer is None:
+            writer = await self._connect()
+
+        request_id = next(self._request_ids) % 2**32
+        future: 'asyncio.Future[bytes]' = asyncio.Future()
+        self._pending[request_id] = future
+        writer.write(encode_frame(request_id, opcode, encode_items(args)))
+        await writer.drain_if_needed()
+
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: FrameWriter) -> None:
+        try:
+            while True:
+                request_id, status, body = await read_frame(reader)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    # The caller was cancelled before the response arrived.
+                    continue
+                elif status == STATUS_OK:
+                    future.set_result(body)
+                elif status == STATUS_KEY_ERROR:
+                    future.set_exception(KeyError())
+                else:
+                    future.set_exception(RemoteDBError(body.decode()))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.logger.debug("Connection to async DB server lost: %r", e)
+        finally:
+            # Fail any requests still waiting for a response, and make sure the next request
+            # opens a new connection.
+            if self._writer is writer:
+                self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to async DB server lost"))
+
+    #
+    # Sync API
+    #
+    def __getitem__(self, key: bytes) -> bytes:
+        return self.sync_db[key]
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        self.sync_db[key] = value
+
+    def __delitem__(self, key: bytes) -> None:
+        del self.sync_db[key]
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self.sync_db
+
+    def exists(self, key: bytes) -> bool:
+        return self.sync_db.exists(key)
+
+    def atomic_batch(self) -> ContextManager[AtomicDBWriteBatch]:
+        return self.sync_db.atomic_batch()
@@ -1,7 +1,12 @@
 from abc import abstractmethod
 from contextlib import contextmanager
 from typing import (
+    Any,
     Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
 )
 # Typeshed definitions for multiprocessing.managers is incomplete, so ignore them for now:
 # https://github.com/python/typeshed/blob/85a788dbcaa5e9e9a62e55f15d44530cd28ba830/stdlib/3/multiprocessing/managers.pyi#L3
@@ -9,7 +14,10 @@ from multiprocessing.managers import (  # type: ignore
     BaseProxy,
 )
 
-from eth.db.backends.base import BaseDB
+from eth.db.backends.base import (
+    BaseAtomicDB,
+    BaseDB,
+)
 from eth.db.atomic import AtomicDBWriteBatch
 
 from trinity._utils.mp import async_method
@@ -28,6 +36,72 @@ class BaseAsyncDB(BaseDB):
     async def coro_exists(self, key: bytes) -> bool:
         pass
 
+    @abstractmethod
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        pass
+
+    @abstractmethod
+    async def coro_multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        pass
+
+    @abstractmethod
+    async def coro_multi_set(self, items: Sequence[Tuple[bytes, bytes]]) -> None:
+        pass
+
+
+class MultiKeyMixin:
+    """
+    Implement the multi-key API in terms of the single-key methods of a DB, so that callers
+    talking to a DB over IPC can read or write many keys with a single round trip.
+    """
+
+    def multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        """
+        Return the values for all given keys, in order, with ``None`` in place of missing keys.
+        """
+        return tuple(self._get_or_none(key) for key in keys)
+
+    def multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        return tuple(self.exists(key) for key in keys)  # type: ignore
+
+    def multi_set(self, items: Sequence[Tuple[bytes, bytes]]) -> None:
+        for key, value in items:
+            self.set(key, value)  # type: ignore
+
+    def _get_or_none(self, key: bytes) -> Optional[bytes]:
+        # Some DBs (e.g. ChainDB) raise KeyError from get() rather than returning None.
+        try:
+            return self.get(key)  # type: ignore
+        except KeyError:
+            return None
+
+
+class MultiKeyDB(MultiKeyMixin):
+    """
+    Wrap the given DB, delegating all attribute accesses to it while adding the multi-key API.
+
+    This is meant to be used on the server side of a ``BaseManager``, where the wrapped DB is
+    exposed through a proxy.
+    """
+
+    def __init__(self, db: BaseDB) -> None:
+        self._db = db
+
+    def __dir__(self) -> List[str]:
+        return sorted(set(dir(self._db)).union(dir(MultiKeyMixin)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db, name)
+
+    def multi_set(self, items: Sequence[Tuple[bytes, bytes]]) -> None:
+        # Write all items in a single batch when the underlying DB supports it.
+        if not isinstance(self._db, BaseAtomicDB):
+            return super().multi_set(items)
+
+        with self._db.atomic_batch() as batch:
+            for key, value in items:
+                batch[key] = value
+
 
 class AsyncDBPreProxy(BaseAsyncDB):
     """
@@ -46,6 +120,9 @@ class AsyncDBPreProxy(BaseAsyncDB):
         'delete',
         'exists',
         'get',
+        'multi_exists',
+        'multi_get',
+        'multi_set',
         'set',
     )
 
@@ -54,6 +131,9 @@ class AsyncDBPreProxy(BaseAsyncDB):
 
     coro_set = async_method('set')
     coro_exists = async_method('exists')
+    coro_multi_get = async_method('multi_get')
+    coro_multi_exists = async_method('multi_exists')
+    coro_multi_set = async_method('multi_set')
 
     def get(self, key: bytes) -> bytes:
         return self._callmethod('get', (key,))
@@ -79,6 +159,15 @@ class AsyncDBPreProxy(BaseAsyncDB):
     def __contains__(self, key: bytes) -> bool:
         return self._callmethod('__contains__', (key,))
 
+    def multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        return self._callmethod('multi_get', (keys,))
+
+    def multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        return self._callmethod('multi_exists', (keys,))
+
+    def multi_set(self, items: Sequence[Tuple[bytes, bytes]]) -> None:
+        return self._callmethod('multi_set', (items,))
+
     @contextmanager
     def atomic_batch(self) -> Generator['AtomicDBWriteBatch', None, None]:
         with AtomicDBWriteBatch._commit_unless_raises(self) as readable_batch:
@@ -7,7 +7,10 @@ from eth2.beacon.db.chain import BeaconChainDB
 from eth.db.backends.base import BaseAtomicDB
 
 from trinity.config import TrinityConfig
-from trinity.db.base import AsyncDBProxy
+from trinity.db.base import (
+    AsyncDBProxy,
+    MultiKeyDB,
+)
 from trinity.db.beacon.chain import AsyncBeaconChainDBProxy
 
 from trinity._utils.mp import TracebackRecorder
@@ -24,7 +27,10 @@ def create_db_server_manager(trinity_config: TrinityConfig,
         pass
 
     DBManager.register(
-        'get_db', callable=lambda: TracebackRecorder(base_db), proxytype=AsyncDBProxy)
+        'get_db',
+        callable=lambda: TracebackRecorder(MultiKeyDB(base_db)),
+        proxytype=AsyncDBProxy,
+    )
 
     DBManager.register(
         'get_chaindb',
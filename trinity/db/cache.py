@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+from typing import (
+    Any,
+    Generator,
+)
+
+from eth_hash.auto import keccak
+
+from eth.db.backends.base import BaseAtomicDB
+
+
+class ContentAddressedCacheDB(BaseAtomicDB):
+    """
+    Read-through cache in front of another database, for the values that are stored under their
+    own keccak hash: trie nodes (which include the transactions and receipts of blocks), block
+    headers, uncle lists and contract code.
+
+    Those values can never change, so they never need to be invalidated. Everything else (like
+    the canonical head or the block number to hash lookups) is always read from the wrapped
+    database. The least recently used values are evicted once the cached values add up to more
+    than ``max_size_bytes``. It may be used from several threads at once.
+    """
+    def __init__(self, db: BaseAtomicDB, max_size_bytes: int) -> None:
+        self._db = db
+        self._max_size_bytes = max_size_bytes
+        self._cached_values: 'OrderedDict[bytes, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key: bytes) -> bytes:
+        with self._lock:
+            try:
+                value = self._cached_values[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cached_values.move_to_end(key)
+                return value
+
+        value = self._db[key]
+        if len(key) == 32 and keccak(value) == key:
+            self._cache(key, value)
+        return value
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        self._db[key] = value
+
+    def _exists(self, key: bytes) -> bool:
+        with self._lock:
+            if key in self._cached_values:
+                return True
+        return self._db.exists(key)
+
+    def __delitem__(self, key: bytes) -> None:
+        self._uncache(key)
+        del self._db[key]
+
+    def summarize_stats(self) -> str:
+        lookups = self.hits + self.misses
+        return "hits=%d  misses=%d  hit_rate=%0.1f%%  size=%0.1fMB" % (
+            self.hits,
+            self.misses,
+            100 * self.hits / lookups if lookups else 0,
+            self.size_bytes / (1024 * 1024),
+        )
+
+    @contextmanager
+    def atomic_batch(self) -> Generator[Any, None, None]:
+        with self._db.atomic_batch() as batch:
+            yield batch
+
+    def _cache(self, key: bytes, value: bytes) -> None:
+        size = len(value)
+        if size > self._max_size_bytes:
+            return
+        with self._lock:
+            if key in self._cached_values:
+                # another thread read it in the meantime
+                return
+            self._cached_values[key] = value
+            self.size_bytes += size
+            while self.size_bytes > self._max_size_bytes:
+                _, evicted = self._cached_values.popitem(last=False)
+                self.size_bytes -= len(evicted)
+
+    def _uncache(self, key: bytes) -> None:
+        with self._lock:
+            if key in self._cached_values:
+                self.size_bytes -= len(self._cached_values.pop(key))
@@ -8,19 +8,32 @@ from typing import (
     Dict,
     Iterable,
     List,
+    Optional,
+    Sequence,
     Tuple,
     Type,
 )
 
-from eth_typing import Hash32
+from eth_typing import (
+    BlockNumber,
+    Hash32,
+)
 
 from eth.db.backends.base import BaseAtomicDB
-from eth.db.chain import BaseChainDB
+from eth.db.chain import (
+    BaseChainDB,
+    ChainDB,
+)
 from eth.rlp.blocks import BaseBlock
 from eth.rlp.headers import BlockHeader
 from eth.rlp.receipts import Receipt
-from eth.rlp.transactions import BaseTransaction
+from eth.exceptions import HeaderNotFound
+from eth.rlp.transactions import (
+    BaseTransaction,
+    BaseTransactionFields,
+)
 
+from trinity.rlp.block_body import BlockBody
 from trinity._utils.mp import (
     async_method,
     sync_method,
@@ -36,10 +49,18 @@ class BaseAsyncChainDB(BaseChainDB):
     async def coro_get(self, key: bytes) -> bytes:
         pass
 
+    @abstractmethod
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        pass
+
     @abstractmethod
     async def coro_persist_block(self, block: BaseBlock) -> None:
         pass
 
+    @abstractmethod
+    async def coro_persist_blocks(self, blocks: Sequence[BaseBlock]) -> None:
+        pass
+
     @abstractmethod
     async def coro_persist_uncles(self, uncles: Tuple[BlockHeader]) -> Hash32:
         pass
@@ -64,6 +85,96 @@ class BaseAsyncChainDB(BaseChainDB):
             self, header: BlockHeader, receipt_class: Type[Receipt]) -> List[Receipt]:
         pass
 
+    @abstractmethod
+    async def coro_get_canonical_headers(
+            self, block_numbers: Sequence[BlockNumber]) -> Tuple[BlockHeader, ...]:
+        pass
+
+    @abstractmethod
+    async def coro_get_block_bodies(
+            self,
+            block_hashes: Sequence[Hash32],
+            transaction_class: Type[BaseTransactionFields]) -> Tuple[Optional[BlockBody], ...]:
+        pass
+
+    @abstractmethod
+    async def coro_get_block_receipts(
+            self,
+            block_hashes: Sequence[Hash32],
+            receipt_class: Type[Receipt]) -> Tuple[Optional[List[Receipt]], ...]:
+        pass
+
+
+class BatchChainDB(ChainDB):
+    """
+    Extend ``ChainDB`` with APIs to persist and look up many blocks at once, so that callers
+    talking to it over IPC can do so with a single round trip.
+    """
+
+    def persist_blocks(self, blocks: Sequence[BaseBlock]) -> None:
+        """
+        Persist the given blocks' headers and uncles, updating the canonical head, in a single
+        atomic write batch.
+
+        As with ``persist_block()``, the blocks' transactions must have been persisted already,
+        and each block's parent must either be persisted already or come before it.
+        """
+        with self.db.atomic_batch() as db:
+            for block in blocks:
+                self._persist_block(db, block)
+
+    def get_canonical_headers(
+            self, block_numbers: Sequence[BlockNumber]) -> Tuple[BlockHeader, ...]:
+        """
+        Return the canonical headers with the given numbers, stopping at the first one that is
+        not available.
+        """
+        headers = []
+        for block_number in block_numbers:
+            try:
+                headers.append(self.get_canonical_block_header_by_number(block_number))
+            except HeaderNotFound:
+                break
+        return tuple(headers)
+
+    def get_block_bodies(
+            self,
+            block_hashes: Sequence[Hash32],
+            transaction_class: Type[BaseTransactionFields]) -> Tuple[Optional[BlockBody], ...]:
+        """
+        Return the bodies of the blocks with the given hashes, in order, with ``None`` in place
+        of the blocks we don't have.
+        """
+        bodies: List[Optional[BlockBody]] = []
+        for block_hash in block_hashes:
+            try:
+                header = self.get_block_header_by_hash(block_hash)
+            except HeaderNotFound:
+                bodies.append(None)
+                continue
+            transactions = self.get_block_transactions(header, transaction_class)
+            uncles = self.get_block_uncles(header.uncles_hash)
+            bodies.append(BlockBody(transactions, uncles))
+        return tuple(bodies)
+
+    def get_block_receipts(
+            self,
+            block_hashes: Sequence[Hash32],
+            receipt_class: Type[Receipt]) -> Tuple[Optional[List[Receipt]], ...]:
+        """
+        Return the receipts of the blocks with the given hashes, in order, with ``None`` in place
+        of the blocks we don't have.
+        """
+        receipts: List[Optional[List[Receipt]]] = []
+        for block_hash in block_hashes:
+            try:
+                header = self.get_block_header_by_hash(block_hash)
+            except HeaderNotFound:
+                receipts.append(None)
+            else:
+                receipts.append(list(self.get_receipts(header, receipt_class)))
+        return tuple(receipts)
+
 
 class AsyncChainDBPreProxy(BaseAsyncChainDB):
     """
@@ -75,6 +186,7 @@ class AsyncChainDBPreProxy(BaseAsyncChainDB):
         pass
 
     coro_get = async_method('get')
+    coro_multi_get = async_method('multi_get')
     coro_get_block_header_by_hash = async_method('get_block_header_by_hash')
     coro_get_canonical_head = async_method('get_canonical_head')
     coro_get_score = async_method('get_score')
@@ -83,21 +195,29 @@ class AsyncChainDBPreProxy(BaseAsyncChainDB):
     coro_get_canonical_block_header_by_number = async_method('get_canonical_block_header_by_number')
     coro_persist_header = async_method('persist_header')
     coro_persist_block = async_method('persist_block')
+    coro_persist_blocks = async_method('persist_blocks')
     coro_persist_uncles = async_method('persist_uncles')
     coro_persist_trie_data_dict = async_method('persist_trie_data_dict')
     coro_get_block_transactions = async_method('get_block_transactions')
     coro_get_block_uncles = async_method('get_block_uncles')
     coro_get_receipts = async_method('get_receipts')
+    coro_get_canonical_headers = async_method('get_canonical_headers')
+    coro_get_block_bodies = async_method('get_block_bodies')
+    coro_get_block_receipts = async_method('get_block_receipts')
 
     add_receipt = sync_method('add_receipt')
     add_transaction = sync_method('add_transaction')
     exists = sync_method('exists')
     get = sync_method('get')
+    multi_get = sync_method('multi_get')
     get_block_header_by_hash = sync_method('get_block_header_by_hash')
+    get_block_bodies = sync_method('get_block_bodies')
+    get_block_receipts = sync_method('get_block_receipts')
     get_block_transactions = sync_method('get_block_transactions')
     get_block_transaction_hashes = sync_method('get_block_transaction_hashes')
     get_block_uncles = sync_method('get_block_uncles')
     get_canonical_head = sync_method('get_canonical_head')
+    get_canonical_headers = sync_method('get_canonical_headers')
     get_receipts = sync_method('get_receipts')
     get_score = sync_method('get_score')
     get_transaction_by_index = sync_method('get_transaction_by_index')
@@ -106,6 +226,7 @@ class AsyncChainDBPreProxy(BaseAsyncChainDB):
     get_canonical_block_header_by_number = sync_method('get_canonical_block_header_by_number')
     get_canonical_block_hash = sync_method('get_canonical_block_hash')
     persist_block = sync_method('persist_block')
+    persist_blocks = sync_method('persist_blocks')
     persist_header = sync_method('persist_header')
     persist_header_chain = sync_method('persist_header_chain')
     persist_uncles = sync_method('persist_uncles')
@@ -3,13 +3,22 @@ from multiprocessing.managers import (
 )
 import pathlib
 
-from eth.db.chain import ChainDB
 from eth.db.backends.base import BaseAtomicDB
 from eth.db.header import HeaderDB
 
 from trinity.config import TrinityConfig
-from trinity.db.base import AsyncDBProxy
-from trinity.db.eth1.chain import AsyncChainDBProxy
+from trinity.db.async_ipc import (
+    AsyncDBClient,
+    get_async_db_ipc_path,
+)
+from trinity.db.base import (
+    AsyncDBProxy,
+    MultiKeyDB,
+)
+from trinity.db.eth1.chain import (
+    AsyncChainDBProxy,
+    BatchChainDB,
+)
 from trinity.db.eth1.header import (
     AsyncHeaderDBProxy
 )
@@ -24,7 +33,7 @@ def create_db_server_manager(trinity_config: TrinityConfig,
                              base_db: BaseAtomicDB) -> BaseManager:
 
     chain_config = trinity_config.get_chain_config()
-    chaindb = ChainDB(base_db)
+    chaindb = BatchChainDB(base_db)
 
     if not is_database_initialized(chaindb):
         initialize_database(chain_config, chaindb, base_db)
@@ -35,11 +44,14 @@ def create_db_server_manager(trinity_config: TrinityConfig,
         pass
 
     DBManager.register(
-        'get_db', callable=lambda: TracebackRecorder(base_db), proxytype=AsyncDBProxy)
+        'get_db',
+        callable=lambda: TracebackRecorder(MultiKeyDB(base_db)),
+        proxytype=AsyncDBProxy,
+    )
 
     DBManager.register(
         'get_chaindb',
-        callable=lambda: TracebackRecorder(chaindb),
+        callable=lambda: TracebackRecorder(MultiKeyDB(chaindb)),
         proxytype=AsyncChainDBProxy,
     )
 
@@ -59,7 +71,14 @@ def create_db_consumer_manager(ipc_path: pathlib.Path, connect: bool=True) -> Ba
     multi-processing not being able to interpret 'Path' objects correctly
     """
     class DBManager(BaseManager):
-        pass
+        def get_async_db(self) -> AsyncDBClient:
+            """
+            Return a ``BaseAsyncDB`` whose ``coro_*`` methods use the native asyncio DB protocol.
+            """
+            return AsyncDBClient(
+                get_async_db_ipc_path(pathlib.Path(ipc_path)),
+                self.get_db(),  # type: ignore
+            )
 
     DBManager.register('get_db', proxytype=AsyncDBProxy)
     DBManager.register('get_chaindb', proxytype=AsyncChainDBProxy)
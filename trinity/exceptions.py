@@ -32,9 +32,16 @@ class AlreadyWaiting(BaseTrinityError):
     pass
 
 
-class SyncRequestAlreadyProcessed(BaseTrinityError):
+class InvalidSyncCheckpoint(BaseTrinityError):
     """
-    Raised when a trie SyncRequest has already been processed.
+    Raised when a state sync checkpoint is malformed or doesn't match the trie being synced.
+    """
+    pass
+
+
+class RemoteDBError(BaseTrinityError):
+    """
+    Raised when the database process fails to handle a request sent over the async DB socket.
     """
     pass
 
@@ -18,7 +18,13 @@ from eth.db.backends.base import BaseDB
 from eth.db.backends.level import LevelDB
 
 from p2p.service import BaseService
-from p2p._utils import ensure_global_asyncio_executor
+from p2p._utils import (
+    ensure_global_asyncio_executor,
+    get_header_validation_executor,
+    get_msg_decoding_executor,
+    start_header_validation_executor,
+    start_msg_decoding_executor,
+)
 
 from trinity.bootstrap import (
     kill_trinity_gracefully,
@@ -33,6 +39,10 @@ from trinity.constants import (
     APP_IDENTIFIER_ETH1,
     NETWORKING_EVENTBUS_ENDPOINT,
 )
+from trinity.db.async_ipc import (
+    get_async_db_ipc_path,
+    serve_async_db_in_thread,
+)
 from trinity.db.eth1.manager import (
     create_db_server_manager,
 )
@@ -167,6 +177,10 @@ def launch_node(args: Namespace, trinity_config: TrinityConfig, endpoint: Endpoi
         # The `networking` process creates a process pool executor to offload cpu intensive
         # tasks. We should revisit that when we move the sync in its own process
         ensure_global_asyncio_executor()
+        if args.msg_decoding_workers > 0:
+            start_msg_decoding_executor(args.msg_decoding_workers, args.msg_decoding_threshold)
+        if args.header_validation_workers > 0:
+            start_header_validation_executor(args.header_validation_workers)
         loop = node.get_event_loop()
 
         endpoint.connect_no_wait(loop)
@@ -189,7 +203,11 @@ def run_database_process(trinity_config: TrinityConfig, db_class: Type[BaseDB])
         base_db = db_class(db_path=app_config.database_dir)
 
         manager = create_db_server_manager(trinity_config, base_db)
-        serve_until_sigint(manager)
+        # Serve the native asyncio DB protocol alongside the manager, for consumers doing high
+        # volumes of DB access from an event loop (e.g. the syncers).
+        async_db_ipc_path = get_async_db_ipc_path(trinity_config.database_ipc_path)
+        with serve_async_db_in_thread(base_db, async_db_ipc_path):
+            serve_until_sigint(manager)
 
 
 async def handle_networking_exit(service: BaseService,
@@ -201,3 +219,9 @@ async def handle_networking_exit(service: BaseService,
         endpoint.stop()
         # Retrieve and shutdown the global executor that was created at startup
         ensure_global_asyncio_executor().shutdown(wait=True)
+        msg_decoding_executor, _ = get_msg_decoding_executor()
+        if msg_decoding_executor is not None:
+            msg_decoding_executor.shutdown(wait=True)
+        header_validation_executor = get_header_validation_executor()
+        if header_validation_executor is not None:
+            header_validation_executor.shutdown(wait=True)
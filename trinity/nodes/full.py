@@ -2,6 +2,7 @@ from typing import Type
 
 from lahja import Endpoint
 
+from p2p.node_db import NodeDB
 from p2p.peer_pool import BasePeerPool
 
 from trinity.chains.full import FullChain
@@ -22,6 +23,8 @@ class FullNode(Node):
         self._node_key = trinity_config.nodekey
         self._node_port = trinity_config.port
         self._max_peers = trinity_config.max_peers
+        self._node_db_path = trinity_config.node_db_path
+        self._max_pipelined_requests = trinity_config.max_pipelined_requests
 
     @property
     def chain_class(self) -> Type[FullChain]:
@@ -46,6 +49,8 @@ class FullNode(Node):
                 preferred_nodes=self._preferred_nodes,
                 token=self.cancel_token,
                 event_bus=self.event_bus,
+                node_db=NodeDB(self._node_db_path),
+                max_pipelined_requests=self._max_pipelined_requests,
             )
         return self._p2p_server
 
@@ -10,6 +10,7 @@ from eth_utils import (
 
 from lahja import Endpoint
 
+from p2p.node_db import NodeDB
 from p2p.peer_pool import BasePeerPool
 
 from trinity.chains.light import (
@@ -40,6 +41,8 @@ class LightNode(Node):
         self._max_peers = trinity_config.max_peers
         self._bootstrap_nodes = trinity_config.bootstrap_nodes
         self._preferred_nodes = trinity_config.preferred_nodes
+        self._node_db_path = trinity_config.node_db_path
+        self._max_pipelined_requests = trinity_config.max_pipelined_requests
 
         self._peer_chain = LightPeerChain(
             self.headerdb,
@@ -82,6 +85,8 @@ class LightNode(Node):
                 preferred_nodes=self._preferred_nodes,
                 token=self.cancel_token,
                 event_bus=self.event_bus,
+                node_db=NodeDB(self._node_db_path),
+                max_pipelined_requests=self._max_pipelined_requests,
             )
         return self._p2p_server
 
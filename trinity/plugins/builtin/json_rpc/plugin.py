@@ -3,10 +3,14 @@ from argparse import (
     _SubParsersAction,
 )
 import asyncio
+import functools
 from typing import (
     Tuple
 )
 
+from trinity.cli_parser import (
+    positive_int,
+)
 from trinity.config import (
     Eth1AppConfig,
     Eth1DbMode,
@@ -14,6 +18,12 @@ from trinity.config import (
     TrinityConfig
 )
 from trinity.chains.base import BaseAsyncChain
+from trinity.constants import (
+    DEFAULT_RPC_DB_CACHE_SIZE,
+)
+from trinity.db.cache import (
+    ContentAddressedCacheDB,
+)
 from trinity.db.eth1.manager import (
     create_db_consumer_manager
 )
@@ -23,7 +33,13 @@ from trinity.extensibility import (
 from trinity.plugins.builtin.light_peer_chain_bridge.light_peer_chain_bridge import (
     EventBusLightPeerChain,
 )
+from trinity.rpc.executor import (
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_MAX_CONCURRENT_EVM_CALLS,
+    RPCMethodExecutor,
+)
 from trinity.rpc.main import (
+    DEFAULT_MAX_CONCURRENT_BATCH_REQUESTS,
     RPCServer,
 )
 from trinity.rpc.modules import (
@@ -32,8 +48,19 @@ from trinity.rpc.modules import (
     initialize_eth1_modules,
     Eth1ChainRPCModule,
 )
+from trinity.rpc.http import (
+    DEFAULT_MAX_CONNECTIONS,
+    HTTPServer,
+)
 from trinity.rpc.ipc import (
     IPCServer,
+    MAX_PENDING_REQUESTS,
+)
+from trinity.rpc.stats import (
+    RPCStatsReporter,
+)
+from trinity.rpc.ws import (
+    WebSocketServer,
 )
 from trinity._utils.shutdown import (
     exit_with_service_and_endpoint,
@@ -56,8 +83,80 @@ class JsonRpcServerPlugin(BaseIsolatedPlugin):
             action="store_true",
             help="Disables the JSON-RPC Server",
         )
+        arg_parser.add_argument(
+            "--rpc-db-cache-size",
+            type=int,
+            default=DEFAULT_RPC_DB_CACHE_SIZE,
+            help=(
+                "Size (in bytes) of the cache of trie nodes and block data kept by the JSON-RPC "
+                "server in full mode, or 0 to disable it. Default: %(default)s"
+            ),
+        )
+        arg_parser.add_argument(
+            "--rpc-max-concurrent-calls",
+            type=positive_int,
+            default=DEFAULT_MAX_CONCURRENT_CALLS,
+            help=(
+                "Maximum number of calls of each JSON-RPC method that reads state (like "
+                "eth_getBalance) to run at once. Default: %(default)s"
+            ),
+        )
+        arg_parser.add_argument(
+            "--rpc-max-concurrent-evm-calls",
+            type=positive_int,
+            default=DEFAULT_MAX_CONCURRENT_EVM_CALLS,
+            help=(
+                "Maximum number of calls of each JSON-RPC method that runs the EVM (eth_call and "
+                "eth_estimateGas) to run at once. Default: %(default)s"
+            ),
+        )
+        arg_parser.add_argument(
+            "--rpc-max-concurrent-batch-requests",
+            type=positive_int,
+            default=DEFAULT_MAX_CONCURRENT_BATCH_REQUESTS,
+            help=(
+                "Maximum number of requests from a single JSON-RPC batch to execute at once. "
+                "Default: %(default)s"
+            ),
+        )
+        arg_parser.add_argument(
+            "--http-rpc-port",
+            type=int,
+            help="Serve JSON-RPC over HTTP on this port, in addition to the IPC socket",
+        )
+        arg_parser.add_argument(
+            "--ws-rpc-port",
+            type=int,
+            help="Serve JSON-RPC over WebSocket on this port, in addition to the IPC socket",
+        )
+        arg_parser.add_argument(
+            "--rpc-host",
+            default="127.0.0.1",
+            help="Address to serve JSON-RPC over HTTP and WebSocket on. Default: %(default)s",
+        )
+        arg_parser.add_argument(
+            "--rpc-max-connections",
+            type=positive_int,
+            default=DEFAULT_MAX_CONNECTIONS,
+            help=(
+                "Maximum number of clients to serve JSON-RPC over HTTP (and over WebSocket) at "
+                "once. Default: %(default)s"
+            ),
+        )
+        arg_parser.add_argument(
+            "--rpc-max-pending-requests",
+            type=positive_int,
+            default=MAX_PENDING_REQUESTS,
+            help=(
+                "Maximum number of requests from a single HTTP or WebSocket client to execute at "
+                "once. Default: %(default)s"
+            ),
+        )
 
-    def setup_eth1_modules(self, trinity_config: TrinityConfig) -> Tuple[Eth1ChainRPCModule, ...]:
+    def setup_eth1_modules(
+            self,
+            trinity_config: TrinityConfig,
+            stats_reporter: RPCStatsReporter) -> Tuple[Eth1ChainRPCModule, ...]:
         db_manager = create_db_consumer_manager(trinity_config.database_ipc_path)
 
         eth1_app_config = trinity_config.get_app_config(Eth1AppConfig)
@@ -71,11 +170,24 @@ class JsonRpcServerPlugin(BaseIsolatedPlugin):
             chain = chain_config.light_chain_class(header_db, peer_chain=event_bus_light_peer_chain)
         elif eth1_app_config.database_mode is Eth1DbMode.FULL:
             db = db_manager.get_db()  # type: ignore
+            cache_size = self.context.args.rpc_db_cache_size
+            if cache_size > 0:
+                db = ContentAddressedCacheDB(db, cache_size)
+                stats_reporter.add_source("JSON-RPC DB cache", db.summarize_stats)
             chain = chain_config.full_chain_class(db)
         else:
             raise Exception(f"Unsupported Database Mode: {eth1_app_config.database_mode}")
 
-        return initialize_eth1_modules(chain, self.event_bus)
+        args = self.context.args
+        executor = RPCMethodExecutor(
+            max_concurrent_calls=args.rpc_max_concurrent_calls,
+            method_limits={
+                'call': args.rpc_max_concurrent_evm_calls,
+                'estimateGas': args.rpc_max_concurrent_evm_calls,
+            },
+        )
+        stats_reporter.add_source("JSON-RPC calls running/waiting", executor.summarize_stats)
+        return initialize_eth1_modules(chain, self.event_bus, executor)
 
     def setup_beacon_modules(self) -> Tuple[BeaconChainRPCModule, ...]:
 
@@ -84,19 +196,57 @@ class JsonRpcServerPlugin(BaseIsolatedPlugin):
     def do_start(self) -> None:
 
         trinity_config = self.context.trinity_config
+        stats_reporter = RPCStatsReporter()
 
         if trinity_config.has_app_config(Eth1AppConfig):
-            modules = self.setup_eth1_modules(trinity_config)
+            modules = self.setup_eth1_modules(trinity_config, stats_reporter)
         elif trinity_config.has_app_config(BeaconAppConfig):
             modules = self.setup_beacon_modules()
         else:
             raise Exception("Unsupported Node Type")
 
-        rpc = RPCServer(modules, self.context.event_bus)
+        rpc = RPCServer(
+            modules,
+            self.context.event_bus,
+            self.context.args.rpc_max_concurrent_batch_requests,
+        )
         ipc_server = IPCServer(rpc, self.context.trinity_config.jsonrpc_ipc_path)
 
         loop = asyncio.get_event_loop()
         asyncio.ensure_future(exit_with_service_and_endpoint(ipc_server, self.context.event_bus))
         asyncio.ensure_future(ipc_server.run())
+        # Stop reporting stats along with the IPC server
+        ipc_server.add_finished_callback(lambda _: stats_reporter.cancel_nowait())
+        asyncio.ensure_future(stats_reporter.run())
+
+        args = self.context.args
+        if args.http_rpc_port is not None:
+            http_server = HTTPServer(
+                rpc,
+                args.rpc_host,
+                args.http_rpc_port,
+                args.rpc_max_connections,
+                args.rpc_max_pending_requests,
+                token=ipc_server.cancel_token,
+            )
+            stats_reporter.add_source(
+                "HTTP JSON-RPC latencies",
+                functools.partial(str, http_server.latency),
+            )
+            asyncio.ensure_future(http_server.run())
+        if args.ws_rpc_port is not None:
+            ws_server = WebSocketServer(
+                rpc,
+                args.rpc_host,
+                args.ws_rpc_port,
+                args.rpc_max_connections,
+                args.rpc_max_pending_requests,
+                token=ipc_server.cancel_token,
+            )
+            stats_reporter.add_source(
+                "WebSocket JSON-RPC latencies",
+                functools.partial(str, ws_server.latency),
+            )
+            asyncio.ensure_future(ws_server.run())
         loop.run_forever()
         loop.close()
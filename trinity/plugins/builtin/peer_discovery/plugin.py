@@ -29,6 +29,9 @@ from p2p.discovery import (
 from p2p.kademlia import (
     Address,
 )
+from p2p.node_db import (
+    NodeDB,
+)
 from p2p.protocol import (
     Protocol,
 )
@@ -104,6 +107,7 @@ class DiscoveryBootstrapService(BaseService):
     async def _run(self) -> None:
         external_ip = "0.0.0.0"
         address = Address(external_ip, self.trinity_config.port, self.trinity_config.port)
+        node_db: NodeDB = None
 
         if self.trinity_config.use_discv5:
             protocol = get_protocol(self.trinity_config)
@@ -117,12 +121,14 @@ class DiscoveryBootstrapService(BaseService):
                 self.cancel_token,
             )
         else:
+            node_db = NodeDB(self.trinity_config.node_db_path)
             discovery_protocol = PreferredNodeDiscoveryProtocol(
                 self.trinity_config.nodekey,
                 address,
                 self.trinity_config.bootstrap_nodes,
                 self.trinity_config.preferred_nodes,
                 self.cancel_token,
+                node_db=node_db,
             )
 
         if self.is_discovery_disabled:
@@ -138,7 +144,11 @@ class DiscoveryBootstrapService(BaseService):
                 self.cancel_token,
             )
 
-        await discovery_service.run()
+        try:
+            await discovery_service.run()
+        finally:
+            if node_db is not None:
+                node_db.close()
 
 
 class PeerDiscoveryPlugin(BaseIsolatedPlugin):
@@ -13,9 +13,11 @@ from logging import (
 from multiprocessing.managers import (
     BaseManager,
 )
+from pathlib import Path
 from typing import (
     cast,
     Iterable,
+    Optional,
     Type,
 )
 
@@ -28,6 +30,10 @@ from eth_utils import (
     ValidationError,
 )
 
+from trinity.config import (
+    Eth1AppConfig,
+    TrinityConfig,
+)
 from trinity.constants import (
     SYNC_FAST,
     SYNC_FULL,
@@ -58,6 +64,13 @@ from trinity.sync.light.chain import (
 )
 
 
+def _get_state_sync_checkpoint_path(trinity_config: TrinityConfig) -> Optional[Path]:
+    # Without a config, the state sync runs without saving checkpoints.
+    if trinity_config is None:
+        return None
+    return trinity_config.get_app_config(Eth1AppConfig).state_sync_checkpoint_path
+
+
 class BaseSyncStrategy(ABC):
 
     @property
@@ -79,7 +92,13 @@ class BaseSyncStrategy(ABC):
                    chain: BaseChain,
                    db_manager: BaseManager,
                    peer_pool: BaseChainPeerPool,
-                   cancel_token: CancelToken) -> None:
+                   cancel_token: CancelToken,
+                   *,
+                   trinity_config: TrinityConfig = None) -> None:
+        """
+        Sync the chain. ``trinity_config`` is passed by keyword, and is ``None`` if the caller
+        doesn't have one.
+        """
         pass
 
 
@@ -98,7 +117,9 @@ class NoopSyncStrategy(BaseSyncStrategy):
                    chain: BaseChain,
                    db_manager: BaseManager,
                    peer_pool: BaseChainPeerPool,
-                   cancel_token: CancelToken) -> None:
+                   cancel_token: CancelToken,
+                   *,
+                   trinity_config: TrinityConfig = None) -> None:
 
         logger.info("Node running without sync (--sync-mode=%s)", self.get_sync_mode())
 
@@ -114,17 +135,24 @@ class FullSyncStrategy(BaseSyncStrategy):
                    chain: BaseChain,
                    db_manager: BaseManager,
                    peer_pool: BaseChainPeerPool,
-                   cancel_token: CancelToken) -> None:
+                   cancel_token: CancelToken,
+                   *,
+                   trinity_config: TrinityConfig = None) -> None:
 
+        async_db = db_manager.get_async_db()  # type: ignore
         syncer = FullChainSyncer(
             chain,
             db_manager.get_chaindb(),  # type: ignore
-            db_manager.get_db(),  # type: ignore
+            async_db,
             cast(ETHPeerPool, peer_pool),
             cancel_token,
+            _get_state_sync_checkpoint_path(trinity_config),
         )
 
-        await syncer.run()
+        try:
+            await syncer.run()
+        finally:
+            async_db.close()
 
 
 class FastThenFullSyncStrategy(BaseSyncStrategy):
@@ -138,17 +166,24 @@ class FastThenFullSyncStrategy(BaseSyncStrategy):
                    chain: BaseChain,
                    db_manager: BaseManager,
                    peer_pool: BaseChainPeerPool,
-                   cancel_token: CancelToken) -> None:
+                   cancel_token: CancelToken,
+                   *,
+                   trinity_config: TrinityConfig = None) -> None:
 
+        async_db = db_manager.get_async_db()  # type: ignore
         syncer = FastThenFullChainSyncer(
             chain,
             db_manager.get_chaindb(),  # type: ignore
-            db_manager.get_db(),  # type: ignore
+            async_db,
             cast(ETHPeerPool, peer_pool),
             cancel_token,
+            _get_state_sync_checkpoint_path(trinity_config),
         )
 
-        await syncer.run()
+        try:
+            await syncer.run()
+        finally:
+            async_db.close()
 
 
 class LightSyncStrategy(BaseSyncStrategy):
@@ -162,7 +197,9 @@ class LightSyncStrategy(BaseSyncStrategy):
                    chain: BaseChain,
                    db_manager: BaseManager,
                    peer_pool: BaseChainPeerPool,
-                   cancel_token: CancelToken) -> None:
+                   cancel_token: CancelToken,
+                   *,
+                   trinity_config: TrinityConfig = None) -> None:
 
         syncer = LightChainSyncer(
             chain,
@@ -253,7 +290,8 @@ class SyncerPlugin(BaseAsyncStopPlugin):
             self.chain,
             self.db_manager,
             self.peer_pool,
-            self.cancel_token
+            self.cancel_token,
+            trinity_config=self.context.trinity_config,
         )
 
         if self.active_strategy.shutdown_node_on_halt:
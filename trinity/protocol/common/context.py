@@ -14,7 +14,10 @@ class ChainContext(BasePeerContext):
     def __init__(self,
                  headerdb: BaseAsyncHeaderDB,
                  network_id: int,
-                 vm_configuration: Tuple[Tuple[int, Type[BaseVM]], ...]) -> None:
+                 vm_configuration: Tuple[Tuple[int, Type[BaseVM]], ...],
+                 max_pipelined_requests: int = 1) -> None:
         self.headerdb = headerdb
         self.network_id = network_id
         self.vm_configuration = vm_configuration
+        # The most requests of a given type we may have in flight to a single peer.
+        self.max_pipelined_requests = max_pipelined_requests
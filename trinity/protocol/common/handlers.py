@@ -29,7 +29,7 @@ class BaseExchangeHandler(ABC):
     def _exchange_config(self) -> Dict[str, Type[BaseExchange[Any, Any, Any]]]:
         pass
 
-    def __init__(self, peer: BasePeer) -> None:
+    def __init__(self, peer: BasePeer, max_pipelined_requests: int = 1) -> None:
         self._peer = peer
 
         for attr, exchange_cls in self._exchange_config.items():
@@ -39,7 +39,12 @@ class BaseExchangeHandler(ABC):
                     f"present on the class: {getattr(self, attr)}"
                 )
             manager: ExchangeManager[Any, Any, Any]
-            manager = ExchangeManager(self._peer, exchange_cls.response_cmd_type, peer.cancel_token)
+            manager = ExchangeManager(
+                self._peer,
+                exchange_cls.response_cmd_type,
+                peer.cancel_token,
+                max_pipelined_requests,
+            )
             exchange = exchange_cls(manager)
             setattr(self, attr, exchange)
 
@@ -6,8 +6,10 @@ from typing import (
     Callable,
     Generic,
     FrozenSet,
+    List,
     Tuple,
     Type,
+    Union,
     cast,
 )
 
@@ -38,6 +40,27 @@ from .types import (
 )
 
 
+# Candidates are queued together with the time they were received, or are an exception to be
+# raised if we can no longer get a response.
+ResponseCandidate = Union[Tuple[TResponsePayload, float], Exception]
+
+
+class PendingRequest(Generic[TResponsePayload]):
+    """
+    A request sent to a peer, and the candidate responses received for it that are yet to be
+    validated.
+    """
+    def __init__(self) -> None:
+        self.send_time: float = None
+        self.candidates: 'asyncio.Queue[ResponseCandidate[TResponsePayload]]' = asyncio.Queue()
+
+    def add_candidate(self, payload: TResponsePayload, received_at: float) -> None:
+        self.candidates.put_nowait((payload, received_at))
+
+    def fail(self, exc: Exception) -> None:
+        self.candidates.put_nowait(exc)
+
+
 class ResponseCandidateStream(
         PeerSubscriber,
         BaseService,
@@ -54,43 +77,53 @@ class ResponseCandidateStream(
 
     response_timeout: float = ROUND_TRIP_TIMEOUT
 
-    pending_request: Tuple[float, 'asyncio.Future[TResponsePayload]'] = None
-
     _peer: BasePeer
 
     def __init__(
             self,
             peer: BasePeer,
             response_msg_type: Type[Command],
-            token: CancelToken) -> None:
+            token: CancelToken,
+            max_pipelined_requests: int = 1) -> None:
         super().__init__(token)
         self._peer = peer
         self.response_msg_type = response_msg_type
-        self._lock = asyncio.Lock()
+        # Requests in flight, oldest first.
+        self.pending_requests: List[PendingRequest[TResponsePayload]] = []
+        self._request_finished = asyncio.Event()
+        # Unless pipelining is enabled (max_pipelined_requests > 1), we never have two concurrent
+        # requests to a single peer for a single command pair in flight. Otherwise, the number
+        # of requests we allow in flight adapts to the peer's performance, see
+        # _update_pipeline_depth().
+        self.max_pipelined_requests = max_pipelined_requests
+        self.pipeline_depth = 1
+        self._min_round_trip: float = None
 
     async def payload_candidates(
             self,
             request: BaseRequest[TRequestPayload],
             tracker: BasePerformanceTracker[BaseRequest[TRequestPayload], Any],
             *,
-            timeout: float = None) -> AsyncGenerator[TResponsePayload, None]:
+            timeout: float = None) -> AsyncGenerator[Tuple[TResponsePayload, float], None]:
         """
-        Make a request and iterate through candidates for a valid response.
+        Make a request and iterate through candidates for a valid response, together with the
+        time it took for each of them to arrive.
 
-        To mark a response as valid, use `complete_request`. After that call, payload
-        candidates will stop arriving.
+        Candidates will stop arriving once the generator is closed, which callers must do once
+        they have a valid response. If iteration resumes instead, the last candidate is
+        considered invalid for this request and offered to the next one in flight, if any.
         """
         outer_timeout = self.response_timeout if timeout is None else timeout
 
         start_at = time.perf_counter()
 
-        # The _lock ensures that we never have two concurrent requests to a
-        # single peer for a single command pair in flight.
+        pending: PendingRequest[TResponsePayload] = PendingRequest()
         try:
-            await self.wait(self._lock.acquire(), timeout=outer_timeout)
+            await self.wait(self._add_pending_request(pending), timeout=outer_timeout)
         except TimeoutError:
+            self._remove_pending_request(pending)
             raise AlreadyWaiting(
-                f"Timed out waiting for {self.response_msg_name} request lock "
+                f"Timed out waiting for {self.response_msg_name} request slot "
                 f"or peer: {self._peer}"
             )
 
@@ -107,30 +140,67 @@ class ResponseCandidateStream(
                 inner_timeout = outer_timeout
             else:
                 inner_timeout = rtt_99th + 3 * rtt_stddev
+            # Requests queued behind others in flight take longer to be replied to.
+            inner_timeout *= len(self.pending_requests)
 
         try:
-            self._request(request)
-            while self._is_pending():
+            self._request(request, pending)
+            while True:
                 timeout_remaining = max(0, outer_timeout - (time.perf_counter() - start_at))
 
                 payload_timeout = min(inner_timeout, timeout_remaining)
 
                 try:
-                    yield await self._get_payload(payload_timeout)
+                    candidate = await self.wait(pending.candidates.get(), timeout=payload_timeout)
                 except TimeoutError:
                     tracker.record_timeout()
+                    self._on_timeout()
                     raise
+                if isinstance(candidate, Exception):
+                    raise candidate
+                payload, received_at = candidate
+                yield payload, received_at - pending.send_time
+                # The payload is not a valid response to this request, but it may be one to the
+                # next request in flight.
+                self._offer_to_next(pending, payload, received_at)
         finally:
-            self._lock.release()
+            self._remove_pending_request(pending)
 
     @property
     def response_msg_name(self) -> str:
         return self.response_msg_type.__name__
 
-    def complete_request(self) -> None:
-        if self.pending_request is None:
-            self.logger.warning("`complete_request` was called when there was no pending request")
-        self.pending_request = None
+    def record_response(self, elapsed: float, tracker: BasePerformanceTracker[Any, Any]) -> None:
+        """Record that a valid response arrived elapsed seconds after its request was sent."""
+        if self.max_pipelined_requests > 1:
+            self._update_pipeline_depth(elapsed, tracker)
+
+    def _update_pipeline_depth(
+            self, elapsed: float, tracker: BasePerformanceTracker[Any, Any]) -> None:
+        """
+        Adjust the number of requests we allow in flight, based on the peer's performance.
+
+        The lowest round trip we've seen is taken to be the peer's latency. While responses
+        arrive in less than 1.5 times that, the peer is not queueing our requests, so we allow
+        one more in flight. When they take over 3 times that, our requests are waiting on the
+        peer and we allow one less. A peer that is not giving us any items (i.e. has an
+        items_per_second_ema of 0) only gets one request at a time.
+        """
+        if self._min_round_trip is None or elapsed < self._min_round_trip:
+            self._min_round_trip = elapsed
+
+        if tracker.items_per_second_ema.value == 0:
+            self.pipeline_depth = 1
+        elif elapsed < 1.5 * self._min_round_trip:
+            self.pipeline_depth = min(self.pipeline_depth + 1, self.max_pipelined_requests)
+        elif elapsed > 3 * self._min_round_trip:
+            self.pipeline_depth = max(self.pipeline_depth - 1, 1)
+        else:
+            return
+        self._request_finished.set()
+
+    def _on_timeout(self) -> None:
+        self.pipeline_depth = max(self.pipeline_depth // 2, 1)
 
     #
     # Service API
@@ -150,82 +220,75 @@ class ResponseCandidateStream(
                     self.logger.warning("Unexpected payload type: %s", cmd.__class__.__name__)
 
     async def _handle_msg(self, msg: TResponsePayload) -> None:
-        if self.pending_request is None:
+        # Peers reply to requests in the order they receive them, so the response is offered
+        # to the oldest request in flight first.
+        for pending in self.pending_requests:
+            if pending.send_time is not None:
+                pending.add_candidate(msg, time.perf_counter())
+                break
+        else:
             self.logger.debug(
                 "Got unexpected %s payload from %s", self.response_msg_name, self._peer
             )
-            return
-
-        send_time, future = self.pending_request
-        self.last_response_time = time.perf_counter() - send_time
-        try:
-            future.set_result(msg)
-        except asyncio.InvalidStateError:
-            self.logger.debug(
-                "%s received a message response, but future was already done",
-                self,
-            )
-
-    async def _get_payload(self, timeout: float) -> TResponsePayload:
-        send_time, future = self.pending_request
-        try:
-            payload = await self.wait(future, timeout=timeout)
-        finally:
-            self.pending_request = None
-
-        # payload might be invalid, so prepare for another call to _get_payload()
-        self.pending_request = (send_time, asyncio.Future())
 
-        return payload
-
-    def _request(self, request: BaseRequest[TRequestPayload]) -> None:
-        if not self._lock.locked():
+    def _offer_to_next(self,
+                       pending: PendingRequest[TResponsePayload],
+                       payload: TResponsePayload,
+                       received_at: float) -> None:
+        index = self.pending_requests.index(pending)
+        for next_pending in self.pending_requests[index + 1:]:
+            if next_pending.send_time is not None and next_pending.send_time < received_at:
+                next_pending.add_candidate(payload, received_at)
+                break
+
+    async def _add_pending_request(self, pending: PendingRequest[TResponsePayload]) -> None:
+        while len(self.pending_requests) >= self.pipeline_depth:
+            self._request_finished.clear()
+            await self._request_finished.wait()
+        self.pending_requests.append(pending)
+
+    def _remove_pending_request(self, pending: PendingRequest[TResponsePayload]) -> None:
+        if pending not in self.pending_requests:
+            return
+        # Responses may have arrived while the last candidate was being validated, and those
+        # belong to the next requests in flight.
+        while not pending.candidates.empty():
+            candidate = pending.candidates.get_nowait()
+            if not isinstance(candidate, Exception):
+                self._offer_to_next(pending, *candidate)
+        self.pending_requests.remove(pending)
+        self._request_finished.set()
+
+    def _request(self,
+                 request: BaseRequest[TRequestPayload],
+                 pending: PendingRequest[TResponsePayload]) -> None:
+        if pending not in self.pending_requests:
             # This is somewhat of an invariant check but since there the
-            # linkage between the lock and this method are loose this sanity
+            # linkage between the request slots and this method are loose this sanity
             # check seems appropriate.
-            raise Exception("Invariant: cannot issue a request without an acquired lock")
+            raise Exception("Invariant: cannot issue a request without a request slot")
 
         self._peer.sub_proto.send_request(request)
+        pending.send_time = time.perf_counter()
 
-        future: 'asyncio.Future[TResponsePayload]' = asyncio.Future()
-        self.pending_request = (time.perf_counter(), future)
-
-    def _is_pending(self) -> bool:
-        return self.pending_request is not None
+    def _fail_pending_requests(self, exc: Exception) -> None:
+        for pending in self.pending_requests:
+            pending.fail(exc)
 
     async def _cleanup(self) -> None:
-        if self.pending_request is not None:
-            self.logger.debug("Stream %r shutting down, cancelling the pending request", self)
-            _, future = self.pending_request
-            try:
-                future.set_exception(PeerConnectionLost(
-                    f"Pending request can't complete: {self} is shutting down"
-                ))
-            except asyncio.InvalidStateError:
-                self.logger.debug(
-                    "%s cancelled pending future in cleanup, but it was already done",
-                    self,
-                )
-
-    def __del__(self) -> None:
-        if self.pending_request is not None:
-            _, future = self.pending_request
-            if future.cancel():
-                self.logger.debug("Forcefully cancelled a pending response in %s", self)
+        if self.pending_requests:
+            self.logger.debug("Stream %r shutting down, cancelling the pending requests", self)
+            self._fail_pending_requests(PeerConnectionLost(
+                f"Pending request can't complete: {self} is shutting down"
+            ))
 
     def deregister_peer(self, peer: BasePeer) -> None:
-        if self.pending_request is not None:
-            self.logger.debug("Peer stream %r shutting down, cancelling the pending request", self)
-            _, future = self.pending_request
-            try:
-                future.set_exception(PeerConnectionLost(
-                    f"Pending request can't complete: {self} peer went offline"
-                ))
-            except asyncio.InvalidStateError:
-                self.logger.debug(
-                    "%s cancelled pending future in deregister, but it was already done",
-                    self,
-                )
+        if self.pending_requests:
+            self.logger.debug(
+                "Peer stream %r shutting down, cancelling the pending requests", self)
+            self._fail_pending_requests(PeerConnectionLost(
+                f"Pending request can't complete: {self} peer went offline"
+            ))
 
     def __repr__(self) -> str:
         return f'<ResponseCandidateStream({self._peer!s}, {self.response_msg_type!r})>'
@@ -238,10 +301,12 @@ class ExchangeManager(Generic[TRequestPayload, TResponsePayload, TResult]):
             self,
             peer: BasePeer,
             listening_for: Type[Command],
-            cancel_token: CancelToken) -> None:
+            cancel_token: CancelToken,
+            max_pipelined_requests: int = 1) -> None:
         self._peer = peer
         self._cancel_token = cancel_token
         self._response_command_type = listening_for
+        self._max_pipelined_requests = max_pipelined_requests
 
     async def launch_service(self) -> None:
         if self._cancel_token.triggered:
@@ -251,6 +316,7 @@ class ExchangeManager(Generic[TRequestPayload, TResponsePayload, TResult]):
             self._peer,
             self._response_command_type,
             self._cancel_token,
+            self._max_pipelined_requests,
         )
         self._peer.run_daemon(self._response_stream)
         await self._response_stream.events.started.wait()
@@ -280,7 +346,26 @@ class ExchangeManager(Generic[TRequestPayload, TResponsePayload, TResult]):
 
         stream = self._response_stream
 
-        async for payload in stream.payload_candidates(request, tracker, timeout=timeout):
+        candidates = stream.payload_candidates(request, tracker, timeout=timeout)
+        try:
+            return await self._get_valid_result(
+                stream, candidates, request, normalizer, validate_result, payload_validator,
+                tracker)
+        finally:
+            # Closing the generator frees up the request slot right away.
+            await candidates.aclose()
+
+    async def _get_valid_result(
+            self,
+            stream: ResponseCandidateStream[TRequestPayload, TResponsePayload],
+            candidates: AsyncGenerator[Tuple[TResponsePayload, float], None],
+            request: BaseRequest[TRequestPayload],
+            normalizer: BaseNormalizer[TResponsePayload, TResult],
+            validate_result: Callable[[TResult], None],
+            payload_validator: Callable[[TResponsePayload], None],
+            tracker: BasePerformanceTracker[BaseRequest[TRequestPayload], TResult]) -> TResult:
+
+        async for payload, elapsed in candidates:
             try:
                 payload_validator(payload)
 
@@ -306,11 +391,11 @@ class ExchangeManager(Generic[TRequestPayload, TResponsePayload, TResult]):
                 continue
             else:
                 tracker.record_response(
-                    stream.last_response_time,
+                    elapsed,
                     request,
                     result,
                 )
-                stream.complete_request()
+                stream.record_response(elapsed, tracker)
                 return result
 
         raise ValidationError("Manager is not pending a response, but no valid response received")
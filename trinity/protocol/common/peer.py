@@ -2,6 +2,8 @@ from abc import abstractmethod
 import operator
 import random
 from typing import (
+    Any,
+    cast,
     Dict,
     List,
     NamedTuple,
@@ -31,6 +33,7 @@ from p2p.peer_pool import (
 )
 
 from trinity.db.eth1.header import BaseAsyncHeaderDB
+from trinity.protocol.common.exchanges import BaseExchange
 from trinity.protocol.common.handlers import BaseChainExchangeHandler
 
 from .boot import DAOCheckBootManager
@@ -57,6 +60,12 @@ class BaseChainPeer(BasePeer):
     def requests(self) -> BaseChainExchangeHandler:
         pass
 
+    def get_throughput(self) -> float:
+        # Items are headers, bodies, receipts or trie nodes depending on the exchange, so their
+        # rates can't be added up. Use the headers rate, as every chain peer serves headers.
+        headers_exchange = cast(BaseExchange[Any, Any, Any], self.requests.get_block_headers)
+        return headers_exchange.tracker.items_per_second_ema.value
+
     @property
     @abstractmethod
     def max_headers_fetch(self) -> int:
@@ -64,6 +64,8 @@ class BaseRequestServer(BaseService, PeerSubscriber):
             msg: protocol._DecodedMsgType) -> None:
         try:
             await self._handle_msg(peer, cmd, msg)
+            # Don't let peers requesting lots of data make us buffer all our replies in memory.
+            await peer.drain()
         except OperationCancelled:
             # Silently swallow OperationCancelled exceptions because otherwise they'll be caught
             # by the except below and treated as unexpected.
@@ -52,6 +52,7 @@ class GetBlockHeaders(Command):
 
 class BlockHeaders(BaseBlockHeaders):
     _cmd_id = 4
+    is_decoding_slow = True
     structure = sedes.CountableList(BlockHeader)
 
     def extract_headers(self, msg: _DecodedMsgType) -> Tuple[BlockHeader, ...]:
@@ -65,6 +66,7 @@ class GetBlockBodies(Command):
 
 class BlockBodies(Command):
     _cmd_id = 6
+    is_decoding_slow = True
     structure = sedes.CountableList(BlockBody)
 
 
@@ -84,6 +86,7 @@ class GetNodeData(Command):
 
 class NodeData(Command):
     _cmd_id = 14
+    is_decoding_slow = True
     structure = sedes.CountableList(sedes.binary)
 
 
@@ -94,4 +97,5 @@ class GetReceipts(Command):
 
 class Receipts(Command):
     _cmd_id = 16
+    is_decoding_slow = True
     structure = sedes.CountableList(sedes.CountableList(Receipt))
@@ -44,7 +44,7 @@ class ETHPeer(BaseChainPeer):
     @property
     def requests(self) -> ETHExchangeHandler:
         if self._requests is None:
-            self._requests = ETHExchangeHandler(self)
+            self._requests = ETHExchangeHandler(self, self.context.max_pipelined_requests)
         return self._requests
 
     def handle_sub_proto_msg(self, cmd: Command, msg: _DecodedMsgType) -> None:
@@ -1,8 +1,10 @@
 from typing import (
     Any,
+    AsyncIterator,
     Dict,
     FrozenSet,
     Sequence,
+    Tuple,
     Type,
     Union,
     cast,
@@ -10,11 +12,9 @@ from typing import (
 
 from cancel_token import CancelToken
 
-from eth.exceptions import (
-    HeaderNotFound,
-)
 from eth_typing import (
     BlockIdentifier,
+    BlockNumber,
     Hash32,
 )
 
@@ -33,6 +33,7 @@ from trinity.protocol.common.servers import BaseRequestServer, BasePeerRequestHa
 from trinity.protocol.eth import commands
 from trinity.protocol.eth.peer import ETHPeer, ETHPeerPool
 
+from eth.rlp.headers import BlockHeader
 from eth.rlp.receipts import Receipt
 from eth.rlp.transactions import BaseTransactionFields
 
@@ -42,7 +43,6 @@ from trinity.protocol.eth.constants import (
     MAX_STATE_FETCH,
 )
 from trinity.protocol.eth.requests import HeaderRequest as ETHHeaderRequest
-from trinity.rlp.block_body import BlockBody
 
 
 class ETHPeerRequestHandler(BasePeerRequestHandler):
@@ -69,24 +69,35 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
         self.logger.debug2("Replying to %s with %d headers", peer, len(headers))
         peer.sub_proto.send_block_headers(headers)
 
+    async def _generate_available_headers(
+            self, block_numbers: Tuple[BlockNumber, ...]) -> AsyncIterator[BlockHeader]:
+        # Fetch all the headers from the DB with a single call.
+        headers = await self.wait(self.db.coro_get_canonical_headers(block_numbers))
+        if len(headers) < len(block_numbers):
+            self.logger.debug(
+                "Peer requested header number %s that is unavailable, stopping search.",
+                block_numbers[len(headers)],
+            )
+        for header in headers:
+            yield header
+
     async def handle_get_block_bodies(self, peer: ETHPeer, block_hashes: Sequence[Hash32]) -> None:
         if not peer.is_operational:
             return
         self.logger.debug2("%s requested bodies for %d blocks", peer, len(block_hashes))
         bodies = []
-        # Only serve up to MAX_BODIES_FETCH items in every request.
-        for block_hash in block_hashes[:MAX_BODIES_FETCH]:
-            try:
-                header = await self.wait(self.db.coro_get_block_header_by_hash(block_hash))
-            except HeaderNotFound:
+        # Only serve up to MAX_BODIES_FETCH items in every request, and fetch them all from the DB
+        # with a single call.
+        requested = block_hashes[:MAX_BODIES_FETCH]
+        results = await self.wait(
+            self.db.coro_get_block_bodies(requested, BaseTransactionFields))
+        for block_hash, body in zip(requested, results):
+            if body is None:
                 self.logger.debug(
                     "%s asked for a block we don't have: %s", peer, to_hex(block_hash)
                 )
                 continue
-            transactions = await self.wait(
-                self.db.coro_get_block_transactions(header, BaseTransactionFields))
-            uncles = await self.wait(self.db.coro_get_block_uncles(header.uncles_hash))
-            bodies.append(BlockBody(transactions, uncles))
+            bodies.append(body)
         self.logger.debug2("Replying to %s with %d block bodies", peer, len(bodies))
         peer.sub_proto.send_block_bodies(bodies)
 
@@ -95,16 +106,16 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
             return
         self.logger.debug2("%s requested receipts for %d blocks", peer, len(block_hashes))
         receipts = []
-        # Only serve up to MAX_RECEIPTS_FETCH items in every request.
-        for block_hash in block_hashes[:MAX_RECEIPTS_FETCH]:
-            try:
-                header = await self.wait(self.db.coro_get_block_header_by_hash(block_hash))
-            except HeaderNotFound:
+        # Only serve up to MAX_RECEIPTS_FETCH items in every request, and fetch them all from the
+        # DB with a single call.
+        requested = block_hashes[:MAX_RECEIPTS_FETCH]
+        results = await self.wait(self.db.coro_get_block_receipts(requested, Receipt))
+        for block_hash, block_receipts in zip(requested, results):
+            if block_receipts is None:
                 self.logger.debug(
                     "%s asked receipts for a block we don't have: %s", peer, to_hex(block_hash)
                 )
                 continue
-            block_receipts = await self.wait(self.db.coro_get_receipts(header, Receipt))
             receipts.append(block_receipts)
         self.logger.debug2("Replying to %s with receipts for %d blocks", peer, len(receipts))
         peer.sub_proto.send_receipts(receipts)
@@ -114,11 +125,12 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
             return
         self.logger.debug2("%s requested %d trie nodes", peer, len(node_hashes))
         nodes = []
-        # Only serve up to MAX_STATE_FETCH items in every request.
-        for node_hash in node_hashes[:MAX_STATE_FETCH]:
-            try:
-                node = await self.wait(self.db.coro_get(node_hash))
-            except KeyError:
+        # Only serve up to MAX_STATE_FETCH items in every request, and fetch them all from the DB
+        # with a single call.
+        requested = node_hashes[:MAX_STATE_FETCH]
+        results = await self.wait(self.db.coro_multi_get(requested))
+        for node_hash, node in zip(requested, results):
+            if node is None:
                 self.logger.debug(
                     "%s asked for a trie node we don't have: %s", peer, to_hex(node_hash)
                 )
@@ -123,6 +123,7 @@ class GetBlockHeaders(Command):
 
 class BlockHeaders(BaseBlockHeaders):
     _cmd_id = 3
+    is_decoding_slow = True
     structure = [
         ('request_id', sedes.big_endian_int),
         ('buffer_value', sedes.big_endian_int),
@@ -144,6 +145,7 @@ class GetBlockBodies(Command):
 
 class BlockBodies(Command):
     _cmd_id = 5
+    is_decoding_slow = True
     structure = [
         ('request_id', sedes.big_endian_int),
         ('buffer_value', sedes.big_endian_int),
@@ -161,6 +163,7 @@ class GetReceipts(Command):
 
 class Receipts(Command):
     _cmd_id = 7
+    is_decoding_slow = True
     structure = [
         ('request_id', sedes.big_endian_int),
         ('buffer_value', sedes.big_endian_int),
@@ -58,7 +58,7 @@ class LESPeer(BaseChainPeer):
     @property
     def requests(self) -> LESExchangeHandler:
         if self._requests is None:
-            self._requests = LESExchangeHandler(self)
+            self._requests = LESExchangeHandler(self, self.context.max_pipelined_requests)
         return self._requests
 
     def handle_sub_proto_msg(self, cmd: Command, msg: _DecodedMsgType) -> None:
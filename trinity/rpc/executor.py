@@ -0,0 +1,88 @@
+import asyncio
+import collections
+from concurrent.futures import Executor
+import functools
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    TypeVar,
+)
+
+# Calls of each method that may run at once in the executor, unless another limit is given
+DEFAULT_MAX_CONCURRENT_CALLS = 8
+
+# Running the EVM is much more expensive than reading state, so fewer of those may run at once
+DEFAULT_MAX_CONCURRENT_EVM_CALLS = 2
+
+TReturn = TypeVar('TReturn')
+
+
+class RPCMethodExecutor:
+    """
+    Run the blocking part of RPC methods (reading state, running the EVM) in an executor instead
+    of the event loop, so that a slow call doesn't hold up the requests of every other client.
+
+    At most ``max_concurrent_calls`` calls of each method run at once, or the limit given for that
+    method in ``method_limits``. The other calls wait for their turn; the number of calls waiting
+    and running for each method are kept in :attr:`waiting` and :attr:`running`, and the most
+    calls that ever waited at once in :attr:`peak_waiting`.
+    """
+    def __init__(self,
+                 max_concurrent_calls: int = DEFAULT_MAX_CONCURRENT_CALLS,
+                 method_limits: Dict[str, int] = None,
+                 executor: Executor = None) -> None:
+        self._max_concurrent_calls = max_concurrent_calls
+        self._method_limits = method_limits or {}
+        # None means the default executor of the event loop, which is a thread pool
+        self._executor = executor
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.waiting: Counter[str] = collections.Counter()
+        self.running: Counter[str] = collections.Counter()
+        self.peak_waiting: Counter[str] = collections.Counter()
+
+    async def run(self,
+                  method_name: str,
+                  func: Callable[..., TReturn],
+                  *args: Any) -> TReturn:
+        semaphore = self._get_semaphore(method_name)
+        if semaphore.locked():
+            self.waiting[method_name] += 1
+            self.peak_waiting[method_name] = max(
+                self.peak_waiting[method_name],
+                self.waiting[method_name],
+            )
+            try:
+                await semaphore.acquire()
+            finally:
+                self.waiting[method_name] -= 1
+        else:
+            await semaphore.acquire()
+
+        self.running[method_name] += 1
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+        finally:
+            self.running[method_name] -= 1
+            semaphore.release()
+
+    def summarize_stats(self) -> str:
+        if not self._semaphores:
+            return "no calls"
+        return "  ".join(
+            "%s=%d/%d (peak %d waiting)" % (
+                method_name,
+                self.running[method_name],
+                self.waiting[method_name],
+                self.peak_waiting[method_name],
+            )
+            for method_name in sorted(self._semaphores)
+        )
+
+    def _get_semaphore(self, method_name: str) -> asyncio.Semaphore:
+        if method_name not in self._semaphores:
+            limit = self._method_limits.get(method_name, self._max_concurrent_calls)
+            self._semaphores[method_name] = asyncio.Semaphore(limit)
+        return self._semaphores[method_name]
@@ -0,0 +1,236 @@
+import asyncio
+from http import HTTPStatus
+from typing import (
+    Dict,
+    NamedTuple,
+)
+
+from cancel_token import (
+    CancelToken,
+    OperationCancelled,
+)
+
+from p2p.service import (
+    BaseService,
+)
+
+from trinity.rpc.ipc import (
+    MAX_PENDING_REQUESTS,
+    execute_raw_request,
+    format_error,
+)
+from trinity.rpc.main import (
+    RPCServer,
+)
+from trinity.rpc.pipelining import (
+    OrderedResponseWriter,
+)
+from trinity._utils.histogram import LatencyHistogram
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+MAX_REQUEST_BODY_BYTES = 32 * 1024 * 1024
+
+# Idle connections are closed after this many seconds without a new request
+KEEP_ALIVE_TIMEOUT = 60
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPRequest(NamedTuple):
+    method: str
+    version: str
+    # header names are lowercased
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        else:
+            return connection != 'close'
+
+
+async def read_http_request(reader: asyncio.StreamReader) -> HTTPRequest:
+    """
+    Read a request from the connection.
+
+    :raise asyncio.IncompleteReadError: if the connection is closed before a whole request is read
+    :raise HTTPError: if the request is malformed, or can't be handled
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large")
+
+    # Empty lines before the request line must be ignored
+    request_line, *header_lines = head.lstrip(b'\r\n').decode('latin-1').split('\r\n')
+    try:
+        method, _, version = request_line.split(' ')
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid request line: {request_line!r}")
+    if version not in ('HTTP/1.0', 'HTTP/1.1'):
+        raise HTTPError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Unsupported version: {version}")
+
+    headers = {}
+    for line in header_lines:
+        if not line:
+            continue
+        name, separator, value = line.partition(':')
+        if not separator:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid header: {line!r}")
+        headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported")
+    try:
+        content_length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if content_length > MAX_REQUEST_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+
+    body = await reader.readexactly(content_length)
+    return HTTPRequest(method, version, headers, body)
+
+
+def format_http_response(status: HTTPStatus, body: str, keep_alive: bool) -> bytes:
+    encoded_body = body.encode()
+    head = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(encoded_body)}",
+    ]
+    if status is HTTPStatus.METHOD_NOT_ALLOWED:
+        head.append("Allow: POST")
+    if not keep_alive:
+        head.append("Connection: close")
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + encoded_body
+
+
+class HTTPServer(BaseService):
+    """
+    Serve JSON-RPC requests POSTed over HTTP/1.1.
+
+    Connections are kept alive unless the client asks otherwise, and up to
+    ``max_pending_requests`` requests pipelined on a connection are executed at once, their
+    responses being written in the same order as the requests. No more than ``max_connections``
+    clients are served at once. The time taken to execute each request is counted in
+    :attr:`latency`.
+    """
+    server: asyncio.AbstractServer = None
+
+    def __init__(
+            self,
+            rpc: RPCServer,
+            host: str,
+            port: int,
+            max_connections: int = DEFAULT_MAX_CONNECTIONS,
+            max_pending_requests: int = MAX_PENDING_REQUESTS,
+            token: CancelToken = None,
+            loop: asyncio.AbstractEventLoop = None) -> None:
+        super().__init__(token=token, loop=loop)
+        self.rpc = rpc
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_pending_requests = max_pending_requests
+        self.latency = LatencyHistogram()
+        self._num_connections = 0
+
+    async def _run(self) -> None:
+        self.server = await asyncio.start_server(
+            self._handle_connection,
+            self.host,
+            self.port,
+            loop=self.get_event_loop(),
+        )
+        # In case we were asked to listen on any free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info('HTTP JSON-RPC server started at: http://%s:%d', self.host, self.port)
+        await self.cancel_token.wait()
+
+    async def _cleanup(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self.logger.debug("HTTP JSON-RPC latencies: %s", self.latency)
+
+    async def _handle_connection(self,
+                                 reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        if self._num_connections >= self.max_connections:
+            self.logger.debug("Refusing HTTP connection: already serving %d", self._num_connections)
+            writer.write(format_http_response(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                format_error("Too many connections"),
+                keep_alive=False,
+            ))
+            writer.close()
+            return
+
+        self._num_connections += 1
+        try:
+            await self._serve_connection(reader, writer)
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            self.logger.debug("HTTP client closed connection")
+        except OperationCancelled:
+            pass
+        except Exception:
+            self.logger.exception("Unrecognized exception while handling HTTP requests")
+        finally:
+            self._num_connections -= 1
+            writer.close()
+
+    async def _serve_connection(self,
+                                reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        responses = OrderedResponseWriter(writer, self.max_pending_requests)
+
+        try:
+            while True:
+                try:
+                    request = await self.wait(
+                        read_http_request(reader),
+                        timeout=KEEP_ALIVE_TIMEOUT,
+                    )
+                except TimeoutError:
+                    break
+                except asyncio.IncompleteReadError as exc:
+                    if exc.partial.strip():
+                        raise
+                    # The client closed the connection between requests
+                    break
+                except HTTPError as exc:
+                    await self.wait(responses.wait_for_room())
+                    responses.respond_with(
+                        format_http_response(exc.status, format_error(str(exc)), False)
+                    )
+                    break
+
+                await self.wait(responses.wait_for_room())
+                if request.method == 'POST':
+                    responses.respond_with(self._execute(request))
+                else:
+                    responses.respond_with(format_http_response(
+                        HTTPStatus.METHOD_NOT_ALLOWED,
+                        format_error(f"Method not allowed: {request.method}"),
+                        request.keep_alive,
+                    ))
+
+                if not request.keep_alive:
+                    break
+
+            await self.wait(responses.wait_until_written())
+        finally:
+            responses.cancel()
+
+    async def _execute(self, request: HTTPRequest) -> bytes:
+        with self.latency.time():
+            response = await execute_raw_request(self.rpc.execute, request.body, self.logger)
+        return format_http_response(HTTPStatus.OK, response, request.keep_alive)
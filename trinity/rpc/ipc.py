@@ -2,9 +2,13 @@ import asyncio
 import json
 import logging
 import pathlib
+import re
 from typing import (
     Any,
+    Awaitable,
     Callable,
+    List,
+    Optional,
     Tuple,
 )
 
@@ -22,8 +26,101 @@ from p2p.service import (
 from trinity.rpc.main import (
     RPCServer,
 )
+from trinity.rpc.pipelining import (
+    OrderedResponseWriter,
+)
+
+# Requests read from a single connection that may be executing at once. More requests are only
+# read from the connection once the oldest ones were responded to.
+MAX_PENDING_REQUESTS = 64
+
+READ_CHUNK_BYTES = 64 * 1024
+
+_FRAME_START = re.compile(rb'[{\[]')
+_STRUCTURAL_CHARS = re.compile(rb'[{}\[\]"]')
+_STRING_SPECIAL_CHARS = re.compile(rb'["\\]')
+
+
+class JSONFramer:
+    """
+    Split a stream of bytes into the JSON objects (or arrays, for batch requests) sent one after
+    the other in it, without decoding them.
 
-MAXIMUM_REQUEST_BYTES = 10000
+    Only the bytes that were not scanned yet are looked at when more data is fed, keeping track of
+    how deeply nested we are and whether we're inside a string, so that splitting large or many
+    requests takes linear time.
+    """
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        # where to resume scanning the buffer from
+        self._position = 0
+        # where the JSON value currently being scanned starts in the buffer
+        self._frame_start = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data: bytes) -> List[Tuple[str, bytes]]:
+        """
+        Add the given data to the stream, returning the JSON values that were completed by it.
+
+        Each value is returned together with any data before it that isn't JSON, or an empty
+        string if there was none.
+        """
+        self._buffer.extend(data)
+        frames: List[Tuple[str, bytes]] = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return frames
+            frames.append(frame)
+
+    def _next_frame(self) -> Optional[Tuple[str, bytes]]:
+        buffer = self._buffer
+        if self._depth == 0:
+            match = _FRAME_START.search(buffer, self._position)
+            if match is None:
+                self._position = len(buffer)
+                return None
+            self._frame_start = self._position = match.start()
+
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL_CHARS.search(buffer, self._position)
+                if match is None:
+                    self._position = len(buffer)
+                    return None
+                elif match.group() == b'"':
+                    self._in_string = False
+                    self._position = match.end()
+                elif match.end() == len(buffer):
+                    # the escaped char isn't here yet, so look at the backslash again next time
+                    self._position = match.start()
+                    return None
+                else:
+                    # skip the escaped char
+                    self._position = match.end() + 1
+            else:
+                match = _STRUCTURAL_CHARS.search(buffer, self._position)
+                if match is None:
+                    self._position = len(buffer)
+                    return None
+                self._position = match.end()
+                char = match.group()
+                if char == b'"':
+                    self._in_string = True
+                elif char in (b'{', b'['):
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return self._pop_frame()
+
+    def _pop_frame(self) -> Tuple[str, bytes]:
+        prefix = self._buffer[:self._frame_start].decode(errors='replace').strip()
+        frame = bytes(self._buffer[self._frame_start:self._position])
+        del self._buffer[:self._position]
+        self._position = self._frame_start = 0
+        return prefix, frame
 
 
 @curry
@@ -38,7 +135,7 @@ async def connection_handler(execute_rpc: Callable[[Any], Any],
 
     try:
         await connection_loop(execute_rpc, reader, writer, logger, cancel_token),
-    except (ConnectionResetError, asyncio.IncompleteReadError):
+    except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
         logger.debug("Client closed connection")
     except OperationCancelled:
         logger.debug("CancelToken triggered")
@@ -53,76 +150,63 @@ async def connection_loop(execute_rpc: Callable[[Any], Any],
                           writer: asyncio.StreamWriter,
                           logger: logging.Logger,
                           cancel_token: CancelToken) -> None:
-    # TODO: we should look into using an io.StrinIO here for more efficient
-    # writing to the end of the string.
-    raw_request = ''
-    while True:
-        request_bytes = b''
-        try:
-            request_bytes = await cancel_token.cancellable_wait(reader.readuntil(b'}'))
-        except asyncio.LimitOverrunError as e:
-            logger.info("Client request was too long. Erasing buffer and restarting...")
-            request_bytes = await cancel_token.cancellable_wait(reader.read(e.consumed))
-            await cancel_token.cancellable_wait(write_error(
-                writer,
-                "reached limit: %d bytes, starting with '%s'" % (
-                    e.consumed,
-                    request_bytes[:20],
-                ),
-            ))
-            continue
-
-        raw_request += request_bytes.decode()
-
-        bad_prefix, raw_request = strip_non_json_prefix(raw_request)
-        if bad_prefix:
-            logger.info("Client started request with non json data: %r", bad_prefix)
-            await cancel_token.cancellable_wait(
-                write_error(writer, 'Cannot parse json: ' + bad_prefix),
-            )
-
-        try:
-            request = json.loads(raw_request)
-        except json.JSONDecodeError:
-            # invalid json request, keep reading data until a valid json is formed
-            logger.debug("Invalid JSON, waiting for rest of message: %r", raw_request)
-            continue
-
-        # reset the buffer for the next message
-        raw_request = ''
-
-        if not request:
-            logger.debug("Client sent empty request")
-            await cancel_token.cancellable_wait(
-                write_error(writer, 'Invalid Request: empty'),
-            )
-            continue
-
-        try:
-            result = await execute_rpc(request)
-        except Exception as e:
-            logger.exception("Unrecognized exception while executing RPC")
-            await cancel_token.cancellable_wait(
-                write_error(writer, "unknown failure: " + str(e)),
-            )
-        else:
-            writer.write(result.encode())
-
-        await cancel_token.cancellable_wait(writer.drain())
-
-
-def strip_non_json_prefix(raw_request: str) -> Tuple[str, str]:
-    if raw_request and raw_request[0] != '{':
-        prefix, bracket, rest = raw_request.partition('{')
-        return prefix.strip(), bracket + rest
-    else:
-        return '', raw_request
-
-
-async def write_error(writer: asyncio.StreamWriter, message: str) -> None:
-    json_error = json.dumps({'error': message})
-    writer.write(json_error.encode())
-    await writer.drain()
+    """
+    Execute the requests read from the connection, up to ``MAX_PENDING_REQUESTS`` at once, and
+    write their responses in the same order as the requests.
+    """
+    framer = JSONFramer()
+    responses = OrderedResponseWriter(writer, MAX_PENDING_REQUESTS)
+
+    try:
+        while True:
+            data = await cancel_token.cancellable_wait(reader.read(READ_CHUNK_BYTES))
+            if not data:
+                logger.debug("Client closed connection")
+                break
+
+            for bad_prefix, raw_request in framer.feed(data):
+                if bad_prefix:
+                    logger.info("Client started request with non json data: %r", bad_prefix)
+                    await cancel_token.cancellable_wait(responses.wait_for_room())
+                    error = format_error('Cannot parse json: ' + bad_prefix)
+                    responses.respond_with(error.encode())
+
+                await cancel_token.cancellable_wait(responses.wait_for_room())
+                responses.respond_with(
+                    encode_response(execute_raw_request(execute_rpc, raw_request, logger))
+                )
+
+        await cancel_token.cancellable_wait(responses.wait_until_written())
+    finally:
+        responses.cancel()
+
+
+async def execute_raw_request(execute_rpc: Callable[[Any], Any],
+                              raw_request: bytes,
+                              logger: logging.Logger) -> str:
+    try:
+        request = json.loads(raw_request.decode())
+    except ValueError:
+        logger.info("Client sent invalid json: %r", raw_request[:20])
+        return format_error('Cannot parse json: %r' % raw_request[:20])
+
+    if not request:
+        logger.debug("Client sent empty request")
+        return format_error('Invalid Request: empty')
+
+    try:
+        return await execute_rpc(request)
+    except Exception as e:
+        logger.exception("Unrecognized exception while executing RPC")
+        return format_error("unknown failure: " + str(e))
+
+
+async def encode_response(response: Awaitable[str]) -> bytes:
+    return (await response).encode()
+
+
+def format_error(message: str) -> str:
+    return json.dumps({'error': message})
 
 
 class IPCServer(BaseService):
@@ -145,7 +229,6 @@ class IPCServer(BaseService):
             connection_handler(self.rpc.execute, self.cancel_token),
             str(self.ipc_path),
             loop=self.get_event_loop(),
-            limit=MAXIMUM_REQUEST_BYTES,
         )
         self.logger.info('IPC started at: %s', self.ipc_path.resolve())
         await self.cancel_token.wait()
@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
 from typing import (
     Any,
     Dict,
+    List,
     Sequence,
     Tuple,
     Union,
@@ -20,6 +22,9 @@ from trinity.rpc.modules import (
     BaseRPCModule,
 )
 
+# Members of a batch request that may be executed at once
+DEFAULT_MAX_CONCURRENT_BATCH_REQUESTS = 16
+
 REQUIRED_REQUEST_KEYS = {
     'id',
     'jsonrpc',
@@ -58,13 +63,18 @@ class RPCServer:
     The key entry point for all requests is :meth:`RPCServer.request`, which
     then proxies to the appropriate method. For example, see
     :meth:`RPCServer.eth_getBlockByHash`.
+
+    Batch requests (a list of requests) are supported too. Up to ``max_concurrent_batch_requests``
+    members of a batch are executed at once, and their responses are returned in the same order.
     """
     chain = None
 
     def __init__(self,
                  modules: Sequence[BaseRPCModule],
-                 event_bus: Endpoint=None) -> None:
+                 event_bus: Endpoint=None,
+                 max_concurrent_batch_requests: int=DEFAULT_MAX_CONCURRENT_BATCH_REQUESTS) -> None:
         self.modules: Dict[str, BaseRPCModule] = {}
+        self._max_concurrent_batch_requests = max_concurrent_batch_requests
 
         for module in modules:
             name = module.name.lower()
@@ -129,9 +139,31 @@ class RPCServer:
         else:
             return result, None
 
-    async def execute(self, request: Dict[str, Any]) -> str:
+    async def execute(self, request: Union[Dict[str, Any], List[Any]]) -> str:
         """
         The key entry point for all incoming requests
         """
+        if isinstance(request, list):
+            return await self._execute_batch(request)
+        else:
+            return await self._execute_single(request)
+
+    async def _execute_single(self, request: Any) -> str:
+        if not isinstance(request, dict):
+            return generate_response({}, None, "Invalid Request: %r" % request)
         result, error = await self._get_result(request)
         return generate_response(request, result, error)
+
+    async def _execute_batch(self, requests: List[Any]) -> str:
+        if not requests:
+            return generate_response({}, None, "Invalid Request: empty batch")
+
+        semaphore = asyncio.Semaphore(self._max_concurrent_batch_requests)
+
+        async def execute_member(request: Any) -> str:
+            async with semaphore:
+                return await self._execute_single(request)
+
+        responses = await asyncio.gather(*(execute_member(request) for request in requests))
+        # The responses are already serialized, so join them rather than decoding them again
+        return '[' + ','.join(responses) + ']'
@@ -13,6 +13,9 @@ from lahja import (
 from trinity.chains.base import (
     BaseAsyncChain
 )
+from trinity.rpc.executor import (
+    RPCMethodExecutor,
+)
 
 from .main import (  # noqa: F401
     BaseRPCModule,
@@ -31,8 +34,10 @@ from .web3 import Web3  # noqa: F401
 
 
 @to_tuple
-def initialize_eth1_modules(chain: BaseAsyncChain, event_bus: Endpoint) -> Iterable[BaseRPCModule]:
-    yield Eth(chain, event_bus)
+def initialize_eth1_modules(chain: BaseAsyncChain,
+                            event_bus: Endpoint,
+                            executor: RPCMethodExecutor = None) -> Iterable[BaseRPCModule]:
+    yield Eth(chain, event_bus, executor)
     yield EVM(chain, event_bus)
     yield Net(event_bus)
     yield Web3()
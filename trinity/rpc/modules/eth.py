@@ -10,6 +10,10 @@ from typing import (
     List,
     Union,
 )
+
+from lahja import (
+    Endpoint,
+)
 from mypy_extensions import (
     TypedDict,
 )
@@ -47,6 +51,10 @@ from trinity.constants import (
     TO_NETWORKING_BROADCAST_CONFIG,
 )
 from trinity.chains.base import BaseAsyncChain
+from trinity.rpc.executor import (
+    DEFAULT_MAX_CONCURRENT_EVM_CALLS,
+    RPCMethodExecutor,
+)
 from trinity.rpc.format import (
     block_to_dict,
     header_to_dict,
@@ -87,10 +95,7 @@ async def get_header(chain: BaseAsyncChain, at_block: Union[str, int]) -> BlockH
     return at_header
 
 
-async def account_db_at_block(chain: BaseAsyncChain,
-                              at_block: Union[str, int],
-                              read_only: bool=True) ->BaseAccountDB:
-    at_header = await get_header(chain, at_block)
+def account_db_at_header(chain: BaseAsyncChain, at_header: BlockHeader) -> BaseAccountDB:
     vm = chain.get_vm(at_header)
     return vm.state.account_db
 
@@ -136,12 +141,57 @@ def dict_to_spoof_transaction(
     return SpoofTransaction(unsigned, from_=sender)
 
 
+def execute_call(chain: BaseAsyncChain, header: BlockHeader, txn_dict: Dict[str, Any]) -> bytes:
+    validate_transaction_call_dict(txn_dict, chain.get_vm(header))
+    transaction = dict_to_spoof_transaction(chain, header, txn_dict)
+    return chain.get_transaction_result(transaction, header)
+
+
+def estimate_gas(chain: BaseAsyncChain, header: BlockHeader, txn_dict: Dict[str, Any]) -> int:
+    validate_transaction_gas_estimation_dict(txn_dict, chain.get_vm(header))
+    transaction = dict_to_spoof_transaction(chain, header, txn_dict)
+    return chain.estimate_gas(transaction, header)
+
+
+def get_balance(chain: BaseAsyncChain, header: BlockHeader, address: Address) -> int:
+    return account_db_at_header(chain, header).get_balance(address)
+
+
+def get_code(chain: BaseAsyncChain, header: BlockHeader, address: Address) -> bytes:
+    return account_db_at_header(chain, header).get_code(address)
+
+
+def get_storage(chain: BaseAsyncChain,
+                header: BlockHeader,
+                address: Address,
+                position: int) -> int:
+    return account_db_at_header(chain, header).get_storage(address, position)
+
+
+def get_nonce(chain: BaseAsyncChain, header: BlockHeader, address: Address) -> int:
+    return account_db_at_header(chain, header).get_nonce(address)
+
+
 class Eth(Eth1ChainRPCModule):
     """
     All the methods defined by JSON-RPC API, starting with "eth_"...
 
     Any attribute without an underscore is publicly accessible.
+
+    The methods that read state or run the EVM do so in the given ``RPCMethodExecutor``, so that
+    they don't block the event loop.
     """
+    def __init__(self,
+                 chain: BaseAsyncChain,
+                 event_bus: Endpoint,
+                 executor: RPCMethodExecutor = None) -> None:
+        super().__init__(chain, event_bus)
+        if executor is None:
+            executor = RPCMethodExecutor(method_limits={
+                'call': DEFAULT_MAX_CONCURRENT_EVM_CALLS,
+                'estimateGas': DEFAULT_MAX_CONCURRENT_EVM_CALLS,
+            })
+        self._executor = executor
 
     @property
     def name(self) -> str:
@@ -158,9 +208,7 @@ class Eth(Eth1ChainRPCModule):
     @format_params(identity, to_int_if_hex)
     async def call(self, txn_dict: Dict[str, Any], at_block: Union[str, int]) -> str:
         header = await get_header(self.chain, at_block)
-        validate_transaction_call_dict(txn_dict, self.chain.get_vm(header))
-        transaction = dict_to_spoof_transaction(self.chain, header, txn_dict)
-        result = self.chain.get_transaction_result(transaction, header)
+        result = await self._executor.run('call', execute_call, self.chain, header, txn_dict)
         return encode_hex(result)
 
     async def coinbase(self) -> str:
@@ -171,9 +219,7 @@ class Eth(Eth1ChainRPCModule):
     @format_params(identity, to_int_if_hex)
     async def estimateGas(self, txn_dict: Dict[str, Any], at_block: Union[str, int]) -> str:
         header = await get_header(self.chain, at_block)
-        validate_transaction_gas_estimation_dict(txn_dict, self.chain.get_vm(header))
-        transaction = dict_to_spoof_transaction(self.chain, header, txn_dict)
-        gas = self.chain.estimate_gas(transaction, header)
+        gas = await self._executor.run('estimateGas', estimate_gas, self.chain, header, txn_dict)
         return hex(gas)
 
     async def gasPrice(self) -> str:
@@ -181,8 +227,8 @@ class Eth(Eth1ChainRPCModule):
 
     @format_params(decode_hex, to_int_if_hex)
     async def getBalance(self, address: Address, at_block: Union[str, int]) -> str:
-        account_db = await account_db_at_block(self.chain, at_block)
-        balance = account_db.get_balance(address)
+        header = await get_header(self.chain, at_block)
+        balance = await self._executor.run('getBalance', get_balance, self.chain, header, address)
 
         return hex(balance)
 
@@ -212,8 +258,8 @@ class Eth(Eth1ChainRPCModule):
 
     @format_params(decode_hex, to_int_if_hex)
     async def getCode(self, address: Address, at_block: Union[str, int]) -> str:
-        account_db = await account_db_at_block(self.chain, at_block)
-        code = account_db.get_code(address)
+        header = await get_header(self.chain, at_block)
+        code = await self._executor.run('getCode', get_code, self.chain, header, address)
         return encode_hex(code)
 
     @format_params(decode_hex, to_int_if_hex, to_int_if_hex)
@@ -221,8 +267,15 @@ class Eth(Eth1ChainRPCModule):
         if not is_integer(position) or position < 0:
             raise TypeError("Position of storage must be a whole number, but was: %r" % position)
 
-        account_db = await account_db_at_block(self.chain, at_block)
-        stored_val = account_db.get_storage(address, position)
+        header = await get_header(self.chain, at_block)
+        stored_val = await self._executor.run(
+            'getStorageAt',
+            get_storage,
+            self.chain,
+            header,
+            address,
+            position,
+        )
         return encode_hex(int_to_big_endian(stored_val))
 
     @format_params(decode_hex, to_int_if_hex)
@@ -243,8 +296,14 @@ class Eth(Eth1ChainRPCModule):
 
     @format_params(decode_hex, to_int_if_hex)
     async def getTransactionCount(self, address: Address, at_block: Union[str, int]) -> str:
-        account_db = await account_db_at_block(self.chain, at_block)
-        nonce = account_db.get_nonce(address)
+        header = await get_header(self.chain, at_block)
+        nonce = await self._executor.run(
+            'getTransactionCount',
+            get_nonce,
+            self.chain,
+            header,
+            address,
+        )
         return hex(nonce)
 
     @format_params(decode_hex)
@@ -0,0 +1,60 @@
+import asyncio
+from typing import (
+    Awaitable,
+    Optional,
+    Set,
+    Union,
+)
+
+
+class OrderedResponseWriter:
+    """
+    Write the responses to the requests pipelined on a single connection, in the same order as the
+    requests, while letting up to ``max_pending`` of them execute at once.
+
+    Before adding a response with :meth:`respond_with`, callers must wait for :meth:`wait_for_room`
+    to return. Responses still being executed or written are cancelled by :meth:`cancel`.
+    """
+    def __init__(self, writer: asyncio.StreamWriter, max_pending: int) -> None:
+        self._writer = writer
+        self._pending = asyncio.Semaphore(max_pending)
+        self._responding: Set['asyncio.Future[None]'] = set()
+        self._last_response: 'asyncio.Future[None]' = None
+
+    async def wait_for_room(self) -> None:
+        await self._pending.acquire()
+
+    def respond_with(self, response: Union[bytes, Awaitable[bytes]]) -> None:
+        """
+        Write the given response, or the one it resolves to, once all the previous ones are
+        written.
+        """
+        self._last_response = asyncio.ensure_future(
+            self._respond(response, self._last_response)
+        )
+        self._responding.add(self._last_response)
+        self._last_response.add_done_callback(self._responding.discard)
+
+    async def wait_until_written(self) -> None:
+        """
+        Wait until all the responses added so far are written.
+        """
+        if self._last_response is not None:
+            await self._last_response
+
+    def cancel(self) -> None:
+        for response in self._responding:
+            response.cancel()
+
+    async def _respond(self,
+                       response: Union[bytes, Awaitable[bytes]],
+                       previous_response: Optional['asyncio.Future[None]']) -> None:
+        try:
+            result = response if isinstance(response, bytes) else await response
+            # responses must be written in the same order as the requests
+            if previous_response is not None:
+                await previous_response
+            self._writer.write(result)
+            await self._writer.drain()
+        finally:
+            self._pending.release()
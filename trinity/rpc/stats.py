@@ -0,0 +1,40 @@
+from typing import (
+    Callable,
+    List,
+    Tuple,
+)
+
+from cancel_token import (
+    CancelToken,
+)
+
+from p2p.service import (
+    BaseService,
+)
+
+
+class RPCStatsReporter(BaseService):
+    """
+    Periodically log the stats of the parts of the JSON-RPC server that keep them, like the cache
+    of the database it reads from.
+
+    Each source of stats is given as a name and a callable returning a summary of its current
+    stats, which is logged every ``_report_interval`` seconds.
+    """
+    _report_interval = 60
+
+    def __init__(self, token: CancelToken = None) -> None:
+        super().__init__(token)
+        self._sources: List[Tuple[str, Callable[[], str]]] = []
+
+    def add_source(self, name: str, summarize: Callable[[], str]) -> None:
+        self._sources.append((name, summarize))
+
+    def report(self) -> None:
+        for name, summarize in self._sources:
+            self.logger.info("%s: %s", name, summarize())
+
+    async def _run(self) -> None:
+        while self.is_operational:
+            await self.sleep(self._report_interval)
+            self.report()
@@ -0,0 +1,127 @@
+import asyncio
+from typing import (
+    Set,
+    Union,
+)
+
+from cancel_token import (
+    CancelToken,
+    OperationCancelled,
+)
+import websockets
+
+from p2p.service import (
+    BaseService,
+)
+
+from trinity.rpc.http import (
+    DEFAULT_MAX_CONNECTIONS,
+    MAX_REQUEST_BODY_BYTES,
+)
+from trinity.rpc.ipc import (
+    MAX_PENDING_REQUESTS,
+    execute_raw_request,
+)
+from trinity.rpc.main import (
+    RPCServer,
+)
+from trinity._utils.histogram import LatencyHistogram
+
+# Close code sent to clients when we're already serving as many as we can. The standard "Try
+# Again Later" code (1013) can't be sent with the version of websockets we use, so this is one of
+# the codes reserved for private use (4000-4999), ending in the same digits.
+TOO_MANY_CONNECTIONS = 4013
+
+
+class WebSocketServer(BaseService):
+    """
+    Serve JSON-RPC requests sent as WebSocket messages, one request (or batch) per message.
+
+    Up to ``max_pending_requests`` requests from a connection are executed at once, and each
+    response is sent as soon as it's ready, so clients must match them to their requests by id.
+    No more than ``max_connections`` clients are served at once. The time taken to execute each
+    request is counted in :attr:`latency`.
+    """
+    server: websockets.server.WebSocketServer = None
+
+    def __init__(
+            self,
+            rpc: RPCServer,
+            host: str,
+            port: int,
+            max_connections: int = DEFAULT_MAX_CONNECTIONS,
+            max_pending_requests: int = MAX_PENDING_REQUESTS,
+            token: CancelToken = None,
+            loop: asyncio.AbstractEventLoop = None) -> None:
+        super().__init__(token=token, loop=loop)
+        self.rpc = rpc
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_pending_requests = max_pending_requests
+        self.latency = LatencyHistogram()
+        self._num_connections = 0
+
+    async def _run(self) -> None:
+        self.server = await websockets.serve(
+            self._handle_connection,
+            self.host,
+            self.port,
+            loop=self.get_event_loop(),
+            max_size=MAX_REQUEST_BODY_BYTES,
+        )
+        # In case we were asked to listen on any free port
+        self.port = self.server.server.sockets[0].getsockname()[1]
+        self.logger.info('WebSocket JSON-RPC server started at: ws://%s:%d', self.host, self.port)
+        await self.cancel_token.wait()
+
+    async def _cleanup(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self.logger.debug("WebSocket JSON-RPC latencies: %s", self.latency)
+
+    async def _handle_connection(self,
+                                 websocket: websockets.server.WebSocketServerProtocol,
+                                 path: str) -> None:
+        if self._num_connections >= self.max_connections:
+            self.logger.debug(
+                "Refusing WebSocket connection: already serving %d",
+                self._num_connections,
+            )
+            await websocket.close(code=TOO_MANY_CONNECTIONS, reason="Too many connections")
+            return
+
+        self._num_connections += 1
+        pending = asyncio.Semaphore(self.max_pending_requests)
+        responding: Set['asyncio.Future[None]'] = set()
+        try:
+            while True:
+                message = await self.wait(websocket.recv())
+                await self.wait(pending.acquire())
+                response = asyncio.ensure_future(self._respond(websocket, message, pending))
+                responding.add(response)
+                response.add_done_callback(responding.discard)
+        except websockets.ConnectionClosed:
+            self.logger.debug("WebSocket client closed connection")
+        except OperationCancelled:
+            pass
+        except Exception:
+            self.logger.exception("Unrecognized exception while handling WebSocket requests")
+        finally:
+            self._num_connections -= 1
+            for response in responding:
+                response.cancel()
+
+    async def _respond(self,
+                       websocket: websockets.server.WebSocketServerProtocol,
+                       message: Union[str, bytes],
+                       pending: asyncio.Semaphore) -> None:
+        try:
+            raw_request = message.encode() if isinstance(message, str) else message
+            with self.latency.time():
+                response = await execute_raw_request(self.rpc.execute, raw_request, self.logger)
+            await websocket.send(response)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            pending.release()
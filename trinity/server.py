@@ -44,6 +44,7 @@ from p2p.kademlia import (
     Node,
 )
 from p2p.nat import UPnPService
+from p2p.node_db import NodeDB
 from p2p.p2p_proto import (
     DisconnectReason,
 )
@@ -87,10 +88,13 @@ class BaseServer(BaseService, Generic[TPeerPool]):
                  preferred_nodes: Sequence[Node] = None,
                  event_bus: Endpoint = None,
                  token: CancelToken = None,
+                 node_db: NodeDB = None,
+                 max_pipelined_requests: int = 1,
                  ) -> None:
         super().__init__(token)
         # cross process event bus
         self.event_bus = event_bus
+        self.node_db = node_db
 
         # chain information
         self.chain = chain
@@ -103,6 +107,7 @@ class BaseServer(BaseService, Generic[TPeerPool]):
         self.port = port
         self.network_id = network_id
         self.max_peers = max_peers
+        self.max_pipelined_requests = max_pipelined_requests
         self.bootstrap_nodes = bootstrap_nodes
         self.preferred_nodes = preferred_nodes
         if self.preferred_nodes is None and network_id in DEFAULT_PREFERRED_NODES:
@@ -280,13 +285,15 @@ class FullServer(BaseServer[ETHPeerPool]):
             headerdb=self.headerdb,
             network_id=self.network_id,
             vm_configuration=self.chain.vm_configuration,
+            max_pipelined_requests=self.max_pipelined_requests,
         )
         return ETHPeerPool(
             privkey=self.privkey,
             max_peers=self.max_peers,
             context=context,
             token=self.cancel_token,
-            event_bus=self.event_bus
+            event_bus=self.event_bus,
+            node_db=self.node_db,
         )
 
     def _make_request_server(self) -> ETHRequestServer:
@@ -303,13 +310,15 @@ class LightServer(BaseServer[LESPeerPool]):
             headerdb=self.headerdb,
             network_id=self.network_id,
             vm_configuration=self.chain.vm_configuration,
+            max_pipelined_requests=self.max_pipelined_requests,
         )
         return LESPeerPool(
             privkey=self.privkey,
             max_peers=self.max_peers,
             context=context,
             token=self.cancel_token,
-            event_bus=self.event_bus
+            event_bus=self.event_bus,
+            node_db=self.node_db,
         )
 
     def _make_request_server(self) -> LightRequestServer:
@@ -4,3 +4,7 @@ EMPTY_PEER_RESPONSE_PENALTY = 15.0
 # Picked a reorg number that is covered by a single skeleton header request,
 # which covers about 6 days at 15s blocks
 MAX_SKELETON_REORG_DEPTH = 35000
+
+# The most requests of any kind that the syncers may have in flight to a single peer at once.
+# Slower peers get proportionally fewer, see PeerScheduler.
+MAX_REQUESTS_PER_PEER = 4
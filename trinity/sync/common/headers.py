@@ -1,13 +1,17 @@
 from abc import ABC, abstractmethod
 import asyncio
+from collections import deque
 from concurrent.futures import CancelledError
 from operator import attrgetter, itemgetter
 from random import randrange
 from typing import (
     AsyncIterator,
     Callable,
+    Deque,
     Generic,
     FrozenSet,
+    NamedTuple,
+    Set,
     Tuple,
     Type,
     cast,
@@ -56,7 +60,7 @@ from trinity.sync.common.constants import (
     EMPTY_PEER_RESPONSE_PENALTY,
     MAX_SKELETON_REORG_DEPTH,
 )
-from trinity.sync.common.peers import TChainPeer, WaitingPeers
+from trinity.sync.common.peers import PeerScheduler, TChainPeer
 from trinity._utils.datastructures import (
     DuplicateTasks,
     OrderedTaskPreparation,
@@ -67,25 +71,45 @@ from trinity._utils.humanize import (
 )
 
 
+class _SkeletonWindow(NamedTuple):
+    start_num: BlockNumber
+    # The first parent header of the window, which is also the last parent header of the
+    # previous window. None for the first window.
+    overlap: BlockHeader
+    # Parent/child pairs of headers, with one of the gaps between them filled in
+    segments: Tuple[Tuple[BlockHeader, ...], ...]
+    last_parent: BlockHeader
+    # False if the peers returned fewer headers than requested, so there are no more windows
+    is_full: bool
+
+
 class SkeletonSyncer(BaseService, Generic[TChainPeer]):
     # header skip: long enough that the pairs leave a gap of 192, the max header request length
     _skip_length = MAX_HEADERS_FETCH + 1
 
     max_reorg_depth = MAX_SKELETON_REORG_DEPTH
 
+    # How many windows of the skeleton (each one a request for parent headers and another for
+    # their children) may be fetched at once, from the skeleton peer and any helper peers.
+    max_pending_windows = 4
+
     _fetched_headers: 'asyncio.Queue[Tuple[BlockHeader, ...]]'
 
     def __init__(self,
                  chain: BaseAsyncChain,
                  db: BaseAsyncHeaderDB,
                  peer: TChainPeer,
-                 token: CancelToken) -> None:
+                 token: CancelToken,
+                 peer_pool: BaseChainPeerPool = None) -> None:
         super().__init__(token=token)
         self._chain = chain
         self._db = db
         self.peer = peer
         max_pending_headers = peer.max_headers_fetch * 8
         self._fetched_headers = asyncio.Queue(max_pending_headers)
+        # If given, other peers from the pool help fetch the skeleton
+        self._peer_pool = peer_pool
+        self._failed_helpers: Set[TChainPeer] = set()
 
     async def next_skeleton_segment(self) -> AsyncIterator[Tuple[BlockHeader, ...]]:
         while self.is_operational or self._fetched_headers.qsize() > 0:
@@ -134,6 +158,12 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
         parent -> child -> [skip] ... [skip] -> parent -> child -> [skip] ... [skip] -> ...
 
         There are some exceptions where more than two headers are returned consecutively.
+
+        The skeleton is fetched in windows, several of them at once. Each window starts at the
+        last parent header of the previous one. The parent headers (and the random gap we fill)
+        always come from the skeleton peer, but the children may be fetched from a helper peer,
+        in which case they're only accepted if they match the skeleton peer's parents. A window is
+        only accepted if its first parent matches the last parent of the previous window.
         """
         peer = self.peer
 
@@ -142,61 +172,186 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
         self._fetched_headers.put_nowait(launch_headers)
         previous_tail_header = launch_headers[-1]
         start_num = BlockNumber(previous_tail_header.block_number + self._skip_length)
+        # each window overlaps the previous one by a single parent header
+        window_length = (peer.max_headers_fetch - 1) * (self._skip_length + 1)
 
-        while self.is_operational:
-            # get parents
-            parents = await self._fetch_headers_from(peer, start_num)
-            if not parents:
-                break
+        pending_windows: Deque['asyncio.Future[_SkeletonWindow]'] = deque()
+        num_windows = 0
+        last_parent: BlockHeader = None
+        try:
+            while self.is_operational:
+                # keep several windows in flight, so that the skeleton is never waiting on a
+                # single round trip
+                while len(pending_windows) < self._get_max_pending_windows():
+                    pending_windows.append(asyncio.ensure_future(self._fetch_window(
+                        start_num,
+                        num_windows == 0,
+                        self._pick_child_peer(num_windows),
+                    )))
+                    num_windows += 1
+                    start_num = BlockNumber(start_num + window_length)
+
+                window = await self.wait(pending_windows.popleft())
+                if not window.segments:
+                    break
+                elif last_parent is not None and window.overlap != last_parent:
+                    raise ValidationError(
+                        f"{peer} returned {window.overlap} at #{window.start_num}, "
+                        f"but {last_parent} before"
+                    )
 
-            # get children
-            children = await self._fetch_headers_from(peer, BlockNumber(start_num + 1))
-            if not children:
-                break
+                segments = window.segments
+                previous_lead_header = segments[0][0]
+                previous_tail_header = segments[-1][-1]
+                self.logger.debug(
+                    "Got new header bones: %s-%s",
+                    previous_lead_header,
+                    previous_tail_header,
+                )
+                # load all headers, pausing when buffer is full
+                for segment in segments:
+                    if len(segment) > 0:
+                        await self.wait(self._fetched_headers.put(segment))
+                    else:
+                        raise ValidationError(f"Found empty header segment in {segments}")
+
+                if not window.is_full:
+                    break
+                last_parent = window.last_parent
+
+            # The windows still in flight are past the end of the skeleton, but let their
+            # requests complete: if we cancelled them, their (empty) responses could be taken as
+            # the response to the request for the final headers below.
+            await self.wait(asyncio.gather(
+                *pending_windows,
+                loop=self.get_event_loop(),
+                return_exceptions=True,
+            ))
+        finally:
+            for pending_window in pending_windows:
+                pending_window.cancel()
+
+        await self._get_final_headers(peer, previous_tail_header)
+
+    def _get_helper_peers(self) -> Tuple[TChainPeer, ...]:
+        if self._peer_pool is None:
+            return tuple()
+        return tuple(
+            cast(TChainPeer, peer)
+            for peer in self._peer_pool.get_peers(self.peer.head_td)
+            if peer is not self.peer and peer not in self._failed_helpers and peer.is_operational
+        )
+
+    def _get_max_pending_windows(self) -> int:
+        return min(self.max_pending_windows, len(self._get_helper_peers()) + 1)
+
+    def _pick_child_peer(self, window_index: int) -> TChainPeer:
+        """
+        Pick a peer to get the child headers of a skeleton window from, taking turns between the
+        skeleton peer and any helper peers.
+        """
+        peers = (self.peer, ) + self._get_helper_peers()
+        return peers[window_index % len(peers)]
+
+    async def _fetch_window(
+            self,
+            start_num: BlockNumber,
+            is_first: bool,
+            child_peer: TChainPeer) -> _SkeletonWindow:
+        peer = self.peer
+        header_limit = peer.max_headers_fetch
+        if is_first:
+            child_start = BlockNumber(start_num + 1)
+            num_children = header_limit
+        else:
+            # the first parent belongs to the previous window, and we already have its child
+            child_start = BlockNumber(start_num + self._skip_length + 2)
+            num_children = header_limit - 1
+
+        parents, children = await asyncio.gather(
+            self._fetch_headers_from(peer, start_num, header_limit),
+            self._fetch_headers_from(child_peer, child_start, num_children),
+            loop=self.get_event_loop(),
+        )
+
+        if is_first or not parents:
+            overlap = None
+        else:
+            overlap, parents = parents[0], parents[1:]
+
+        # children from a helper are only used if they match the skeleton peer's parents
+        if child_peer is not peer and await self._check_helper_children(
+                child_peer, parents, children):
+            pairs = tuple(zip(parents, children))
+        else:
+            if child_peer is not peer:
+                children = await self._fetch_headers_from(peer, child_start, num_children)
 
             # validate that parents and children match
             pairs = tuple(zip(parents, children))
             try:
-                validate_pair_coros = [
-                    self.wait(self._chain.coro_validate_chain(parent, (child, )))
-                    for parent, child in pairs
-                ]
-                await asyncio.gather(*validate_pair_coros, loop=self.get_event_loop())
+                await self.wait(self._chain.coro_validate_chains(
+                    tuple((parent, (child, )) for parent, child in pairs)
+                ))
             except ValidationError as e:
                 self.logger.warning("Received invalid headers from %s, disconnecting: %s", peer, e)
                 raise
 
-            # select and validate a single random gap, to test that skeleton peer has meat headers
-            if len(pairs) >= 2:
-                # choose random gap to fill
-                gap_index = randrange(0, len(pairs) - 1)
-                segments = await self._fill_in_gap(peer, pairs, gap_index)
-                if len(segments) == 0:
-                    raise ValidationError(
-                        "Unexpected - filling in gap silently returned no headers"
-                    )
-            else:
-                segments = pairs
+        is_full = len(parents) == num_children and len(children) == num_children
+
+        # select and validate a single random gap, to test that skeleton peer has meat headers
+        if len(pairs) >= 2:
+            # choose random gap to fill
+            gap_index = randrange(0, len(pairs) - 1)
+            segments = await self._fill_in_gap(peer, pairs, gap_index)
+            if len(segments) == 0:
+                raise ValidationError(
+                    "Unexpected - filling in gap silently returned no headers"
+                )
+        else:
+            segments = pairs
+
+        return _SkeletonWindow(
+            start_num,
+            overlap,
+            segments,
+            pairs[-1][0] if pairs else None,
+            is_full,
+        )
 
-            previous_lead_header = segments[0][0]
-            previous_tail_header = segments[-1][-1]
+    async def _check_helper_children(
+            self,
+            helper: TChainPeer,
+            parents: Tuple[BlockHeader, ...],
+            children: Tuple[BlockHeader, ...]) -> bool:
+        """
+        Check that a helper peer gave us a child for each of the skeleton peer's parents, and that
+        they all match. A helper whose children don't match is not used again for this skeleton.
+        """
+        if len(children) < len(parents):
             self.logger.debug(
-                "Got new header bones from %s: %s-%s",
-                peer,
-                previous_lead_header,
-                previous_tail_header,
+                "Helper %s returned %d skeleton headers, %d needed",
+                helper,
+                len(children),
+                len(parents),
             )
-            # load all headers, pausing when buffer is full
-            for segment in segments:
-                if len(segment) > 0:
-                    await self.wait(self._fetched_headers.put(segment))
-                else:
-                    raise ValidationError(f"Found empty header segment in {segments}")
-
-            # prepare for the next request
-            start_num = previous_tail_header.block_number + self._skip_length - 1
+            return False
 
-        await self._get_final_headers(peer, previous_tail_header)
+        try:
+            await self.wait(self._chain.coro_validate_chains(
+                tuple((parent, (child, )) for parent, child in zip(parents, children))
+            ))
+        except ValidationError as exc:
+            self.logger.debug(
+                "Skeleton headers from helper %s don't match %s, not using it again: %s",
+                helper,
+                self.peer,
+                exc,
+            )
+            self._failed_helpers.add(helper)
+            return False
+        else:
+            return True
 
     async def _get_final_headers(self, peer: TChainPeer, previous_tail_header: BlockHeader) -> None:
         while self.is_operational:
@@ -422,7 +577,13 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
             self.logger.info("Skeleteon sync with %s cancelled", peer)
             return tuple()
         except TimeoutError:
-            self.logger.warning("Timeout waiting for header batch from %s, aborting sync", peer)
+            if peer is self.peer:
+                self.logger.warning(
+                    "Timeout waiting for header batch from %s, aborting sync", peer)
+            else:
+                # _fetch_window() gets these headers from the skeleton peer instead
+                self.logger.warning(
+                    "Timeout waiting for header batch from helper %s, disconnecting", peer)
             await peer.disconnect(DisconnectReason.timeout)
             return tuple()
         except ValidationError as err:
@@ -434,7 +595,10 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
             return tuple()
 
         if not headers:
-            self.logger.info("Got no new headers from %s, exiting skeleton sync", peer)
+            if peer is self.peer:
+                self.logger.info("Got no new headers from %s, exiting skeleton sync", peer)
+            else:
+                self.logger.debug("Got no new headers from helper %s", peer)
             return tuple()
         else:
             return headers
@@ -513,7 +677,8 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
             chain: BaseAsyncChain,
             peer_pool: BaseChainPeerPool,
             stitcher: HeaderStitcher,
-            token: CancelToken) -> None:
+            token: CancelToken,
+            peer_scheduler: PeerScheduler[TChainPeer] = None) -> None:
         super().__init__(token=token)
         self._chain = chain
         self._stitcher = stitcher
@@ -524,14 +689,17 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
             compose(attrgetter('block_number'), itemgetter(0)),
         )
 
-        # queue up idle peers, ordered by speed that they return block bodies
-        self._waiting_peers: WaitingPeers[TChainPeer] = WaitingPeers(BaseBlockHeaders)
+        # pick peers to download from, sharing them with any other syncer that uses the scheduler
+        if peer_scheduler is None:
+            self._peer_scheduler: PeerScheduler[TChainPeer] = PeerScheduler()
+        else:
+            self._peer_scheduler = peer_scheduler
         self._peer_pool = peer_pool
 
     def register_peer(self, peer: BasePeer) -> None:
         super().register_peer(peer)
-        # when a new peer is added to the pool, add it to the idle peer list
-        self._waiting_peers.put_nowait(peer)  # type: ignore
+        # when a new peer is added to the pool, make it available for downloads
+        self._peer_scheduler.register_peer(peer)  # type: ignore
 
     async def schedule_segment(
             self,
@@ -580,7 +748,7 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
         def fail_task() -> None:
             self._filler_header_tasks.complete(batch_id, tuple())
 
-        peer = await self._waiting_peers.get_fastest()
+        peer = await self._peer_scheduler.reserve(BaseBlockHeaders)
 
         def complete_task() -> None:
             self._filler_header_tasks.complete(batch_id, (
@@ -595,6 +763,8 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
             length: int,
             complete_task_fn: Callable[[], None],
             fail_task_fn: Callable[[], None]) -> None:
+        # Seconds to wait before the peer may be given another request, if it misbehaved
+        penalty = 0.0
         try:
             completed_headers = await peer.wait(self._fetch_segment(peer, parent_header, length))
         except BaseP2PError as exc:
@@ -616,19 +786,23 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
         else:
             if len(completed_headers) == length:
                 # peer completed successfully, so have it get back in line for processing
-                self._waiting_peers.put_nowait(peer)
                 complete_task_fn()
             else:
                 # peer didn't return enough results, wait a while before trying again
-                delay = EMPTY_PEER_RESPONSE_PENALTY
+                penalty = EMPTY_PEER_RESPONSE_PENALTY
                 self.logger.debug(
                     "Pausing %s for %.1fs, for sending %d headers",
                     peer,
-                    delay,
+                    penalty,
                     len(completed_headers),
                 )
-                self.call_later(delay, self._waiting_peers.put_nowait, peer)
                 fail_task_fn()
+        finally:
+            # the reservation must be released whether or not the download succeeded
+            if penalty:
+                self.call_later(penalty, self._peer_scheduler.release, peer, BaseBlockHeaders)
+            else:
+                self._peer_scheduler.release(peer, BaseBlockHeaders)
 
     async def _fetch_segment(
             self,
@@ -710,7 +884,8 @@ class BaseHeaderChainSyncer(BaseService, HeaderSyncerAPI, Generic[TChainPeer]):
                  chain: BaseAsyncChain,
                  db: BaseAsyncHeaderDB,
                  peer_pool: BaseChainPeerPool,
-                 token: CancelToken = None) -> None:
+                 token: CancelToken = None,
+                 peer_scheduler: PeerScheduler[TChainPeer] = None) -> None:
         super().__init__(token)
         self._db = db
         self._chain = chain
@@ -729,7 +904,7 @@ class BaseHeaderChainSyncer(BaseService, HeaderSyncerAPI, Generic[TChainPeer]):
         )
         # When downloading the headers into the gaps left by the syncer, they must be linearized
         # by the stitcher
-        self._meat = HeaderMeatSyncer(chain, peer_pool, self._stitcher, token)
+        self._meat = HeaderMeatSyncer(chain, peer_pool, self._stitcher, token, peer_scheduler)
         self._last_target_header_hash: Hash32 = None
 
     async def new_sync_headers(self) -> AsyncIterator[Tuple[BlockHeader, ...]]:
@@ -780,6 +955,7 @@ class BaseHeaderChainSyncer(BaseService, HeaderSyncerAPI, Generic[TChainPeer]):
             self._db,
             peer,
             self.cancel_token,
+            self._peer_pool,
         )
         self.run_child_service(self._skeleton)
         await self._skeleton.events.started.wait()
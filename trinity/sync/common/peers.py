@@ -1,8 +1,11 @@
-from asyncio import (
-    PriorityQueue,
-)
+import asyncio
+from collections import defaultdict
 from typing import (
+    Any,
+    DefaultDict,
+    Dict,
     Generic,
+    Tuple,
     Type,
     TypeVar,
 )
@@ -14,54 +17,123 @@ from eth_utils import (
 from p2p.protocol import Command
 
 from trinity.protocol.common.peer import BaseChainPeer
-from trinity._utils.datastructures import (
-    SortableTask,
-)
+from trinity.protocol.common.trackers import BasePerformanceTracker
+from trinity.sync.common.constants import MAX_REQUESTS_PER_PEER
 
 TChainPeer = TypeVar('TChainPeer', bound=BaseChainPeer)
 
+AnyTracker = BasePerformanceTracker[Any, Any]
 
-class WaitingPeers(Generic[TChainPeer]):
+
+class PeerScheduler(Generic[TChainPeer]):
     """
-    Peers waiting to perform some action. When getting a peer from this queue,
-    prefer the peer with the best throughput for the given command.
+    Hand out peers to the syncers that download headers, bodies and receipts, sharing each
+    peer's capacity between all of them.
+
+    When reserving a peer for a command, prefer the peer with the best throughput for that
+    command, divided by the number of requests of any type it is already serving for us. A peer
+    serves at most ``max_requests_per_peer`` requests at once, scaled down by how its throughput
+    compares to the best peer's, so that work moves to other peers when it slows down. It also
+    serves at most as many requests for a single command as it may have in flight, per the
+    ``max_pipelined_requests`` of its context.
+
+    Each reservation must be released once the request is done (or once any penalty for a bad
+    response is over) to make room for more.
     """
-    _waiting_peers: 'PriorityQueue[SortableTask[TChainPeer]]'
 
-    def __init__(self, response_command_type: Type[Command]) -> None:
-        self._waiting_peers = PriorityQueue()
-        self._response_command_type = response_command_type
-        self._peer_wrapper = SortableTask.orderable_by_func(self._get_peer_rank)
+    def __init__(self, max_requests_per_peer: int = MAX_REQUESTS_PER_PEER) -> None:
+        self._max_requests_per_peer = max_requests_per_peer
+        # Requests in flight to each peer, by response command type
+        self._active: Dict[TChainPeer, DefaultDict[Type[Command], int]] = {}
+        self._slot_freed = asyncio.Event()
 
-    def _get_peer_rank(self, peer: TChainPeer) -> float:
-        relevant_throughputs = [
-            exchange.tracker.items_per_second_ema.value
-            for exchange in peer.requests
-            if issubclass(exchange.response_cmd_type, self._response_command_type)
-        ]
+    def register_peer(self, peer: TChainPeer) -> None:
+        if peer not in self._active:
+            self._active[peer] = defaultdict(int)
+            self._slot_freed.set()
+
+    async def reserve(self, response_command_type: Type[Command]) -> TChainPeer:
+        """
+        Wait until a peer can take another request with the given response type, and reserve it.
+        """
+        while True:
+            self._drop_offline_peers()
+            peer = self._get_best_available(response_command_type)
+            if peer is not None:
+                self._active[peer][response_command_type] += 1
+                return peer
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
 
-        if len(relevant_throughputs) == 0:
+    def release(self, peer: TChainPeer, response_command_type: Type[Command]) -> None:
+        if peer not in self._active:
+            # the peer went offline while the request was in flight
+            return
+        active = self._active[peer]
+        if active[response_command_type] <= 0:
             raise ValidationError(
-                f"Could not find any exchanges on {peer} "
-                f"with response {self._response_command_type!r}"
+                f"Cannot release {peer} for {response_command_type!r}, it was not reserved"
             )
+        active[response_command_type] -= 1
+        self._slot_freed.set()
 
-        avg_throughput = sum(relevant_throughputs) / len(relevant_throughputs)
+    def _drop_offline_peers(self) -> None:
+        for peer in tuple(self._active):
+            if not peer.is_operational:
+                del self._active[peer]
 
-        # high throughput peers should pop out of the queue first, so ranked as negative
-        return -1 * avg_throughput
+    def _get_best_available(self, response_command_type: Type[Command]) -> TChainPeer:
+        trackers = {
+            peer: self._get_relevant_trackers(peer, response_command_type)
+            for peer in self._active
+        }
+        throughputs = {
+            peer: _get_avg_throughput(peer_trackers)
+            for peer, peer_trackers in trackers.items()
+        }
+        best_throughput = max(throughputs.values(), default=0)
 
-    def put_nowait(self, peer: TChainPeer) -> None:
-        self._waiting_peers.put_nowait(self._peer_wrapper(peer))
+        best_peer = None
+        best_rank: Tuple[float, float] = None
+        for peer, throughput in throughputs.items():
+            active = self._active[peer]
+            if active[response_command_type] >= peer.context.max_pipelined_requests:
+                continue
 
-    async def get_fastest(self) -> TChainPeer:
-        wrapped_peer = await self._waiting_peers.get()
-        peer = wrapped_peer.original
+            num_active = sum(active.values())
+            has_responded = any(tracker.total_msgs for tracker in trackers[peer])
+            if best_throughput > 0 and has_responded:
+                # Scale down the requests a peer may serve by how slow it is compared to the
+                # best peer, but let it serve at least one.
+                max_requests = round(self._max_requests_per_peer * throughput / best_throughput)
+                max_requests = max(max_requests, 1)
+            else:
+                max_requests = self._max_requests_per_peer
+            if num_active >= max_requests:
+                continue
+
+            # High throughput peers that are not busy go first, then the ones with lower latency
+            round_trip = min(tracker.round_trip_ema.value for tracker in trackers[peer])
+            rank = (throughput / (num_active + 1), -1 * round_trip)
+            if best_rank is None or rank > best_rank:
+                best_peer, best_rank = peer, rank
+
+        return best_peer
+
+    def _get_relevant_trackers(self,
+                               peer: TChainPeer,
+                               response_command_type: Type[Command]) -> Tuple[AnyTracker, ...]:
+        trackers = tuple(
+            exchange.tracker
+            for exchange in peer.requests
+            if issubclass(exchange.response_cmd_type, response_command_type)
+        )
+        if len(trackers) == 0:
+            raise ValidationError(
+                f"Could not find any exchanges on {peer} with response {response_command_type!r}"
+            )
+        return trackers
 
-        # make sure the peer has not gone offline while waiting in the queue
-        while not peer.is_operational:
-            # if so, look for the next best peer
-            wrapped_peer = await self._waiting_peers.get()
-            peer = wrapped_peer.original
 
-        return peer
+def _get_avg_throughput(trackers: Tuple[AnyTracker, ...]) -> float:
+    return sum(tracker.items_per_second_ema.value for tracker in trackers) / len(trackers)
@@ -0,0 +1,163 @@
+import asyncio
+from pathlib import Path
+import tempfile
+from typing import (
+    Dict,
+    Tuple,
+)
+
+from eth_utils.toolz import concatv
+import rlp
+
+from eth.db.backends.level import LevelDB
+from eth.rlp.headers import BlockHeader
+
+from trinity.rlp.block_body import BlockBody
+
+
+class PendingBodies:
+    """
+    Block bodies that were downloaded and are waiting for their block to be imported (or
+    persisted), keyed by header.
+
+    The size of each body is taken to be the size of its RLP encoding, which bodies we received
+    from peers already have (see :func:`_get_encoded_size`). Once ``max_memory_bytes``
+    worth of bodies are pending, any more are written to a temporary LevelDB instead, up to
+    ``max_spilled_bytes``. After that, :meth:`has_room_for` tells the syncers to stop downloading
+    until some bodies are popped.
+    """
+    def __init__(self, max_memory_bytes: int, max_spilled_bytes: int = 0) -> None:
+        self._max_memory_bytes = max_memory_bytes
+        self._max_spilled_bytes = max_spilled_bytes
+
+        # pending bodies kept in memory, and their sizes
+        self._in_memory: Dict[BlockHeader, Tuple[BlockBody, int]] = {}
+        self.memory_bytes = 0
+
+        # sizes of the pending bodies that were spilled to disk (keyed by header hash in there)
+        self._spilled: Dict[BlockHeader, int] = {}
+        self.spilled_bytes = 0
+        self._spill_dir: 'tempfile.TemporaryDirectory[str]' = None
+        self._spill_db: LevelDB = None
+
+        # the most bytes pending in memory and on disk, since the last call to pop_peak_bytes()
+        self._peak_memory_bytes = 0
+        self._peak_spilled_bytes = 0
+
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+
+    def __contains__(self, header: BlockHeader) -> bool:
+        return header in self._in_memory or header in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._in_memory) + len(self._spilled)
+
+    def add(self, header: BlockHeader, body: BlockBody) -> None:
+        if header in self:
+            return
+
+        size = _get_encoded_size(body)
+        fits_in_memory = self.memory_bytes + size <= self._max_memory_bytes
+        if fits_in_memory or self.spilled_bytes + size > self._max_spilled_bytes:
+            # Either it fits, or we ran out of room on disk too and we're over budget anyway:
+            # the syncers stop downloading more bodies until we're back under it.
+            self._in_memory[header] = (body, size)
+            self.memory_bytes += size
+            self._peak_memory_bytes = max(self._peak_memory_bytes, self.memory_bytes)
+        else:
+            self._get_spill_db()[header.hash] = rlp.encode(body)
+            self._spilled[header] = size
+            self.spilled_bytes += size
+            self._peak_spilled_bytes = max(self._peak_spilled_bytes, self.spilled_bytes)
+
+        if not self._is_below_budget():
+            self._has_room.clear()
+
+    def pop(self, header: BlockHeader) -> BlockBody:
+        """
+        Remove and return the body for the given header.
+
+        :raise KeyError: if there is no pending body for the header
+        """
+        if header in self._in_memory:
+            body, size = self._in_memory.pop(header)
+            self.memory_bytes -= size
+        else:
+            size = self._spilled.pop(header)
+            self.spilled_bytes -= size
+            encoded = self._spill_db[header.hash]
+            del self._spill_db[header.hash]
+            body = rlp.decode(encoded, sedes=BlockBody)
+
+        if self._is_below_budget():
+            self._has_room.set()
+        return body
+
+    def has_room_for(self, header: BlockHeader) -> bool:
+        """
+        Whether we should download the body for the given header now.
+
+        That's always the case if it's for a block before all the bodies we have, because those
+        can't be imported until it is.
+        """
+        if self._is_below_budget() or len(self) == 0:
+            return True
+        lowest_pending = min(
+            pending.block_number
+            for pending in concatv(self._in_memory.keys(), self._spilled.keys())
+        )
+        return header.block_number < lowest_pending
+
+    async def wait_for_room(self) -> None:
+        await self._has_room.wait()
+
+    def pop_peak_bytes(self) -> Tuple[int, int]:
+        """
+        Return the most bytes of bodies that were pending in memory and on disk since the
+        last call, and start tracking them again from the current values.
+        """
+        peaks = (self._peak_memory_bytes, self._peak_spilled_bytes)
+        self._peak_memory_bytes = self.memory_bytes
+        self._peak_spilled_bytes = self.spilled_bytes
+        return peaks
+
+    def close(self) -> None:
+        """
+        Drop all the pending bodies, removing the temporary database if bodies were spilled.
+        """
+        self._in_memory.clear()
+        self._spilled.clear()
+        self.memory_bytes = self.spilled_bytes = 0
+        if self._spill_dir is not None:
+            # LevelDB has no close() of its own, so close the underlying plyvel DB before its
+            # files are removed
+            self._spill_db.db.close()
+            self._spill_db = None
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+        self._has_room.set()
+
+    def _is_below_budget(self) -> bool:
+        total_bytes = self.memory_bytes + self.spilled_bytes
+        return total_bytes < self._max_memory_bytes + self._max_spilled_bytes
+
+    def _get_spill_db(self) -> LevelDB:
+        if self._spill_db is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="trinity-pending-bodies")
+            self._spill_db = LevelDB(Path(self._spill_dir.name))
+        return self._spill_db
+
+
+def _get_encoded_size(body: BlockBody) -> int:
+    """
+    Return the size of the given body's RLP encoding.
+
+    Bodies decoded from a ``BlockBodies`` msg keep the part of its payload they were decoded from
+    (rlp caches it in ``_cached_rlp``), so only bodies built some other way need to be encoded.
+    """
+    cached_rlp = body._cached_rlp
+    if cached_rlp:
+        return len(cached_rlp)
+    else:
+        return len(rlp.encode(body, cache=False))
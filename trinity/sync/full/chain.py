@@ -26,6 +26,7 @@ from eth_utils.toolz import (
     first,
     groupby,
     merge,
+    partition_all,
     valfilter,
 )
 
@@ -33,6 +34,7 @@ from eth.constants import (
     BLANK_ROOT_HASH,
     EMPTY_UNCLE_HASH,
 )
+from eth.rlp.blocks import BaseBlock
 from eth.rlp.headers import BlockHeader
 from eth.rlp.receipts import Receipt
 from eth.rlp.transactions import BaseTransaction
@@ -58,7 +60,13 @@ from trinity.sync.common.constants import (
     EMPTY_PEER_RESPONSE_PENALTY,
 )
 from trinity.sync.common.headers import HeaderSyncerAPI
-from trinity.sync.common.peers import WaitingPeers
+from trinity.sync.common.peers import PeerScheduler
+from trinity.sync.full.bodies import PendingBodies
+from trinity.sync.full.constants import (
+    MAX_BLOCKS_PER_PERSIST,
+    MAX_PENDING_BODIES_IN_MEMORY,
+    MAX_SPILLED_PENDING_BODIES,
+)
 from trinity._utils.datastructures import (
     MissingDependency,
     OrderedTaskPreparation,
@@ -80,12 +88,21 @@ BlockBodyBundle = Tuple[
 # How big should the pending request queue get, as a multiple of the largest request size
 REQUEST_BUFFER_MULTIPLIER = 8
 
+MEGABYTE = 1024 * 1024
+
 
 class BaseBodyChainSyncer(BaseService, PeerSubscriber):
 
     NO_PEER_RETRY_PAUSE = 5.0
     "If no peers are available for downloading the chain data, retry after this many seconds"
 
+    PENDING_BODIES_RECHECK_PAUSE = 1.0
+    "If too many bodies are waiting to be imported, check again after this many seconds"
+
+    # Bytes of downloaded bodies that may wait to be imported (or persisted) in memory, and on disk
+    max_pending_bodies_in_memory = MAX_PENDING_BODIES_IN_MEMORY
+    max_spilled_pending_bodies = 0
+
     # We are only interested in peers entering or leaving the pool
     subscription_msg_types: FrozenSet[Type[Command]] = frozenset()
 
@@ -96,21 +113,26 @@ class BaseBodyChainSyncer(BaseService, PeerSubscriber):
 
     tip_monitor_class = ETHChainTipMonitor
 
-    _pending_bodies: Dict[BlockHeader, BlockBody]
-
     def __init__(self,
                  chain: BaseAsyncChain,
                  db: BaseAsyncChainDB,
                  peer_pool: ETHPeerPool,
-                 token: CancelToken = None) -> None:
+                 token: CancelToken = None,
+                 peer_scheduler: PeerScheduler[ETHPeer] = None) -> None:
         super().__init__(token=token)
         self.chain = chain
         self.db = db
         self._peer_pool = peer_pool
-        self._pending_bodies = {}
+        self._pending_bodies = PendingBodies(
+            self.max_pending_bodies_in_memory,
+            self.max_spilled_pending_bodies,
+        )
 
-        # queue up any idle peers, in order of how fast they return block bodies
-        self._body_peers: WaitingPeers[ETHPeer] = WaitingPeers(commands.BlockBodies)
+        # pick peers to download from, sharing them with any other syncer that uses the scheduler
+        if peer_scheduler is None:
+            self._peer_scheduler: PeerScheduler[ETHPeer] = PeerScheduler()
+        else:
+            self._peer_scheduler = peer_scheduler
 
         # Track incomplete block body download tasks
         # - arbitrarily allow several requests-worth of headers queued up
@@ -122,17 +144,34 @@ class BaseBodyChainSyncer(BaseService, PeerSubscriber):
         with self.subscribe(self._peer_pool):
             await self.events.cancelled.wait()
 
+    async def _cleanup(self) -> None:
+        self._pending_bodies.close()
+
     async def _assign_body_download_to_peers(self) -> None:
         """
         Loop indefinitely, assigning idle peers to download any block bodies needed for syncing.
         """
         while self.is_operational:
-            # from all the peers that are not currently downloading block bodies, get the fastest
-            peer = await self.wait(self._body_peers.get_fastest())
-
             # get headers for bodies that we need to download, preferring lowest block number
             batch_id, headers = await self.wait(self._block_body_tasks.get(MAX_BODIES_FETCH))
 
+            if not self._pending_bodies.has_room_for(headers[0]):
+                # Too many bodies are waiting to be imported, so hand the tasks back and wait
+                # until some are. Check again every now and then, in case a download fails and
+                # the bodies that must be imported next are handed back, so we pick them up.
+                self._block_body_tasks.complete(batch_id, tuple())
+                try:
+                    await self.wait(
+                        self._pending_bodies.wait_for_room(),
+                        timeout=self.PENDING_BODIES_RECHECK_PAUSE,
+                    )
+                except TimeoutError:
+                    pass
+                continue
+
+            # get the fastest peer that has room for another block bodies request
+            peer = await self.wait(self._peer_scheduler.reserve(commands.BlockBodies))
+
             # schedule the body download and move on
             peer.run_task(self._run_body_download_batch(peer, batch_id, headers))
 
@@ -167,6 +206,8 @@ class BaseBodyChainSyncer(BaseService, PeerSubscriber):
 
         # even if trivial_headers is (), assign it so the finally block can run, in case of error
         completed_headers = trivial_headers
+        # Seconds to wait before the peer may be given another request, if it misbehaved
+        penalty = 0.0
 
         try:
             if non_trivial_headers:
@@ -180,19 +221,23 @@ class BaseBodyChainSyncer(BaseService, PeerSubscriber):
             self.logger.info("Unexpected p2p perror while downloading body from peer: %s", exc)
             self.logger.debug("Problem downloading body from peer, dropping...", exc_info=True)
         else:
-            if len(non_trivial_headers) == 0:
-                # peer had nothing to do, so have it get back in line for processing
-                self._body_peers.put_nowait(peer)
-            elif len(completed_headers) > 0:
-                # peer completed with at least 1 result, so have it get back in line for processing
-                self._body_peers.put_nowait(peer)
-            else:
+            # If the peer had nothing to do, or completed with at least 1 result, it gets back in
+            # line for processing right away.
+            if non_trivial_headers and not completed_headers:
                 # peer returned no results, wait a while before trying again
-                delay = EMPTY_PEER_RESPONSE_PENALTY
-                self.logger.debug("Pausing %s for %.1fs, for sending 0 block bodies", peer, delay)
-                loop = self.get_event_loop()
-                loop.call_later(delay, partial(self._body_peers.put_nowait, peer))
+                penalty = EMPTY_PEER_RESPONSE_PENALTY
+                self.logger.debug(
+                    "Pausing %s for %.1fs, for sending 0 block bodies", peer, penalty)
         finally:
+            # the reservation must be released whether or not the download succeeded
+            if penalty:
+                loop = self.get_event_loop()
+                loop.call_later(
+                    penalty,
+                    partial(self._peer_scheduler.release, peer, commands.BlockBodies),
+                )
+            else:
+                self._peer_scheduler.release(peer, commands.BlockBodies)
             self._mark_body_download_complete(batch_id, completed_headers)
 
     def _mark_body_download_complete(
@@ -239,11 +284,8 @@ class BaseBodyChainSyncer(BaseService, PeerSubscriber):
         completed_headers = tuple(completed_header_roots.keys())
 
         # store bodies for later usage, during block import
-        pending_bodies = {
-            header: bodies_by_root[root]
-            for header, root in completed_header_roots.items()
-        }
-        self._pending_bodies = merge(self._pending_bodies, pending_bodies)
+        for header, root in completed_header_roots.items():
+            self._pending_bodies.add(header, bodies_by_root[root])
 
         self.logger.debug(
             "Got block bodies for %d/%d headers from %s, from %r..%r",
@@ -295,13 +337,22 @@ class FastChainSyncer(BaseService):
                  peer_pool: ETHPeerPool,
                  token: CancelToken = None) -> None:
         super().__init__(token=token)
-        self._header_syncer = ETHHeaderChainSyncer(chain, db, peer_pool, self.cancel_token)
+        # headers, bodies and receipts are all downloaded from the same peers
+        peer_scheduler: PeerScheduler[ETHPeer] = PeerScheduler()
+        self._header_syncer = ETHHeaderChainSyncer(
+            chain,
+            db,
+            peer_pool,
+            self.cancel_token,
+            peer_scheduler,
+        )
         self._body_syncer = FastChainBodySyncer(
             chain,
             db,
             peer_pool,
             self._header_syncer,
             self.cancel_token,
+            peer_scheduler,
         )
 
     @property
@@ -398,11 +449,9 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                  db: BaseAsyncChainDB,
                  peer_pool: ETHPeerPool,
                  header_syncer: HeaderSyncerAPI,
-                 token: CancelToken = None) -> None:
-        super().__init__(chain, db, peer_pool, token)
-
-        # queue up any idle peers, in order of how fast they return receipts
-        self._receipt_peers: WaitingPeers[ETHPeer] = WaitingPeers(commands.Receipts)
+                 token: CancelToken = None,
+                 peer_scheduler: PeerScheduler[ETHPeer] = None) -> None:
+        super().__init__(chain, db, peer_pool, token, peer_scheduler)
 
         self._header_syncer = header_syncer
 
@@ -435,11 +484,9 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         await super()._run()
 
     def register_peer(self, peer: BasePeer) -> None:
-        # when a new peer is added to the pool, add it to the idle peer lists
+        # when a new peer is added to the pool, make it available for downloads
         super().register_peer(peer)
-        peer = cast(ETHPeer, peer)
-        self._body_peers.put_nowait(peer)
-        self._receipt_peers.put_nowait(peer)
+        self._peer_scheduler.register_peer(cast(ETHPeer, peer))
 
     async def _launch_prerequisite_tasks(self) -> None:
         """
@@ -501,6 +548,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
             )
 
             stats = self.tracker.report()
+            peak_memory_bytes, _ = self._pending_bodies.pop_peak_bytes()
             utcnow = int(datetime.datetime.utcnow().timestamp())
             head_age = utcnow - stats.latest_head.timestamp
             self.logger.info(
@@ -511,7 +559,8 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                     "tps=%-4d  "
                     "elapsed=%0.1f  "
                     "head=#%d %s  "
-                    "age=%s"
+                    "age=%s  "
+                    "bodies=%0.1fMB"
                 ),
                 stats.num_blocks,
                 stats.num_transactions,
@@ -521,6 +570,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                 stats.latest_head.block_number,
                 humanize_hash(stats.latest_head.hash),
                 humanize_elapsed(head_age),
+                peak_memory_bytes / MEGABYTE,
             )
 
     async def _persist_ready_blocks(self) -> None:
@@ -553,42 +603,51 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         """
         Persist blocks for the given headers, directly to the database
 
+        Blocks are persisted in batches of up to ``MAX_BLOCKS_PER_PERSIST``, each written
+        atomically with a single call to the database.
+
         :param headers: headers for which block bodies and receipts have been downloaded
         """
-        for header in headers:
-            vm_class = self.chain.get_vm_class(header)
-            block_class = vm_class.get_block_class()
+        for batch in partition_all(MAX_BLOCKS_PER_PERSIST, headers):
+            blocks = tuple(self._build_block(header) for header in batch)
+            await self.wait(self.db.coro_persist_blocks(blocks))
+            self.tracker.set_latest_head(batch[-1])
 
-            if _is_body_empty(header):
-                transactions: List[BaseTransaction] = []
-                uncles: List[BlockHeader] = []
-            else:
-                body = self._pending_bodies.pop(header)
-                uncles = body.uncles
+    def _build_block(self, header: BlockHeader) -> BaseBlock:
+        """
+        Build the block for the given header, taking its body from the pending bodies.
+        """
+        vm_class = self.chain.get_vm_class(header)
+        block_class = vm_class.get_block_class()
 
-                # transaction data was already persisted in _block_body_bundle_processing, but
-                # we need to include the transactions for them to be added to the hash->txn lookup
-                tx_class = block_class.get_transaction_class()
-                transactions = [tx_class.from_base_transaction(tx) for tx in body.transactions]
+        if _is_body_empty(header):
+            transactions: List[BaseTransaction] = []
+            uncles: List[BlockHeader] = []
+        else:
+            body = self._pending_bodies.pop(header)
+            uncles = body.uncles
 
-                # record progress in the tracker
-                self.tracker.record_transactions(len(transactions))
+            # transaction data was already persisted in _block_body_bundle_processing, but
+            # we need to include the transactions for them to be added to the hash->txn lookup
+            tx_class = block_class.get_transaction_class()
+            transactions = [tx_class.from_base_transaction(tx) for tx in body.transactions]
 
-            block = block_class(header, transactions, uncles)
-            await self.wait(self.db.coro_persist_block(block))
-            self.tracker.set_latest_head(header)
+            # record progress in the tracker
+            self.tracker.record_transactions(len(transactions))
+
+        return block_class(header, transactions, uncles)
 
     async def _assign_receipt_download_to_peers(self) -> None:
         """
         Loop indefinitely, assigning idle peers to download receipts needed for syncing.
         """
         while self.is_operational:
-            # from all the peers that are not currently downloading receipts, get the fastest
-            peer = await self.wait(self._receipt_peers.get_fastest())
-
             # get headers for receipts that we need to download, preferring lowest block number
             batch_id, headers = await self.wait(self._receipt_tasks.get(MAX_RECEIPTS_FETCH))
 
+            # get the fastest peer that has room for another receipts request
+            peer = await self.wait(self._peer_scheduler.reserve(commands.Receipts))
+
             # schedule the receipt download and move on
             peer.run_task(self._run_receipt_download_batch(peer, batch_id, headers))
 
@@ -614,6 +673,8 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         # If there is an exception during _process_receipts, prepare to mark the task as finished
         # with no headers collected:
         completed_headers: Tuple[BlockHeader, ...] = tuple()
+        # Seconds to wait before the peer may be given another request, if it misbehaved
+        penalty = 0.0
         try:
             completed_headers = await peer.wait(self._process_receipts(peer, headers))
 
@@ -625,16 +686,17 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
             self.logger.info("Unexpected p2p perror while downloading receipt from peer: %s", exc)
             self.logger.debug("Problem downloading receipt from peer, dropping...", exc_info=True)
         else:
-            # peer completed successfully, so have it get back in line for processing
-            if len(completed_headers) > 0:
-                # peer completed successfully, so have it get back in line for processing
-                self._receipt_peers.put_nowait(peer)
-            else:
+            # if the peer completed successfully, it gets back in line for processing right away
+            if len(completed_headers) == 0:
                 # peer returned no results, wait a while before trying again
-                delay = EMPTY_PEER_RESPONSE_PENALTY
-                self.logger.debug("Pausing %s for %.1fs, for sending 0 receipts", peer, delay)
-                self.call_later(delay, self._receipt_peers.put_nowait, peer)
+                penalty = EMPTY_PEER_RESPONSE_PENALTY
+                self.logger.debug("Pausing %s for %.1fs, for sending 0 receipts", peer, penalty)
         finally:
+            # the reservation must be released whether or not the download succeeded
+            if penalty:
+                self.call_later(penalty, self._peer_scheduler.release, peer, commands.Receipts)
+            else:
+                self._peer_scheduler.release(peer, commands.Receipts)
             self._receipt_tasks.complete(batch_id, completed_headers)
 
     async def _block_body_bundle_processing(self, bundles: Tuple[BlockBodyBundle, ...]) -> None:
@@ -642,8 +704,9 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         Fast sync writes all the block body bundle data directly to the database,
         in order to make it... fast.
         """
-        for (_, (_, trie_data_dict), _) in bundles:
-            await self.wait(self.db.coro_persist_trie_data_dict(trie_data_dict))
+        trie_data_dicts = tuple(trie_data_dict for (_, (_, trie_data_dict), _) in bundles)
+        if trie_data_dicts:
+            await self.wait(self.db.coro_persist_trie_data_dict(merge(*trie_data_dicts)))
 
     async def _process_receipts(
             self,
@@ -696,8 +759,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         # dicts in the database
         receipts, trie_roots_and_data_dicts = zip(*receipt_bundles)
         receipt_roots, trie_data_dicts = zip(*trie_roots_and_data_dicts)
-        for trie_data in trie_data_dicts:
-            await self.wait(self.db.coro_persist_trie_data_dict(trie_data))
+        await self.wait(self.db.coro_persist_trie_data_dict(merge(*trie_data_dicts)))
 
         # Identify which headers have the receipt roots that are now complete.
         completed_header_groups = tuple(
@@ -781,13 +843,22 @@ class RegularChainSyncer(BaseService):
                  peer_pool: ETHPeerPool,
                  token: CancelToken = None) -> None:
         super().__init__(token=token)
-        self._header_syncer = ETHHeaderChainSyncer(chain, db, peer_pool, self.cancel_token)
+        # headers and bodies are both downloaded from the same peers
+        peer_scheduler: PeerScheduler[ETHPeer] = PeerScheduler()
+        self._header_syncer = ETHHeaderChainSyncer(
+            chain,
+            db,
+            peer_pool,
+            self.cancel_token,
+            peer_scheduler,
+        )
         self._body_syncer = RegularChainBodySyncer(
             chain,
             db,
             peer_pool,
             self._header_syncer,
             self.cancel_token,
+            peer_scheduler,
         )
 
     async def _run(self) -> None:
@@ -807,13 +878,18 @@ class RegularChainBodySyncer(BaseBodyChainSyncer):
 
     Here, the run() method will execute the sync loop forever, until our CancelToken is triggered.
     """
+    # Importing blocks is usually slower than downloading them, so spill bodies to disk rather
+    # than waiting for them to be imported to download more.
+    max_spilled_pending_bodies = MAX_SPILLED_PENDING_BODIES
+
     def __init__(self,
                  chain: BaseAsyncChain,
                  db: BaseAsyncChainDB,
                  peer_pool: ETHPeerPool,
                  header_syncer: HeaderSyncerAPI,
-                 token: CancelToken = None) -> None:
-        super().__init__(chain, db, peer_pool, token)
+                 token: CancelToken = None,
+                 peer_scheduler: PeerScheduler[ETHPeer] = None) -> None:
+        super().__init__(chain, db, peer_pool, token, peer_scheduler)
 
         self._header_syncer = header_syncer
 
@@ -834,9 +910,9 @@ class RegularChainBodySyncer(BaseBodyChainSyncer):
         await super()._run()
 
     def register_peer(self, peer: BasePeer) -> None:
-        # when a new peer is added to the pool, add it to the idle peer list
+        # when a new peer is added to the pool, make it available for downloads
         super().register_peer(peer)
-        self._body_peers.put_nowait(cast(ETHPeer, peer))
+        self._peer_scheduler.register_peer(cast(ETHPeer, peer))
 
     async def _launch_prerequisite_tasks(self) -> None:
         """
@@ -880,6 +956,13 @@ class RegularChainBodySyncer(BaseBodyChainSyncer):
                 timer.elapsed,
                 head,
             )
+            peak_memory_bytes, peak_spilled_bytes = self._pending_bodies.pop_peak_bytes()
+            self.logger.debug(
+                "Bodies waiting for import: %d, peaked at %0.1fMB in memory and %0.1fMB on disk",
+                len(self._pending_bodies),
+                peak_memory_bytes / MEGABYTE,
+                peak_spilled_bytes / MEGABYTE,
+            )
 
     async def _import_blocks(self, headers: Tuple[BlockHeader, ...]) -> None:
         """
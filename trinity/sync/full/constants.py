@@ -1,3 +1,15 @@
 # How old (in seconds) must our local head be to cause us to start with a
 # fast-sync before we switch to regular-sync.
 FAST_SYNC_CUTOFF = 60 * 60 * 24
+
+# How many bytes (of RLP) of downloaded block bodies may be kept in memory while they wait to be
+# imported or persisted. Body syncers stop downloading more until they're under this limit.
+MAX_PENDING_BODIES_IN_MEMORY = 64 * 1024 * 1024
+
+# How many more bytes of block bodies waiting to be imported may be spilled to disk during regular
+# sync, where importing blocks is usually slower than downloading them.
+MAX_SPILLED_PENDING_BODIES = 1024 * 1024 * 1024
+
+# Fast sync persists the blocks it downloaded in batches of up to this many, each in a single
+# atomic write to the database.
+MAX_BLOCKS_PER_PERSIST = 256
@@ -1,9 +1,13 @@
-import bisect
+import asyncio
+from concurrent.futures import Executor
+import struct
 from typing import (
     Awaitable,
     Callable,
     Dict,
     List,
+    Sequence,
+    Set,
     Tuple,
 )
 
@@ -31,10 +35,30 @@ from trie.utils.nodes import (
 )
 
 from trinity.db.base import BaseAsyncDB
-from trinity.exceptions import SyncRequestAlreadyProcessed
+from trinity.exceptions import InvalidSyncCheckpoint
+
+
+# A checkpoint starts with a header containing the format version, the root hash of the trie being
+# synced and the number of pending requests. For every pending request it then contains the
+# request's fixed-size fields followed by the keys of its parents and its data (if it has any).
+CHECKPOINT_VERSION = 2
+_CHECKPOINT_HEADER = struct.Struct('>B32sI')
+_CHECKPOINT_REQUEST = struct.Struct('>32sIBIII')
+_CHECKPOINT_IS_RAW = 1
+_CHECKPOINT_HAS_LEAF_CALLBACK = 2
+_CHECKPOINT_HAS_DATA = 4
 
 
 class SyncRequest:
+    __slots__ = (
+        'node_key',
+        'parents',
+        'depth',
+        'leaf_callback',
+        'is_raw',
+        'dependencies',
+        'data',
+    )
 
     def __init__(
             self, node_key: Hash32, parent: 'SyncRequest', depth: int,
@@ -60,9 +84,6 @@ class SyncRequest:
         self.dependencies = 0
         self.data: bytes = None
 
-    def __lt__(self, other: 'SyncRequest') -> bool:
-        return self.depth < other.depth
-
     def __repr__(self) -> str:
         return "SyncRequest(%s, depth=%d)" % (encode_hex(self.node_key), self.depth)
 
@@ -111,15 +132,73 @@ def _get_children(node: Hash32, depth: int
     return references, leaves  # type: ignore
 
 
+class SyncRequestQueue:
+    """A queue of SyncRequests, which hands out the deepest requests first.
+
+    Requests are kept in one bucket per depth, so adding and removing them is O(1) (there are
+    only ever a couple hundred distinct depths). Within a bucket the most recently added requests
+    are handed out first.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[int, List[SyncRequest]] = {}
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def push(self, request: SyncRequest) -> None:
+        bucket = self._buckets.get(request.depth)
+        if bucket is None:
+            bucket = self._buckets[request.depth] = []
+        bucket.append(request)
+        self._length += 1
+
+    def pop_batch(self, n: int) -> List[SyncRequest]:
+        batch: List[SyncRequest] = []
+        while len(batch) < n and self._buckets:
+            depth = max(self._buckets)
+            bucket = self._buckets[depth]
+            count = min(n - len(batch), len(bucket))
+            batch.extend(reversed(bucket[-count:]))
+            del bucket[-count:]
+            if not bucket:
+                del self._buckets[depth]
+        self._length -= len(batch)
+        return batch
+
+
+_PendingSchedule = Tuple[
+    Hash32, SyncRequest, int, Callable[[bytes, SyncRequest], Awaitable[None]], bool]
+
+DecodedChildren = Dict[Hash32, Tuple[List[Tuple[int, Hash32]], List[bytes]]]
+
+
+def decode_trie_nodes(nodes: Sequence[Tuple[Hash32, bytes]]) -> DecodedChildren:
+    """Decode the given trie nodes and return the children of each, keyed by node key.
+
+    The depths of the returned references are relative to their node's depth. This is meant to
+    be run in a process pool, as it's pure CPU work.
+    """
+    return {
+        node_key: _get_children(decode_node(data), 0)
+        for node_key, data in nodes
+    }
+
+
 class HexaryTrieSync:
+    # Batches smaller than this are decoded in the event loop as it's not worth the overhead of
+    # sending them to the executor.
+    _min_executor_batch_size = 16
 
     def __init__(self,
                  root_hash: Hash32,
                  db: BaseAsyncDB,
                  nodes_cache: BaseDB,
-                 logger: ExtendedDebugLogger) -> None:
+                 logger: ExtendedDebugLogger,
+                 executor: Executor = None) -> None:
         # Nodes that haven't been requested yet.
-        self.queue: List[SyncRequest] = []
+        self.queue = SyncRequestQueue()
         # Nodes that have been requested to a peer, but not yet committed to the DB, either
         # because we haven't processed a reply containing them or because some of their children
         # haven't been retrieved/committed yet.
@@ -131,7 +210,23 @@ class HexaryTrieSync:
         # unnecessarily as that's the main bottleneck when dealing with a large DB like for
         # ethereum's mainnet/ropsten.
         self.nodes_cache = nodes_cache
+        # An optional executor (usually a process pool) used to decode received trie nodes.
+        self.executor = executor
         self.committed_nodes = 0
+        # Requests that have been committed but not yet written to the DB; these are written in a
+        # single batch at the end of every process() call.
+        self._pending_commits: List[SyncRequest] = []
+        # Children scheduled while processing a batch of nodes; these are checked against our DB
+        # in bulk before being actually scheduled.
+        self._pending_schedules: List[_PendingSchedule] = []
+        # Number of DB round trips made (existence checks and writes) and number of batches
+        # processed, so that we can report round trips per batch.
+        self.db_round_trips = 0
+        self.processed_batches = 0
+        # Used to ensure replies are processed one at a time, as we can only schedule the children
+        # of a batch of nodes after checking all of them against the DB, and to make sure
+        # checkpoints are never taken while a reply is being processed.
+        self._process_lock = asyncio.Lock()
         if root_hash in self.db:
             self.logger.info("Root node (%s) already exists in DB, nothing to do", root_hash)
         else:
@@ -150,24 +245,41 @@ class HexaryTrieSync:
 
     def next_batch(self, n: int = 1) -> List[SyncRequest]:
         """Return the next requests that should be dispatched."""
-        if len(self.queue) == 0:
-            return []
-        batch = list(reversed((self.queue[-n:])))
-        self.queue = self.queue[:-n]
-        return batch
+        return self.queue.pop_batch(n)
 
     async def schedule(self, node_key: Hash32, parent: SyncRequest, depth: int,
                        leaf_callback: Callable[[bytes, 'SyncRequest'], Awaitable[None]],
                        is_raw: bool = False) -> None:
-        """Schedule a request for the node with the given key."""
-        if node_key in self.nodes_cache:
-            self.logger.debug2("Node %s already exists in db", encode_hex(node_key))
-            return
-        if await self.db.coro_exists(node_key):
-            self.nodes_cache[node_key] = b''
-            self.logger.debug2("Node %s already exists in db", encode_hex(node_key))
+        """Schedule a request for the node with the given key.
+
+        Nodes already present in our DB are skipped, but the check for that is deferred until the
+        end of the current process() call, so that all children of a batch of nodes can be checked
+        with a single DB round trip.
+        """
+        self._pending_schedules.append((node_key, parent, depth, leaf_callback, is_raw))
+
+    async def _flush_pending_schedules(self) -> None:
+        if not self._pending_schedules:
             return
-        self._schedule(node_key, parent, depth, leaf_callback, is_raw)
+        pending, self._pending_schedules = self._pending_schedules, []
+
+        uncached_keys = tuple(set(
+            node_key for node_key, *_ in pending if node_key not in self.nodes_cache
+        ))
+
+        existing_keys: Set[Hash32] = set()
+        if uncached_keys:
+            self.db_round_trips += 1
+            exists = await self.db.coro_multi_exists(uncached_keys)
+            existing_keys = set(key for key, key_exists in zip(uncached_keys, exists) if key_exists)
+            for node_key in existing_keys:
+                self.nodes_cache[node_key] = b''
+
+        for node_key, parent, depth, leaf_callback, is_raw in pending:
+            if node_key in existing_keys or node_key in self.nodes_cache:
+                self.logger.debug2("Node %s already exists in db", encode_hex(node_key))
+                continue
+            self._schedule(node_key, parent, depth, leaf_callback, is_raw)
 
     def _schedule(self, node_key: Hash32, parent: SyncRequest, depth: int,
                   leaf_callback: Callable[[bytes, 'SyncRequest'], Awaitable[None]],
@@ -188,13 +300,46 @@ class HexaryTrieSync:
         # request for a given node multiple times.
         self.logger.debug2("Scheduling retrieval of %s", encode_hex(request.node_key))
         self.requests[request.node_key] = request
-        bisect.insort(self.queue, request)
+        self.queue.push(request)
 
     async def process(self, results: List[Tuple[Hash32, bytes]]) -> None:
         """Process request results.
 
         :param results: A list of two-tuples containing the node's key and data.
         """
+        # Decoding doesn't touch our state, so it is done before acquiring the lock to allow
+        # replies to be decoded in parallel in our executor.
+        to_decode = tuple(
+            (node_key, data) for node_key, data in results
+            if node_key in self.requests and not self.requests[node_key].is_raw
+        )
+        children = await self._decode_nodes(to_decode)
+
+        async with self._process_lock:
+            self.processed_batches += 1
+            processed: List[SyncRequest] = []
+            try:
+                await self._process(results, children, processed)
+            except BaseException:
+                self._rollback(processed)
+                raise
+            finally:
+                self._pending_schedules = []
+                await self._flush_pending_writes()
+
+    def _rollback(self, processed: List[SyncRequest]) -> None:
+        # If we're interrupted (e.g. cancelled) while processing a reply, some of its nodes may
+        # not have had all their children scheduled, so we reschedule them. This keeps our
+        # pending requests consistent, which is necessary for checkpoints to be usable.
+        for request in processed:
+            if self.requests.get(request.node_key) is request:
+                request.data = None
+                self.queue.push(request)
+
+    async def _process(self,
+                       results: List[Tuple[Hash32, bytes]],
+                       children: DecodedChildren,
+                       processed: List[SyncRequest]) -> None:
         for node_key, data in results:
             request = self.requests.get(node_key)
             if request is None:
@@ -203,40 +348,196 @@ class HexaryTrieSync:
                 self.logger.debug2(
                     "No SyncRequest found for %s, maybe we got more than one response for it",
                     encode_hex(node_key))
-                return
+                continue
 
             if request.data is not None:
-                raise SyncRequestAlreadyProcessed("%s has been processed already" % request)
+                # Same as above, but both responses arrived before the node could be committed.
+                self.logger.debug2("%s has been processed already", request)
+                continue
 
             request.data = data
+            processed.append(request)
             if request.is_raw:
-                await self.commit(request)
                 continue
 
-            node = decode_node(request.data)
-            references, leaves = _get_children(node, request.depth)
+            if node_key not in children:
+                # The request was scheduled while we were waiting for the lock.
+                children.update(decode_trie_nodes(((node_key, data),)))
+            references, leaves = children[node_key]
 
-            for depth, ref in references:
-                await self.schedule(ref, request, depth, request.leaf_callback)
+            for relative_depth, ref in references:
+                await self.schedule(
+                    ref, request, request.depth + relative_depth, request.leaf_callback)
 
             if request.leaf_callback is not None:
                 for leaf in leaves:
                     await request.leaf_callback(leaf, request)
 
-            if request.dependencies == 0:
+        # Only now that the children of every node in the batch have been scheduled (or found in
+        # our DB) do we know which nodes have no pending dependencies and can be committed.
+        await self._flush_pending_schedules()
+
+        for request in processed:
+            # The request may have been committed already, together with one of its children.
+            if request.dependencies == 0 and self.requests.get(request.node_key) is request:
                 await self.commit(request)
 
+    async def _decode_nodes(self, nodes: Sequence[Tuple[Hash32, bytes]]) -> DecodedChildren:
+        # Decoding is pure CPU work, so for anything but tiny batches we do it in our executor
+        # (if we have one) instead of blocking the event loop.
+        if self.executor is None or len(nodes) < self._min_executor_batch_size:
+            return decode_trie_nodes(nodes)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, decode_trie_nodes, nodes)
+
+    async def get_checkpoint(self) -> bytes:
+        """Return a checkpoint of all requests that have not yet been committed.
+
+        The checkpoint can be passed to resume() to continue the sync (e.g. after a restart)
+        without having to walk the trie from the root again.
+        """
+        async with self._process_lock:
+            # Encoding can take a while with millions of pending requests, so we do it in a thread
+            # rather than blocking the event loop. Holding the lock ensures the requests aren't
+            # changed meanwhile.
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self._encode_checkpoint)
+
+    def _encode_checkpoint(self) -> bytes:
+        encoded = [
+            _CHECKPOINT_HEADER.pack(CHECKPOINT_VERSION, self.root_hash, len(self.requests))]
+        for request in self.requests.values():
+            flags = 0
+            if request.is_raw:
+                flags |= _CHECKPOINT_IS_RAW
+            if request.leaf_callback is not None:
+                flags |= _CHECKPOINT_HAS_LEAF_CALLBACK
+            data = b''
+            if request.data is not None:
+                flags |= _CHECKPOINT_HAS_DATA
+                data = request.data
+            encoded.append(_CHECKPOINT_REQUEST.pack(
+                request.node_key,
+                request.depth,
+                flags,
+                request.dependencies,
+                len(request.parents),
+                len(data),
+            ))
+            encoded.extend(parent.node_key for parent in request.parents)
+            encoded.append(data)
+        return b''.join(encoded)
+
+    def resume(self, checkpoint: bytes) -> None:
+        """Replace all pending requests with the ones in the given checkpoint.
+
+        Requests from the checkpoint which hadn't been processed yet are scheduled again, and
+        processed ones will be committed once all their children are.
+        """
+        try:
+            requests, parent_keys = self._decode_checkpoint(checkpoint)
+        except struct.error as err:
+            raise InvalidSyncCheckpoint(f"Truncated checkpoint: {err}") from err
+
+        queue = SyncRequestQueue()
+        for request in requests.values():
+            try:
+                request.parents = [requests[key] for key in parent_keys[request.node_key]]
+            except KeyError as err:
+                raise InvalidSyncCheckpoint(
+                    f"Parent of {request} missing from checkpoint") from err
+            if request.data is None:
+                queue.push(request)
+
+        self.requests = requests
+        self.queue = queue
+        self.logger.info(
+            "Resumed sync of %s from checkpoint with %d pending requests",
+            encode_hex(self.root_hash),
+            len(requests),
+        )
+
+    def _decode_checkpoint(
+            self,
+            checkpoint: bytes) -> Tuple[Dict[Hash32, SyncRequest], Dict[Hash32, List[Hash32]]]:
+        version, root_hash, num_requests = _CHECKPOINT_HEADER.unpack_from(checkpoint)
+        if version != CHECKPOINT_VERSION:
+            raise InvalidSyncCheckpoint(f"Unsupported checkpoint version: {version}")
+        if root_hash != self.root_hash:
+            raise InvalidSyncCheckpoint(
+                f"Checkpoint is for root {encode_hex(root_hash)}, expected "
+                f"{encode_hex(self.root_hash)}"
+            )
+
+        requests: Dict[Hash32, SyncRequest] = {}
+        parent_keys: Dict[Hash32, List[Hash32]] = {}
+        offset = _CHECKPOINT_HEADER.size
+        for _ in range(num_requests):
+            node_key, depth, flags, dependencies, num_parents, data_length = (
+                _CHECKPOINT_REQUEST.unpack_from(checkpoint, offset))
+            offset += _CHECKPOINT_REQUEST.size
+
+            parents_end = offset + num_parents * 32
+            parent_keys[node_key] = [
+                Hash32(checkpoint[start:start + 32]) for start in range(offset, parents_end, 32)]
+            offset = parents_end
+
+            leaf_callback = None
+            if flags & _CHECKPOINT_HAS_LEAF_CALLBACK:
+                leaf_callback = self.leaf_callback
+            request = SyncRequest(
+                node_key, None, depth, leaf_callback, bool(flags & _CHECKPOINT_IS_RAW))
+            request.dependencies = dependencies
+            if flags & _CHECKPOINT_HAS_DATA:
+                request.data = checkpoint[offset:offset + data_length]
+            offset += data_length
+            requests[node_key] = request
+
+        if offset != len(checkpoint):
+            raise InvalidSyncCheckpoint(
+                f"Checkpoint has {len(checkpoint)} bytes, expected {offset}")
+        return requests, parent_keys
+
     async def commit(self, request: SyncRequest) -> None:
         """Commit the given request's data to the database.
 
         The request's data attribute must be set (done by the process() method) before this can be
-        called.
+        called. The actual DB write is deferred until the end of the current process() call, so
+        that all nodes committed while processing a reply are written with a single round trip.
+        Should that write fail, the requests are scheduled again.
         """
-        self.committed_nodes += 1
-        await self.db.coro_set(request.node_key, request.data)
-        self.nodes_cache[request.node_key] = b''
+        self._pending_commits.append(request)
         self.requests.pop(request.node_key)
         for ancestor in request.parents:
             ancestor.dependencies -= 1
-            if ancestor.dependencies == 0:
+            # An ancestor may have no data if its processing was rolled back, in which case it
+            # will be committed once we get its data again.
+            if ancestor.dependencies == 0 and ancestor.data is not None:
                 await self.commit(ancestor)
+
+    async def _flush_pending_writes(self) -> None:
+        if not self._pending_commits:
+            return
+        committed, self._pending_commits = self._pending_commits, []
+        self.db_round_trips += 1
+        try:
+            await self.db.coro_multi_set(
+                [(request.node_key, request.data) for request in committed])
+        except BaseException:
+            self._uncommit(committed)
+            raise
+
+        self.committed_nodes += len(committed)
+        for request in committed:
+            self.nodes_cache[request.node_key] = b''
+
+    def _uncommit(self, committed: List[SyncRequest]) -> None:
+        # The nodes never made it to the DB, so we undo their commits and fetch them again, which
+        # will cause them (and their ancestors) to be committed once more.
+        for request in reversed(committed):
+            for ancestor in request.parents:
+                ancestor.dependencies += 1
+            request.data = None
+            self.requests[request.node_key] = request
+            self.queue.push(request)
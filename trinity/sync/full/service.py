@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 import time
 
 from cancel_token import CancelToken
@@ -24,12 +25,20 @@ async def ensure_state_then_sync_full(logger: logging.Logger,
                                       chaindb: BaseAsyncChainDB,
                                       chain: BaseAsyncChain,
                                       peer_pool: ETHPeerPool,
-                                      cancel_token: CancelToken) -> None:
+                                      cancel_token: CancelToken,
+                                      state_sync_checkpoint_path: Path = None) -> None:
     # Ensure we have the state for our current head.
     if head.state_root != BLANK_ROOT_HASH and head.state_root not in base_db:
         logger.info(
             "Missing state for current head %s, downloading it", head)
-        downloader = StateDownloader(chaindb, base_db, head.state_root, peer_pool, cancel_token)
+        downloader = StateDownloader(
+            chaindb,
+            base_db,
+            head.state_root,
+            peer_pool,
+            cancel_token,
+            checkpoint_path=state_sync_checkpoint_path,
+        )
         await downloader.run()
         # remove the reference so the memory can be reclaimed
         del downloader
@@ -51,12 +60,14 @@ class FullChainSyncer(BaseService):
                  chaindb: BaseAsyncChainDB,
                  base_db: BaseAsyncDB,
                  peer_pool: ETHPeerPool,
-                 token: CancelToken = None) -> None:
+                 token: CancelToken = None,
+                 state_sync_checkpoint_path: Path = None) -> None:
         super().__init__(token)
         self.chain = chain
         self.chaindb = chaindb
         self.base_db = base_db
         self.peer_pool = peer_pool
+        self.state_sync_checkpoint_path = state_sync_checkpoint_path
 
     async def _run(self) -> None:
         head = await self.wait(self.chaindb.coro_get_canonical_head())
@@ -71,7 +82,8 @@ class FullChainSyncer(BaseService):
             self.chaindb,
             self.chain,
             self.peer_pool,
-            self.cancel_token
+            self.cancel_token,
+            self.state_sync_checkpoint_path,
         )
 
 
@@ -82,12 +94,14 @@ class FastThenFullChainSyncer(BaseService):
                  chaindb: BaseAsyncChainDB,
                  base_db: BaseAsyncDB,
                  peer_pool: ETHPeerPool,
-                 token: CancelToken = None) -> None:
+                 token: CancelToken = None,
+                 state_sync_checkpoint_path: Path = None) -> None:
         super().__init__(token)
         self.chain = chain
         self.chaindb = chaindb
         self.base_db = base_db
         self.peer_pool = peer_pool
+        self.state_sync_checkpoint_path = state_sync_checkpoint_path
 
     async def _run(self) -> None:
         head = await self.wait(self.chaindb.coro_get_canonical_head())
@@ -129,7 +143,8 @@ class FastThenFullChainSyncer(BaseService):
             self.chaindb,
             self.chain,
             self.peer_pool,
-            self.cancel_token
+            self.cancel_token,
+            self.state_sync_checkpoint_path,
         )
 
 
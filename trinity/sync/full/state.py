@@ -1,7 +1,7 @@
 import asyncio
-import collections
 import itertools
 import logging
+import os
 from pathlib import Path
 import tempfile
 import time
@@ -10,6 +10,7 @@ from typing import (
     Dict,
     Iterable,
     List,
+    Sequence,
     Set,
     FrozenSet,
     Tuple,
@@ -38,6 +39,7 @@ from eth.db.backends.level import LevelDB
 from eth.rlp.accounts import Account
 from eth.tools.logging import ExtendedDebugLogger
 
+from p2p._utils import ensure_global_asyncio_executor
 from p2p.service import BaseService
 from p2p.protocol import (
     Command,
@@ -53,7 +55,7 @@ from trinity.db.base import BaseAsyncDB
 from trinity.db.eth1.chain import BaseAsyncChainDB
 from trinity.exceptions import (
     AlreadyWaiting,
-    SyncRequestAlreadyProcessed,
+    InvalidSyncCheckpoint,
 )
 from trinity.protocol.eth.peer import ETHPeer, ETHPeerPool
 from trinity.protocol.eth import (
@@ -63,6 +65,8 @@ from trinity.sync.full.hexary_trie import (
     HexaryTrieSync,
     SyncRequest,
 )
+from trinity._utils.bloom import RotatingBloomFilter
+from trinity._utils.ema import EMA
 from trinity._utils.os import get_open_fd_limit
 from trinity._utils.timer import Timer
 
@@ -73,13 +77,17 @@ class StateDownloader(BaseService, PeerSubscriber):
     _reply_timeout = 20  # seconds
     _timer = Timer(auto_start=False)
     _total_timeouts = 0
+    _checkpoint_interval = 60  # Number of seconds between scheduler checkpoints.
+    # Minimum number of missing trie nodes we remember for every peer.
+    _missing_nodes_filter_size = 50000
 
     def __init__(self,
                  chaindb: BaseAsyncChainDB,
                  account_db: BaseAsyncDB,
                  root_hash: Hash32,
                  peer_pool: ETHPeerPool,
-                 token: CancelToken = None) -> None:
+                 token: CancelToken = None,
+                 checkpoint_path: Path = None) -> None:
         super().__init__(token)
         self.chaindb = chaindb
         self.peer_pool = peer_pool
@@ -96,10 +104,32 @@ class StateDownloader(BaseService, PeerSubscriber):
             root_hash,
             account_db,
             LevelDB(Path(self._nodes_cache_dir.name), max_open_files),
-            self.logger
+            self.logger,
+            # We just retrieve the global executor that was created when the Node launches. The
+            # node manages the lifecycle of the executor.
+            executor=ensure_global_asyncio_executor(),
         )
         self.request_tracker = TrieNodeRequestTracker(self._reply_timeout, self.logger)
-        self._peer_missing_nodes: Dict[ETHPeer, Set[Hash32]] = collections.defaultdict(set)
+        # Trie nodes our peers didn't return when we asked for them. We use bounded filters here
+        # (instead of sets) as on long syncs these would otherwise grow to hundreds of MB.
+        self._peer_missing_nodes: Dict[ETHPeer, RotatingBloomFilter] = {}
+        # If given, the scheduler's pending requests are periodically saved here so that the sync
+        # can be resumed after a restart without walking the trie from the root again.
+        self.checkpoint_path = checkpoint_path
+        if checkpoint_path is not None:
+            self._resume_from_checkpoint(checkpoint_path)
+
+    def _resume_from_checkpoint(self, checkpoint_path: Path) -> None:
+        if not checkpoint_path.exists():
+            return
+        if not self.scheduler.has_pending_requests:
+            # The root node is in our DB already, so there's nothing to resume.
+            checkpoint_path.unlink()
+            return
+        try:
+            self.scheduler.resume(checkpoint_path.read_bytes())
+        except InvalidSyncCheckpoint as err:
+            self.logger.warning("Ignoring state sync checkpoint at %s: %s", checkpoint_path, err)
 
     # We are only interested in peers entering or leaving the pool
     subscription_msg_types: FrozenSet[Type[Command]] = frozenset()
@@ -114,42 +144,72 @@ class StateDownloader(BaseService, PeerSubscriber):
         # peer or it had all the trie nodes we requested, so there'd be no entry in
         # self._peer_missing_nodes for it.
         self._peer_missing_nodes.pop(cast(ETHPeer, peer), None)
+        self.request_tracker.peer_throughput.pop(cast(ETHPeer, peer), None)
+
+    def _is_missing_all(self, peer: ETHPeer, node_keys: Iterable[Hash32]) -> bool:
+        missing_nodes = self._peer_missing_nodes.get(peer)
+        if missing_nodes is None:
+            return False
+        return all(node_key in missing_nodes for node_key in node_keys)
+
+    def _get_candidates(self, peer: ETHPeer, node_keys: Iterable[Hash32]) -> List[Hash32]:
+        missing_nodes = self._peer_missing_nodes.get(peer)
+        if missing_nodes is None:
+            return list(node_keys)
+        return [node_key for node_key in node_keys if node_key not in missing_nodes]
 
     async def get_peer_for_request(self, node_keys: Set[Hash32]) -> ETHPeer:
-        """Return an idle peer that may have any of the trie nodes in node_keys.
+        """Return the fastest idle peer that may have any of the trie nodes in node_keys.
 
         If none of our peers have any of the given node keys, raise NoEligiblePeers. If none of
         the peers which may have at least one of the given node keys is idle, raise NoIdlePeers.
         """
         has_eligible_peers = False
+        idle_peers = []
         async for peer in self.peer_pool:
             peer = cast(ETHPeer, peer)
-            if self._peer_missing_nodes[peer].issuperset(node_keys):
+            if self._is_missing_all(peer, node_keys):
                 self.logger.debug2("%s doesn't have any of the nodes we want, skipping it", peer)
                 continue
             has_eligible_peers = True
             if peer in self.request_tracker.active_requests:
                 self.logger.debug2("%s is not idle, skipping it", peer)
                 continue
-            return peer
+            idle_peers.append(peer)
 
-        if not has_eligible_peers:
+        if idle_peers:
+            return max(idle_peers, key=self.request_tracker.get_throughput)
+        elif not has_eligible_peers:
             raise NoEligiblePeers()
         else:
             raise NoIdlePeers()
 
-    async def _process_nodes(self, nodes: Iterable[Tuple[Hash32, bytes]]) -> None:
-        for node_key, node in nodes:
-            self._total_processed_nodes += 1
-            try:
-                await self.scheduler.process([(node_key, node)])
-            except SyncRequestAlreadyProcessed:
-                # This means we received a node more than once, which can happen when we
-                # retry after a timeout.
-                pass
+    async def _process_nodes(self, nodes: Sequence[Tuple[Hash32, bytes]]) -> None:
+        self._total_processed_nodes += len(nodes)
+        # The whole reply is processed at once so that the scheduler can decode all nodes in a
+        # single trip to the process pool.
+        await self.scheduler.process(list(nodes))
 
     async def _cleanup(self) -> None:
         self._nodes_cache_dir.cleanup()
+        if self.checkpoint_path is None:
+            return
+        if self.scheduler.has_pending_requests:
+            await self._save_checkpoint()
+        elif self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+    async def _save_checkpoint(self) -> None:
+        checkpoint = await self.scheduler.get_checkpoint()
+        loop = self.get_event_loop()
+        await loop.run_in_executor(None, _write_checkpoint, self.checkpoint_path, checkpoint)
+        self.logger.debug(
+            "Saved state sync checkpoint (%d bytes) to %s", len(checkpoint), self.checkpoint_path)
+
+    async def _periodically_save_checkpoint(self) -> None:
+        while self.is_operational:
+            await self.sleep(self._checkpoint_interval)
+            await self._save_checkpoint()
 
     async def request_nodes(self, node_keys: Iterable[Hash32]) -> None:
         not_yet_requested = set(node_keys)
@@ -172,7 +232,7 @@ class StateDownloader(BaseService, PeerSubscriber):
                 # TODO: disconnect a peer if the pool is full
                 return
 
-            candidates = list(not_yet_requested.difference(self._peer_missing_nodes[peer]))
+            candidates = self._get_candidates(peer, not_yet_requested)
             batch = tuple(candidates[:eth_constants.MAX_STATE_FETCH])
             not_yet_requested = not_yet_requested.difference(batch)
             self.request_tracker.active_requests[peer] = (time.time(), batch)
@@ -197,7 +257,7 @@ class StateDownloader(BaseService, PeerSubscriber):
             return
 
         try:
-            self.request_tracker.active_requests.pop(peer)
+            self.request_tracker.record_reply(peer, len(node_data))
         except KeyError:
             self.logger.warning("Unexpected error removing peer from active requests: %s", peer)
 
@@ -216,6 +276,9 @@ class StateDownloader(BaseService, PeerSubscriber):
         # alternate ways to do this since a false negative here will result in
         # not requesting this node from this peer again.
         if missing:
+            if peer not in self._peer_missing_nodes:
+                self._peer_missing_nodes[peer] = RotatingBloomFilter(
+                    self._missing_nodes_filter_size)
             self._peer_missing_nodes[peer].update(missing)
             self.logger.debug(
                 "Re-requesting %d/%d NodeData entries not returned by %s",
@@ -255,6 +318,8 @@ class StateDownloader(BaseService, PeerSubscriber):
         self.logger.info("Starting state sync for root hash %s", encode_hex(self.root_hash))
         self.run_task(self._periodically_report_progress())
         self.run_task(self._periodically_retry_timedout_and_missing())
+        if self.checkpoint_path is not None:
+            self.run_task(self._periodically_save_checkpoint())
         with self.subscribe(self.peer_pool):
             while self.scheduler.has_pending_requests:
                 # This ensures we yield control and give _handle_msg() a chance to process any nodes
@@ -276,6 +341,15 @@ class StateDownloader(BaseService, PeerSubscriber):
 
         self.logger.info("Finished state sync with root hash %s", encode_hex(self.root_hash))
 
+    def _missing_nodes_filters_memory(self) -> int:
+        return sum(
+            missing_nodes.memory_bytes for missing_nodes in self._peer_missing_nodes.values())
+
+    def _db_round_trips_per_batch(self) -> float:
+        if self.scheduler.processed_batches == 0:
+            return 0
+        return self.scheduler.db_round_trips / self.scheduler.processed_batches
+
     async def _periodically_report_progress(self) -> None:
         while self.is_operational:
             requested_nodes = sum(
@@ -287,18 +361,61 @@ class StateDownloader(BaseService, PeerSubscriber):
             msg += "queued=%d  " % len(self.scheduler.queue)
             msg += "pending=%d  " % len(self.scheduler.requests)
             msg += "missing=%d  " % len(self.request_tracker.missing)
+            msg += "db_round_trips/batch=%.1f  " % self._db_round_trips_per_batch()
+            msg += "missing_filters_mem=%.1fMB  " % (self._missing_nodes_filters_memory() / 2**20)
             msg += "timeouts=%d" % self._total_timeouts
             self.logger.info("State-Sync: %s", msg)
             await self.sleep(self._report_interval)
 
 
+def _write_checkpoint(checkpoint_path: Path, checkpoint: bytes) -> None:
+    # Write to a temporary file first so that a crash while writing never leaves us with a
+    # truncated checkpoint.
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = checkpoint_path.with_name(checkpoint_path.name + '.tmp')
+    with temp_path.open('wb') as checkpoint_file:
+        checkpoint_file.write(checkpoint)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(str(temp_path), str(checkpoint_path))
+
+
 class TrieNodeRequestTracker:
+    # Smoothing factor of the per-peer throughput EMAs.
+    _throughput_smoothing_factor = 0.3
 
     def __init__(self, reply_timeout: int, logger: ExtendedDebugLogger) -> None:
         self.reply_timeout = reply_timeout
         self.logger = logger
         self.active_requests: Dict[ETHPeer, Tuple[float, Tuple[Hash32, ...]]] = {}
         self.missing: Dict[float, List[Hash32]] = {}
+        # Trie nodes per second returned by every peer we've sent requests to.
+        self.peer_throughput: Dict[ETHPeer, EMA] = {}
+
+    def record_reply(self, peer: ETHPeer, num_nodes: int) -> None:
+        """Remove the given peer's active request and update its throughput.
+
+        Raises KeyError if there's no active request for the given peer.
+        """
+        req_time, _ = self.active_requests.pop(peer)
+        elapsed = max(time.time() - req_time, 0.001)
+        self._update_throughput(peer, num_nodes / elapsed)
+
+    def _update_throughput(self, peer: ETHPeer, nodes_per_second: float) -> None:
+        if peer in self.peer_throughput:
+            self.peer_throughput[peer].update(nodes_per_second)
+        else:
+            self.peer_throughput[peer] = EMA(nodes_per_second, self._throughput_smoothing_factor)
+
+    def get_throughput(self, peer: ETHPeer) -> float:
+        """Return the given peer's throughput, in trie nodes per second.
+
+        Peers we haven't measured yet are assumed to be the fastest, so that we try them out.
+        """
+        if peer in self.peer_throughput:
+            return self.peer_throughput[peer].value
+        else:
+            return float('inf')
 
     def get_timed_out(self) -> List[Hash32]:
         timed_out = eth_utils.toolz.valfilter(
@@ -306,6 +423,7 @@ class TrieNodeRequestTracker:
         for peer, (_, node_keys) in timed_out.items():
             self.logger.debug(
                 "Timed out waiting for %d nodes from %s", len(node_keys), peer)
+            self._update_throughput(peer, 0)
         self.active_requests = eth_utils.toolz.dissoc(self.active_requests, *timed_out.keys())
         return list(eth_utils.toolz.concat(node_keys for _, node_keys in timed_out.values()))
 